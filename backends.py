@@ -0,0 +1,1009 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Generation Backends
+Pluggable providers that turn a prompt into content, plus the pooled HTTP
+connections they share.
+"""
+
+import re
+import ssl
+import json
+import codecs
+import time
+import base64
+import random
+import asyncio
+import hashlib
+import threading
+import http.client
+import http.server
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple, Union, Iterator, AsyncIterator
+from urllib.parse import urlsplit
+
+from rate_limit import RateLimiter
+
+
+class BackendError(Exception):
+    """Raised when a backend fails to produce content.
+    
+    Carries the HTTP ``status`` (if any) and, for throttled requests, the
+    ``retry_after`` delay in seconds the service asked for.
+    """
+    
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        self.status = status
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+# HTTP status of a request rejected for exceeding the service's rate limit
+THROTTLED_STATUS = 429
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)."""
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP connections to a single origin.
+    
+    Idle connections are reused for later requests instead of opening a new
+    TCP (and TLS) connection per call. At most ``max_size`` idle connections
+    are kept; extra ones are closed when returned.
+    """
+    
+    def __init__(self, origin: str, max_size: int = 10, timeout: float = 60.0):
+        """
+        Initialize the pool.
+        
+        Args:
+            origin: Scheme, host and optional port (e.g. https://api.example.com)
+            max_size: Maximum number of idle connections kept open
+            timeout: Default socket timeout in seconds
+        """
+        parsed = urlsplit(origin)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError(f"Invalid backend URL: {origin}")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.connections_reused = 0
+    
+    def _checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection, or open a new one. Returns (connection, reused)."""
+        with self._lock:
+            if self._idle:
+                self.connections_reused += 1
+                return self._idle.pop(), True
+            self.connections_created += 1
+        if self.scheme == 'https':
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn, False
+    
+    def _checkin(self, conn: http.client.HTTPConnection):
+        """Return a connection to the idle set, closing it if the pool is full."""
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+    
+    @contextmanager
+    def response(self, method: str, path: str, body: Optional[bytes] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None):
+        """
+        Send a request and yield the open ``http.client.HTTPResponse``.
+        
+        The connection goes back to the pool once the caller has consumed the
+        body. A request that fails on a reused connection which the server has
+        since closed is retried once on a fresh connection.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        for attempt in range(2):
+            conn, reused = self._checkout()
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            
+            try:
+                yield resp
+                resp.read()
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            return
+    
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a request and return (status, headers, body)."""
+        with self.response(method, path, body, headers, timeout) as resp:
+            return resp.status, {k.lower(): v for k, v in resp.getheaders()}, resp.read()
+    
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for conn in idle:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(url: str, max_size: int = 10, timeout: float = 60.0) -> ConnectionPool:
+    """
+    Return the process-wide connection pool for the origin of ``url``.
+    
+    Backends talking to the same scheme/host/port share one pool, so warm
+    connections are reused across media types and generator instances.
+    """
+    parsed = urlsplit(url)
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+    with _pools_lock:
+        pool = _pools.get(origin)
+        if pool is None:
+            pool = ConnectionPool(origin, max_size=max_size, timeout=timeout)
+            _pools[origin] = pool
+        elif max_size > pool.max_size:
+            pool.max_size = max_size
+        return pool
+
+
+
+class AsyncConnectionPool:
+    """
+    Pool of keep-alive HTTP/1.1 connections for use on one asyncio event loop.
+    
+    The asyncio counterpart of ``ConnectionPool``: requests are written and
+    responses read with asyncio streams, so thousands of calls can be in
+    flight without a thread each.
+    """
+    
+    def __init__(self, origin: str, max_size: int = 10, timeout: float = 60.0):
+        """
+        Initialize the pool.
+        
+        Args:
+            origin: Scheme, host and optional port (e.g. https://api.example.com)
+            max_size: Maximum number of idle connections kept open
+            timeout: Default timeout in seconds for a whole request
+        """
+        parsed = urlsplit(origin)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError(f"Invalid backend URL: {origin}")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        self.host_header = parsed.netloc
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = deque()
+        self.connections_created = 0
+        self.connections_reused = 0
+    
+    async def _checkout(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """Take a live idle connection, or open a new one. Returns (reader, writer, reused)."""
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.connections_reused += 1
+                return reader, writer, True
+            writer.close()
+        self.connections_created += 1
+        if self.scheme == 'https':
+            reader, writer = await asyncio.open_connection(
+                self.host, self.port, ssl=ssl.create_default_context(), server_hostname=self.host
+            )
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        return reader, writer, False
+    
+    def _checkin(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Return a connection to the idle set, closing it if the pool is full."""
+        if len(self._idle) < self.max_size:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+    
+    def _encode_request(self, method: str, path: str, body: Optional[bytes],
+                        headers: Optional[Dict[str, str]]) -> bytes:
+        """Serialize an HTTP/1.1 request."""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        lines.append(f"Content-Length: {len(body) if body else 0}")
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b'')
+    
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+        """Read the status line and headers of a response."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+    
+    @staticmethod
+    async def _iter_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """Yield the response body as it arrives (chunked, sized or until EOF)."""
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                chunk = await reader.readexactly(size)
+                await reader.readexactly(2)
+                yield chunk
+        elif 'content-length' in headers:
+            remaining = int(headers['content-length'])
+            while remaining:
+                chunk = await reader.read(min(remaining, 65536))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                yield chunk
+    
+    async def stream(self, method: str, path: str, body: Optional[bytes] = None,
+                     headers: Optional[Dict[str, str]] = None) -> AsyncIterator[Any]:
+        """
+        Send a request, then yield ``(status, headers)`` followed by body chunks.
+        
+        The connection goes back to the pool once the body is fully read. A
+        request that fails on a reused connection which the server has since
+        closed is retried once on a fresh connection.
+        """
+        payload = self._encode_request(method, path, body, headers)
+        for attempt in range(2):
+            reader, writer, reused = await self._checkout()
+            try:
+                writer.write(payload)
+                await writer.drain()
+                status, response_headers = await self._read_head(reader)
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            
+            try:
+                yield status, response_headers
+                async for chunk in self._iter_body(reader, response_headers):
+                    yield chunk
+            except BaseException:
+                writer.close()
+                raise
+            
+            keep_alive = (response_headers.get('connection', '').lower() != 'close'
+                          and ('content-length' in response_headers
+                               or response_headers.get('transfer-encoding', '').lower() == 'chunked'))
+            if keep_alive:
+                self._checkin(reader, writer)
+            else:
+                writer.close()
+            return
+    
+    async def request(self, method: str, path: str, body: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      timeout: Optional[float] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a request and return (status, headers, body)."""
+        async def send():
+            parts = []
+            response = self.stream(method, path, body, headers)
+            status, response_headers = await response.__anext__()
+            async for chunk in response:
+                parts.append(chunk)
+            return status, response_headers, b''.join(parts)
+        
+        return await asyncio.wait_for(send(), timeout if timeout is not None else self.timeout)
+    
+    def close(self):
+        """Close every idle connection."""
+        idle, self._idle = self._idle, deque()
+        for _, writer in idle:
+            writer.close()
+
+
+# Resources bound to an event loop (connection pools, semaphores), by loop
+_loop_resources = {}
+_loop_resources_lock = threading.Lock()
+
+
+def loop_resources() -> Dict[Any, Any]:
+    """
+    Return the resources kept for the running event loop, by key.
+    
+    Pooled connections and semaphores refer to their loop, so a weak mapping
+    keyed by the loop would never let go of them. Instead the first use on a
+    loop starts an async generator whose cleanup the loop runs as it shuts
+    down (``asyncio.run`` does, via ``shutdown_asyncgens``): it closes every
+    resource that has a ``close`` method and forgets the loop. Loops closed
+    without shutting down their async generators are forgotten whenever
+    another loop is set up.
+    """
+    loop = asyncio.get_running_loop()
+    with _loop_resources_lock:
+        resources = _loop_resources.get(loop)
+        if resources is not None:
+            return resources
+        for closed in [other for other in _loop_resources if other.is_closed()]:
+            del _loop_resources[closed]
+        resources = _loop_resources[loop] = {}
+    # Run it up to its yield right away; it is kept in the resources so it
+    # is only finalized by the loop's shutdown
+    cleanup = resources[_release_loop_resources] = _release_loop_resources(loop, resources)
+    try:
+        cleanup.asend(None).send(None)
+    except StopIteration:
+        pass
+    return resources
+
+
+async def _release_loop_resources(loop: asyncio.AbstractEventLoop, resources: Dict[Any, Any]):
+    """Wait for ``loop`` to shut down, then close and forget its resources."""
+    try:
+        yield
+    finally:
+        with _loop_resources_lock:
+            if _loop_resources.get(loop) is resources:
+                del _loop_resources[loop]
+        for resource in list(resources.values()):
+            close = getattr(resource, 'close', None)
+            if close is not None:
+                close()
+        resources.clear()
+
+
+def get_async_connection_pool(url: str, max_size: int = 10, timeout: float = 60.0) -> AsyncConnectionPool:
+    """
+    Return the async connection pool for the origin of ``url`` on the running loop.
+    
+    Connections belong to an event loop, so pools are shared per loop and
+    origin; they are closed when their loop shuts down (see ``loop_resources``).
+    """
+    parsed = urlsplit(url)
+    key = ('pool', f"{parsed.scheme}://{parsed.netloc}")
+    resources = loop_resources()
+    pool = resources.get(key)
+    if pool is None:
+        pool = resources[key] = AsyncConnectionPool(key[1], max_size=max_size, timeout=timeout)
+    elif max_size > pool.max_size:
+        pool.max_size = max_size
+    return pool
+
+class Backend:
+    """
+    Base class for generation backends.
+    
+    Subclasses implement ``_generate``, returning the generated text for the
+    'text' media type and the media bytes (or None when the backend only
+    records a placeholder) for 'image', 'audio' and 'video'.
+    
+    Calls rejected as throttled (HTTP 429) are retried after the delay the
+    service asks for, or with exponential backoff, up to ``max_retries``
+    times. With a ``rate_limit`` every call also waits for the backend's
+    request/token budget and adaptive concurrency (see ``RateLimiter``).
+    """
+    
+    name = 'base'
+    
+    def __init__(self, timeout: float = 60.0, max_concurrency: Optional[int] = None,
+                 rate_limit: Optional[Dict[str, Any]] = None, max_retries: int = 3, **options):
+        """
+        Initialize the backend.
+        
+        Args:
+            timeout: Per-request timeout in seconds
+            max_concurrency: Maximum number of calls in flight (None for no limit)
+            rate_limit: ``RateLimiter`` settings, e.g. {'requests_per_minute':
+                500, 'tokens_per_minute': 90000} (None for no limit)
+            max_retries: Retries of a throttled call before it fails
+            **options: Provider-specific options
+        """
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.options = options
+        self.rate_limiter = RateLimiter.from_config(rate_limit)
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+    
+    @property
+    def cache_id(self) -> str:
+        """Identifier that distinguishes this backend's results in the cache."""
+        return self.name
+    
+    def generate(self, media_type: str, prompt: str, params: Dict[str, Any],
+                 generated_at: Optional[str] = None) -> Optional[Union[str, bytes]]:
+        """
+        Generate content, honouring the backend's concurrency limit.
+        
+        Args:
+            media_type: One of 'text', 'image', 'audio', 'video'
+            prompt: Generation prompt
+            params: Resolved generation parameters
+            generated_at: ISO timestamp of the request
+        
+        Returns:
+            Text for 'text'; media bytes or None for other types
+        """
+        if self._slots is None:
+            return self._limited_generate(media_type, prompt, params, generated_at)
+        with self._slots:
+            return self._limited_generate(media_type, prompt, params, generated_at)
+    
+    def _throttle_delay(self, error: BackendError, call, attempt: int) -> Optional[float]:
+        """
+        Report a throttled call and return how long to wait before retrying it.
+        
+        Returns:
+            None if ``error`` is not throttling or no retries are left
+        """
+        if error.status != THROTTLED_STATUS:
+            return None
+        if call is not None:
+            call.throttled(error.retry_after)
+        if attempt >= self.max_retries:
+            return None
+        if error.retry_after is not None:
+            return error.retry_after
+        return min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.75, 1.25)
+    
+    @contextmanager
+    def _limited(self, prompt: str, params: Dict[str, Any]):
+        """Run one call under the rate limiter, if the backend has one."""
+        if self.rate_limiter is None:
+            yield None
+            return
+        with self.rate_limiter.limit(prompt, params) as call:
+            yield call
+    
+    @asynccontextmanager
+    async def _alimited(self, prompt: str, params: Dict[str, Any]):
+        """Async version of ``_limited``."""
+        if self.rate_limiter is None:
+            yield None
+            return
+        async with self.rate_limiter.alimit(prompt, params) as call:
+            yield call
+    
+    def _limited_generate(self, media_type: str, prompt: str, params: Dict[str, Any],
+                          generated_at: Optional[str]) -> Optional[Union[str, bytes]]:
+        """Call ``_generate`` under the rate limiter, retrying throttled calls."""
+        attempt = 0
+        while True:
+            with self._limited(prompt, params) as call:
+                try:
+                    return self._generate(media_type, prompt, params, generated_at)
+                except BackendError as e:
+                    delay = self._throttle_delay(e, call, attempt)
+                    if delay is None:
+                        raise
+            time.sleep(delay)
+            attempt += 1
+    
+    def _generate(self, media_type: str, prompt: str, params: Dict[str, Any],
+                  generated_at: Optional[str]) -> Optional[Union[str, bytes]]:
+        raise NotImplementedError
+    
+    def _aslots(self) -> asyncio.Semaphore:
+        """Return this backend's concurrency slots on the running loop, released with the loop."""
+        resources = loop_resources()
+        key = ('slots', self)
+        slots = resources.get(key)
+        if slots is None:
+            slots = resources[key] = asyncio.Semaphore(self.max_concurrency)
+        return slots
+    
+    async def agenerate(self, media_type: str, prompt: str, params: Dict[str, Any],
+                        generated_at: Optional[str] = None) -> Optional[Union[str, bytes]]:
+        """Async version of ``generate``; the concurrency limit applies per event loop."""
+        if not self.max_concurrency:
+            return await self._limited_agenerate(media_type, prompt, params, generated_at)
+        async with self._aslots():
+            return await self._limited_agenerate(media_type, prompt, params, generated_at)
+    
+    async def _limited_agenerate(self, media_type: str, prompt: str, params: Dict[str, Any],
+                                 generated_at: Optional[str]) -> Optional[Union[str, bytes]]:
+        """Async version of ``_limited_generate``."""
+        attempt = 0
+        while True:
+            async with self._alimited(prompt, params) as call:
+                try:
+                    return await self._agenerate(media_type, prompt, params, generated_at)
+                except BackendError as e:
+                    delay = self._throttle_delay(e, call, attempt)
+                    if delay is None:
+                        raise
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    async def _agenerate(self, media_type: str, prompt: str, params: Dict[str, Any],
+                         generated_at: Optional[str]) -> Optional[Union[str, bytes]]:
+        # Backends without native async support run on a worker thread
+        return await asyncio.to_thread(self._generate, media_type, prompt, params, generated_at)
+    
+    def stream(self, media_type: str, prompt: str, params: Dict[str, Any],
+               generated_at: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield generated text in chunks as the backend produces them.
+        
+        Backends without native streaming yield the whole result at once.
+        """
+        if self._slots is None:
+            yield from self._limited_stream(media_type, prompt, params, generated_at)
+            return
+        with self._slots:
+            yield from self._limited_stream(media_type, prompt, params, generated_at)
+    
+    def _limited_stream(self, media_type: str, prompt: str, params: Dict[str, Any],
+                        generated_at: Optional[str]) -> Iterator[str]:
+        """Stream under the rate limiter, retrying calls throttled before their first chunk."""
+        attempt = 0
+        while True:
+            started = False
+            with self._limited(prompt, params) as call:
+                try:
+                    for chunk in self._stream(media_type, prompt, params, generated_at):
+                        started = True
+                        yield chunk
+                    return
+                except BackendError as e:
+                    delay = None if started else self._throttle_delay(e, call, attempt)
+                    if delay is None:
+                        raise
+            time.sleep(delay)
+            attempt += 1
+    
+    def _stream(self, media_type: str, prompt: str, params: Dict[str, Any],
+                generated_at: Optional[str]) -> Iterator[str]:
+        yield self._generate(media_type, prompt, params, generated_at)
+    
+    async def astream(self, media_type: str, prompt: str, params: Dict[str, Any],
+                      generated_at: Optional[str] = None) -> AsyncIterator[str]:
+        """Async version of ``stream``."""
+        if not self.max_concurrency:
+            async for chunk in self._limited_astream(media_type, prompt, params, generated_at):
+                yield chunk
+            return
+        async with self._aslots():
+            async for chunk in self._limited_astream(media_type, prompt, params, generated_at):
+                yield chunk
+    
+    async def _limited_astream(self, media_type: str, prompt: str, params: Dict[str, Any],
+                               generated_at: Optional[str]) -> AsyncIterator[str]:
+        """Async version of ``_limited_stream``."""
+        attempt = 0
+        while True:
+            started = False
+            async with self._alimited(prompt, params) as call:
+                try:
+                    async for chunk in self._astream(media_type, prompt, params, generated_at):
+                        started = True
+                        yield chunk
+                    return
+                except BackendError as e:
+                    delay = None if started else self._throttle_delay(e, call, attempt)
+                    if delay is None:
+                        raise
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    async def _astream(self, media_type: str, prompt: str, params: Dict[str, Any],
+                       generated_at: Optional[str]) -> AsyncIterator[str]:
+        yield await self._agenerate(media_type, prompt, params, generated_at)
+    
+    def close(self):
+        """Release any resources held by the backend."""
+
+
+class SimulatedBackend(Backend):
+    """Offline backend producing placeholder content without any API calls."""
+    
+    name = 'simulated'
+    
+    async def _agenerate(self, media_type, prompt, params, generated_at):
+        # No I/O involved, so there is nothing to wait for
+        return self._generate(media_type, prompt, params, generated_at)
+    
+    def _stream(self, media_type, prompt, params, generated_at):
+        # Word-sized chunks, like a token stream from a real model
+        text = self._generate(media_type, prompt, params, generated_at)
+        yield from re.findall(r'\s*\S+\s*', text) or [text]
+    
+    async def _astream(self, media_type, prompt, params, generated_at):
+        for chunk in self._stream(media_type, prompt, params, generated_at):
+            yield chunk
+    
+    def _generate(self, media_type, prompt, params, generated_at):
+        if media_type != 'text':
+            # Only the metadata sidecar is written for simulated media
+            return None
+        
+        when = datetime.fromisoformat(generated_at) if generated_at else datetime.now(timezone.utc)
+        readable_time = when.strftime('%Y-%m-%d %H:%M:%S UTC')
+        return f"""Generated Text (Prompt: "{prompt}")
+        
+Style: {params.get('style')}
+Temperature: {params.get('temperature')}
+Max Length: {params.get('max_length')}
+
+[AI-Generated Content]
+This is a powerful AI multimedia generator that creates unlimited content.
+Based on your prompt: "{prompt}"
+
+The system is designed to be flexible, extensible, and capable of generating
+various types of multimedia content without artificial limitations.
+
+Generated at: {readable_time}
+"""
+
+
+class HTTPBackend(Backend):
+    """
+    Backend calling a JSON-over-HTTP generation service.
+    
+    Each request is a POST of ``{"type", "prompt", "params"}`` to
+    ``base_url + path``. Text responses are read from the 'text' field of a
+    JSON body (or the raw body); media responses are either raw bytes or a
+    JSON body with base64 'data'.
+    """
+    
+    name = 'http'
+    
+    def __init__(self, base_url: str, api_key: Optional[str] = None,
+                 path: str = '/v1/generate/{media_type}',
+                 headers: Optional[Dict[str, str]] = None,
+                 timeout: float = 60.0, max_concurrency: Optional[int] = None,
+                 **options):
+        """
+        Initialize the backend.
+        
+        Args:
+            base_url: Service URL (scheme, host, port and optional base path)
+            api_key: Bearer token sent in the Authorization header
+            path: Request path template, formatted with ``media_type``
+            headers: Extra headers sent with every request
+            timeout: Per-request timeout in seconds
+            max_concurrency: Maximum number of calls in flight
+        """
+        super().__init__(timeout=timeout, max_concurrency=max_concurrency, **options)
+        self.base_url = base_url.rstrip('/')
+        self.base_path = urlsplit(self.base_url).path
+        self.path = path
+        self.pool = get_connection_pool(self.base_url, max_size=max_concurrency or 10, timeout=timeout)
+        self.headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        if api_key:
+            self.headers['Authorization'] = f"Bearer {api_key}"
+        self.headers.update(headers or {})
+    
+    @property
+    def cache_id(self) -> str:
+        return f"{self.name}:{self.base_url}"
+    
+    def _request_path(self, media_type: str) -> str:
+        """Return the full request path for ``media_type``."""
+        return self.base_path + self.path.format(media_type=media_type)
+    
+    def _request_body(self, media_type: str, prompt: str, params: Dict[str, Any],
+                      stream: bool = False) -> bytes:
+        """Serialize a generation request."""
+        request = {'type': media_type, 'prompt': prompt, 'params': params}
+        if stream:
+            request['stream'] = True
+        return json.dumps(request).encode('utf-8')
+    
+    def _generate(self, media_type, prompt, params, generated_at):
+        status, headers, body = self.pool.request(
+            'POST',
+            self._request_path(media_type),
+            body=self._request_body(media_type, prompt, params),
+            headers=self.headers,
+            timeout=self.timeout
+        )
+        if status >= 400:
+            raise BackendError(f"{self.name} backend returned HTTP {status}: {body[:200]!r}", status=status,
+                               retry_after=parse_retry_after(headers.get('retry-after')))
+        return self._parse_response(media_type, headers.get('content-type', ''), body)
+    
+    async def _agenerate(self, media_type, prompt, params, generated_at):
+        pool = get_async_connection_pool(self.base_url, max_size=self.max_concurrency or 10, timeout=self.timeout)
+        status, headers, body = await pool.request(
+            'POST',
+            self._request_path(media_type),
+            body=self._request_body(media_type, prompt, params),
+            headers=self.headers,
+            timeout=self.timeout
+        )
+        if status >= 400:
+            raise BackendError(f"{self.name} backend returned HTTP {status}: {body[:200]!r}", status=status,
+                               retry_after=parse_retry_after(headers.get('retry-after')))
+        return self._parse_response(media_type, headers.get('content-type', ''), body)
+    
+    def _stream(self, media_type, prompt, params, generated_at):
+        with self.pool.response(
+            'POST',
+            self._request_path(media_type),
+            body=self._request_body(media_type, prompt, params, stream=True),
+            headers=self.headers,
+            timeout=self.timeout
+        ) as resp:
+            content_type = resp.getheader('Content-Type', '')
+            if resp.status >= 400:
+                body = resp.read()
+                raise BackendError(f"{self.name} backend returned HTTP {resp.status}: {body[:200]!r}",
+                                   status=resp.status,
+                                   retry_after=parse_retry_after(resp.getheader('Retry-After')))
+            if content_type.startswith('application/json'):
+                # Service does not stream: deliver the whole result as one chunk
+                yield self._parse_response(media_type, content_type, resp.read())
+                return
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            while True:
+                data = resp.read1(8192)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+    
+    async def _astream(self, media_type, prompt, params, generated_at):
+        pool = get_async_connection_pool(self.base_url, max_size=self.max_concurrency or 10, timeout=self.timeout)
+        response = pool.stream(
+            'POST',
+            self._request_path(media_type),
+            body=self._request_body(media_type, prompt, params, stream=True),
+            headers=self.headers
+        )
+        try:
+            status, headers = await asyncio.wait_for(response.__anext__(), self.timeout)
+            content_type = headers.get('content-type', '')
+            if status >= 400 or content_type.startswith('application/json'):
+                body = b''.join([chunk async for chunk in response])
+                if status >= 400:
+                    raise BackendError(f"{self.name} backend returned HTTP {status}: {body[:200]!r}",
+                                       status=status, retry_after=parse_retry_after(headers.get('retry-after')))
+                yield self._parse_response(media_type, content_type, body)
+                return
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            async for data in response:
+                text = decoder.decode(data)
+                if text:
+                    yield text
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+        finally:
+            await response.aclose()
+    
+    @staticmethod
+    def _parse_response(media_type: str, content_type: str, body: bytes) -> Union[str, bytes]:
+        """Decode a response body into text or media bytes."""
+        if content_type.startswith('application/json'):
+            data = json.loads(body)
+            if media_type == 'text':
+                return data['text']
+            return base64.b64decode(data['data'])
+        if media_type == 'text':
+            return body.decode('utf-8')
+        return body
+
+
+class _StubHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections under highly concurrent load
+    request_queue_size = 256
+
+
+class StubServer:
+    """
+    Local HTTP server answering generation requests deterministically.
+    
+    Text requests get a JSON body with a 'text' field; media requests get
+    ``payload_size`` bytes derived from the prompt and params. Useful for
+    testing and benchmarking the HTTP path without real API calls.
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, payload_size: int = 1024,
+                 chunk_delay: float = 0.0):
+        """
+        Start the server on a background thread.
+        
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds to wait before answering each request
+            payload_size: Size in bytes of media responses
+            chunk_delay: Seconds between chunks of a streamed text response
+        """
+        self.latency = latency
+        self.payload_size = payload_size
+        self.chunk_delay = chunk_delay
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer((host, port), self._make_handler())
+        self.url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+    
+    def _make_handler(self):
+        stub = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+            
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if stub.latency:
+                    time.sleep(stub.latency)
+                with stub._lock:
+                    stub.requests_served += 1
+                if request.get('stream') and request.get('type') == 'text':
+                    self._send_stream(stub.respond_text(request))
+                    return
+                content_type, body = stub.respond(request)
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def _send_stream(self, text):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for index, piece in enumerate(re.findall(r'\s*\S+\s*', text)):
+                    if index and stub.chunk_delay:
+                        time.sleep(stub.chunk_delay)
+                    data = piece.encode('utf-8')
+                    self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    def respond(self, request: Dict[str, Any]) -> Tuple[str, bytes]:
+        """Return (content_type, body) for a generation request."""
+        media_type = request.get('type')
+        prompt = request.get('prompt', '')
+        params = request.get('params', {})
+        if media_type == 'text':
+            return 'application/json', json.dumps({'text': self.respond_text(request)}).encode('utf-8')
+        seed = hashlib.sha256(json.dumps([media_type, prompt, params], sort_keys=True).encode('utf-8')).digest()
+        repeats = self.payload_size // len(seed) + 1
+        return 'application/octet-stream', (seed * repeats)[:self.payload_size]
+    
+    @staticmethod
+    def respond_text(request: Dict[str, Any]) -> str:
+        """Return the deterministic text for a text generation request."""
+        params = request.get('params', {})
+        return f"Stub text for: {request.get('prompt', '')}\nParams: {json.dumps(params, sort_keys=True)}\n"
+    
+    def close(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# Local stub servers by (latency, payload_size, chunk_delay), shared by the
+# stub backends configured alike
+_stub_servers = {}
+_stub_servers_lock = threading.Lock()
+
+
+def get_stub_server(latency: float = 0.0, payload_size: int = 1024, chunk_delay: float = 0.0) -> StubServer:
+    """Return the process-wide stub server with these settings, starting it on first use."""
+    key = (latency, payload_size, chunk_delay)
+    with _stub_servers_lock:
+        server = _stub_servers.get(key)
+        if server is None:
+            server = _stub_servers[key] = StubServer(latency=latency, payload_size=payload_size,
+                                                     chunk_delay=chunk_delay)
+    return server
+
+
+class StubBackend(HTTPBackend):
+    """HTTP backend wired to a local ``StubServer`` with its settings, started on first use."""
+    
+    name = 'stub'
+    
+    def __init__(self, base_url: Optional[str] = None, latency: float = 0.0,
+                 payload_size: int = 1024, chunk_delay: float = 0.0, **options):
+        if base_url is None:
+            base_url = get_stub_server(latency, payload_size, chunk_delay).url
+        self.payload_size = payload_size
+        super().__init__(base_url, **options)
+    
+    @property
+    def cache_id(self) -> str:
+        # Stable across runs (the port is not), but distinct per payload
+        return f"{self.name}:{self.payload_size}"
+
+
+BACKENDS = {}
+
+
+def register_backend(name: str, backend_class: type):
+    """Make a backend class available under ``name`` in config files."""
+    BACKENDS[name] = backend_class
+
+
+def create_backend(provider: str, **options) -> Backend:
+    """
+    Instantiate a registered backend.
+    
+    Args:
+        provider: Registered backend name (e.g. 'simulated', 'http', 'stub')
+        **options: Keyword arguments passed to the backend class
+    
+    Raises:
+        ValueError: If no backend is registered under ``provider``
+    """
+    if provider not in BACKENDS:
+        raise ValueError(f"Unknown backend provider: {provider}")
+    return BACKENDS[provider](**options)
+
+
+register_backend('simulated', SimulatedBackend)
+register_backend('http', HTTPBackend)
+register_backend('stub', StubBackend)
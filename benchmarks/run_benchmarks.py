@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Benchmark Suite
+Measures the generator's hot paths against a deterministic local stub backend
+and compares the results with a stored baseline.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from multimedia_generator import UnlimitedMultimediaGenerator  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+CONCURRENCY_LEVELS = (1, 8, 64)
+
+PROMPTS = {
+    'text': "Write a story about space exploration",
+    'image': "A futuristic cityscape at sunset",
+    'audio': "Calm meditation music",
+    'video': "A time-lapse of clouds moving",
+}
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Reduce per-operation latencies (seconds) to the reported statistics."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    
+    def percentile(fraction):
+        return ordered[min(count - 1, int(fraction * count))] * 1000
+    
+    return {
+        'operations': count,
+        'mean_ms': sum(ordered) / count * 1000,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'throughput_ops': count / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_timed(operation: Callable[[], Any], iterations: int, concurrency: int = 1) -> Dict[str, float]:
+    """Run ``operation`` ``iterations`` times on ``concurrency`` threads and time each call."""
+    def timed(_):
+        started = time.perf_counter()
+        operation()
+        return time.perf_counter() - started
+    
+    started = time.perf_counter()
+    if concurrency == 1:
+        latencies = [timed(i) for i in range(iterations)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(timed, range(iterations)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+class BenchmarkSuite:
+    """Collection of generator benchmarks sharing one stub-backed setup."""
+    
+    def __init__(self, workdir: str, iterations: int, stub_latency: float):
+        """
+        Prepare the benchmark environment.
+        
+        Args:
+            workdir: Scratch directory for config and generated files
+            iterations: Operations per benchmark
+            stub_latency: Simulated network latency of the stub backend, in seconds
+        """
+        self.workdir = workdir
+        self.iterations = iterations
+        self.config_path = os.path.join(workdir, 'bench_config.json')
+        with open(self.config_path, 'w') as f:
+            json.dump({
+                'output_dir': os.path.join(workdir, 'output'),
+                'cache': {'enabled': False},
+                'max_workers': max(CONCURRENCY_LEVELS),
+                'backends': {
+                    'default': {'provider': 'stub', 'latency': stub_latency, 'timeout': 30},
+                },
+            }, f)
+        self.generator = UnlimitedMultimediaGenerator(config_path=self.config_path)
+    
+    def benchmarks(self) -> Dict[str, Callable[[], Dict[str, float]]]:
+        """Return the benchmark functions keyed by name."""
+        suite = {
+            'load_config': lambda: run_timed(
+                lambda: self.generator._load_config(self.config_path), self.iterations * 10
+            ),
+        }
+        for media_type, prompt in PROMPTS.items():
+            generate = getattr(self.generator, f'generate_{media_type}')
+            for concurrency in CONCURRENCY_LEVELS:
+                suite[f'generate_{media_type}[c={concurrency}]'] = (
+                    lambda generate=generate, prompt=prompt, concurrency=concurrency: run_timed(
+                        lambda: generate(prompt), self.iterations, concurrency
+                    )
+                )
+        for concurrency in CONCURRENCY_LEVELS:
+            suite[f'generate_multimedia_project[c={concurrency}]'] = (
+                lambda concurrency=concurrency: run_timed(
+                    lambda: self.generator.generate_multimedia_project(PROMPTS),
+                    max(1, self.iterations // 4), concurrency
+                )
+            )
+        suite['cli_startup'] = self.cli_startup
+        return suite
+    
+    def cli_startup(self) -> Dict[str, float]:
+        """Time a full CLI run in a fresh interpreter, as users invoke it."""
+        command = [
+            sys.executable, os.path.join(REPO_ROOT, 'multimedia_generator.py'),
+            'text', PROMPTS['text'], '--config', self.config_path, '--no-cache',
+        ]
+        
+        def run_cli():
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, cwd=self.workdir)
+        
+        return run_timed(run_cli, max(3, self.iterations // 20))
+    
+    def run(self, selected: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """Run the selected benchmarks (all by default) and return their statistics."""
+        results = {}
+        for name, benchmark in self.benchmarks().items():
+            if selected and not any(pattern in name for pattern in selected):
+                continue
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                stats = benchmark()
+            results[name] = stats
+            print(f"{name:<40} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+                  f"{stats['throughput_ops']:10.1f} ops/s")
+        self.generator.close()
+        return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """
+    Compare results with a baseline.
+    
+    Returns:
+        One message per benchmark whose p50 latency rose, or whose throughput
+        fell, by more than ``threshold`` (a fraction)
+    """
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if reference['p50_ms'] > 0 and stats['p50_ms'] > reference['p50_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p50 {reference['p50_ms']:.3f} -> {stats['p50_ms']:.3f} ms")
+        if stats['throughput_ops'] < reference['throughput_ops'] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {reference['throughput_ops']:.1f} -> {stats['throughput_ops']:.1f} ops/s"
+            )
+    return regressions
+
+
+def main():
+    """Command-line interface for the benchmark suite."""
+    parser = argparse.ArgumentParser(description='UNLIMITED IRON CREATOR - Benchmark Suite')
+    parser.add_argument('--iterations', type=int, default=200, help='Operations per benchmark')
+    parser.add_argument('--stub-latency', type=float, default=0.002,
+                        help='Simulated backend latency in seconds')
+    parser.add_argument('--only', nargs='*', help='Run only benchmarks whose name contains one of these')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where to write the results JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown before a benchmark counts as a regression (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='uic_bench_')
+    try:
+        suite = BenchmarkSuite(workdir, args.iterations, args.stub_latency)
+        results = suite.run(args.only)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'stub_latency': args.stub_latency,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {args.output}")
+    
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return
+    
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"✅ No regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
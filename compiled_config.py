@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Compiled Configuration
+Validates a generator config once and precomputes the per-media-type
+generation defaults, so each request only merges its own parameters, and
+watches the config file for changes.
+"""
+
+import os
+import re
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Callable, Optional, Tuple
+
+from atomic_io import DURABILITY_MODES
+
+MEDIA_TYPES = ('text', 'image', 'audio', 'video')
+
+# Config sections that must be objects when present
+SECTIONS = ('api_keys', 'defaults', 'cache', 'backends', 'metrics', 'history', 'jobs', 'batch', 'postprocess',
+            'storage', 'video_segments')
+
+# Output directory layouts: every file in the directory itself, in
+# YYYY/MM/DD subdirectories, or in 256 subdirectories by hash of the ID
+LAYOUTS = ('flat', 'date', 'hash')
+
+# Metadata stores: a JSON file next to each artifact, or shared JSONL segments
+METADATA_STORES = ('sidecar', 'jsonl')
+
+_DIMENSIONS = re.compile(r'[1-9][0-9]*x[1-9][0-9]*')
+
+
+def _format_problems(title: str, problems: List[str]) -> str:
+    return f"{title}:\n" + "\n".join(f"  - {problem}" for problem in problems)
+
+
+class ConfigError(ValueError):
+    """Raised when a config has invalid settings; lists every problem found."""
+    
+    def __init__(self, problems: List[str]):
+        self.problems = problems
+        super().__init__(_format_problems("Invalid config", problems))
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _positive_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _positive_number(value: Any) -> bool:
+    return _is_number(value) and value > 0
+
+
+def _name(value: Any) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _dimensions(value: Any) -> bool:
+    return isinstance(value, str) and _DIMENSIONS.fullmatch(value) is not None
+
+
+def _temperature(value: Any) -> bool:
+    return _is_number(value) and 0 <= value <= 2
+
+
+def _audio_duration(value: Any) -> bool:
+    return value == 'auto' or _positive_number(value)
+
+
+# Generation parameters per media type, in the order they are stored:
+# (name, built-in default, check, description of valid values)
+PARAM_SPECS = {
+    'text': (
+        ('max_length', 500, _positive_int, 'a positive integer'),
+        ('temperature', 0.7, _temperature, 'a number from 0 to 2'),
+        ('style', 'creative', _name, 'a non-empty string'),
+    ),
+    'image': (
+        ('size', '1024x1024', _dimensions, "'WIDTHxHEIGHT'"),
+        ('style', 'realistic', _name, 'a non-empty string'),
+        ('format', 'png', _name, 'a non-empty string'),
+    ),
+    'audio': (
+        ('type', 'speech', _name, 'a non-empty string (speech, music, sound_effect)'),
+        ('voice', 'neutral', _name, 'a non-empty string'),
+        ('duration', 'auto', _audio_duration, "'auto' or a positive number of seconds"),
+        ('format', 'mp3', _name, 'a non-empty string'),
+    ),
+    'video': (
+        ('duration', 5, _positive_number, 'a positive number of seconds'),
+        ('resolution', '1920x1080', _dimensions, "'WIDTHxHEIGHT'"),
+        ('fps', 30, _positive_int, 'a positive integer'),
+        ('style', 'realistic', _name, 'a non-empty string'),
+        ('format', 'mp4', _name, 'a non-empty string'),
+    ),
+}
+
+
+class CompiledConfig:
+    """
+    Validated, precomputed form of a generator config.
+    
+    Each media type's defaults are built once, in increasing precedence,
+    from the built-in defaults, 'default_format' (images) and the config's
+    'defaults' section, and exposed as read-only mappings. Every problem in
+    the config is reported at once by a ``ConfigError`` when compiling.
+    """
+    
+    def __init__(self, config: Mapping[str, Any]):
+        """
+        Compile a config.
+        
+        Args:
+            config: Merged config dictionary (see ``_load_config``)
+        
+        Raises:
+            ConfigError: If any setting is invalid
+        """
+        problems = []
+        for section in SECTIONS:
+            if config.get(section) is not None and not isinstance(config[section], dict):
+                problems.append(f"'{section}' must be an object")
+        for key in ('max_workers', 'io_workers', 'max_views'):
+            if key in config and not _positive_int(config[key]):
+                problems.append(f"'{key}' must be a positive integer")
+        if not _name(config.get('output_dir', 'generated_media')):
+            problems.append("'output_dir' must be a non-empty string")
+        storage = config.get('storage') if isinstance(config.get('storage'), dict) else {}
+        self.layout = storage.get('layout', 'flat')
+        if self.layout not in LAYOUTS:
+            problems.append(f"'storage.layout' must be one of {', '.join(LAYOUTS)}, got {self.layout!r}")
+        metadata_store = storage.get('metadata', 'sidecar')
+        if metadata_store not in METADATA_STORES:
+            problems.append(f"'storage.metadata' must be one of {', '.join(METADATA_STORES)}, "
+                            f"got {metadata_store!r}")
+        elif metadata_store == 'jsonl' and not storage.get('manifest', True):
+            problems.append("'storage.metadata' 'jsonl' needs 'storage.manifest' to look metadata up")
+        if not _positive_number(storage.get('segment_size_mb', 64)):
+            problems.append("'storage.segment_size_mb' must be a positive number")
+        durability = storage.get('durability', 'none')
+        if durability not in DURABILITY_MODES:
+            problems.append(f"'storage.durability' must be one of {', '.join(DURABILITY_MODES)}, "
+                            f"got {durability!r}")
+        if not _positive_int(storage.get('group_commit_files', 64)):
+            problems.append("'storage.group_commit_files' must be a positive integer")
+        if not _positive_number(storage.get('group_commit_ms', 100)):
+            problems.append("'storage.group_commit_ms' must be a positive number")
+        fsync_interval = storage.get('fsync_interval', 1.0)
+        if fsync_interval is not None and not (_is_number(fsync_interval) and fsync_interval >= 0):
+            problems.append("'storage.fsync_interval' must be a number of seconds >= 0, or null")
+        segments = config.get('video_segments') if isinstance(config.get('video_segments'), dict) else {}
+        if not _positive_number(segments.get('segment_seconds', 10)):
+            problems.append("'video_segments.segment_seconds' must be a positive number")
+        if not _positive_int(segments.get('max_parallel', 4)):
+            problems.append("'video_segments.max_parallel' must be a positive integer")
+        
+        configured = config.get('defaults') if isinstance(config.get('defaults'), dict) else {}
+        for media_type in configured:
+            if media_type not in PARAM_SPECS:
+                problems.append(f"'defaults' has unknown media type '{media_type}'")
+        
+        self.enabled = frozenset(
+            media_type for media_type in MEDIA_TYPES if config.get(f'enable_{media_type}', True)
+        )
+        self._defaults = {}
+        for media_type, specs in PARAM_SPECS.items():
+            overrides = configured.get(media_type) or {}
+            if not isinstance(overrides, dict):
+                problems.append(f"'defaults.{media_type}' must be an object")
+                overrides = {}
+            overrides = dict(overrides)
+            if media_type == 'image' and 'default_format' in config:
+                overrides.setdefault('format', config['default_format'])
+            defaults = {}
+            for name, default, check, description in specs:
+                value = overrides.pop(name, default)
+                if not check(value):
+                    problems.append(f"{media_type} '{name}' must be {description}, got {value!r}")
+                defaults[name] = value
+            for name in overrides:
+                problems.append(f"'defaults' has unknown {media_type} parameter '{name}'")
+            self._defaults[media_type] = defaults
+        self._checks = {
+            media_type: {name: (check, description) for name, _, check, description in specs}
+            for media_type, specs in PARAM_SPECS.items()
+        }
+        self.defaults = MappingProxyType({
+            media_type: MappingProxyType(defaults) for media_type, defaults in self._defaults.items()
+        })
+        
+        if problems:
+            raise ConfigError(problems)
+    
+    def resolve(self, media_type: str, kwargs: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Merge a request's parameters over the compiled defaults.
+        
+        Parameters that do not apply to ``media_type`` are ignored; the others
+        are checked like the config's defaults.
+        
+        Raises:
+            ValueError: If ``media_type`` is unknown or disabled, or a
+                parameter is invalid (listing every invalid one)
+        """
+        defaults = self._defaults.get(media_type)
+        if defaults is None:
+            raise ValueError(f"Unknown media type: {media_type}")
+        if media_type not in self.enabled:
+            raise ValueError(f"{media_type.capitalize()} generation is disabled in config")
+        # Copying a plain dict is the cheapest merge; the originals are never handed out
+        params = defaults.copy()
+        checks = self._checks[media_type]
+        problems = []
+        for key in kwargs:
+            if key in defaults:
+                value = params[key] = kwargs[key]
+                check, description = checks[key]
+                if not check(value):
+                    problems.append(f"{media_type} '{key}' must be {description}, got {value!r}")
+        if problems:
+            raise ValueError(_format_problems("Invalid parameters", problems))
+        return params
+
+
+class ConfigWatcher:
+    """
+    Polls a config file on a background thread and calls ``on_change``
+    whenever its modification time or size changes.
+    """
+    
+    def __init__(self, path: str, on_change: Callable[[], Any], interval: float = 2.0):
+        """
+        Start watching.
+        
+        Args:
+            path: Config file to watch (it may not exist yet)
+            on_change: Called on the watcher thread after each change
+            interval: Seconds between checks
+        """
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            signature = self._stat()
+            if signature is not None and signature != self._signature:
+                self._signature = signature
+                self.on_change()
+    
+    def close(self):
+        """Stop watching."""
+        self._stop.set()
+        self._thread.join()
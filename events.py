@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Generation Events
+Structured progress events emitted by the generator, and subscribers that
+render them to the console or a log file.
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+from typing import Dict, Any, Optional, Callable, TextIO
+
+PROJECT_LABELS = {
+    'text': "📝 Generating text content...",
+    'image': "🖼️  Generating image content...",
+    'audio': "🔊 Generating audio content...",
+    'video': "🎬 Generating video content...",
+}
+
+# Event names, in the order a generation emits them
+JOB_STARTED = 'job-started'
+STAGE_DONE = 'stage-done'
+CACHE_HIT = 'cache-hit'
+ARTIFACT_WRITTEN = 'artifact-written'
+JOB_FAILED = 'job-failed'
+JOB_RETRY = 'job-retry'
+PROJECT_STARTED = 'project-started'
+PROJECT_JOB_STARTED = 'project-job-started'
+PROJECT_JOB_DONE = 'project-job-done'
+PROJECT_JOB_FAILED = 'project-job-failed'
+PROJECT_DONE = 'project-done'
+PROJECT_FAILED = 'project-failed'
+BATCH_STARTED = 'batch-started'
+BATCH_PROGRESS = 'batch-progress'
+BATCH_DONE = 'batch-done'
+SEGMENT_DONE = 'segment-done'
+SEGMENTS_SKIPPED = 'segments-skipped'
+CONFIG_RELOADED = 'config-reloaded'
+CONFIG_RELOAD_FAILED = 'config-reload-failed'
+
+
+class EventBus:
+    """
+    Fan-out of generator events to subscribers.
+    
+    An event is a plain dictionary with an 'event' name, a 'time' and
+    event-specific fields. With no subscribers, ``emit`` returns right away
+    and the bus is falsy, so callers can skip building expensive payloads
+    with ``if bus:``. Subscribers are called synchronously on the emitting
+    thread and must be cheap and thread-safe; the reporters below hand
+    events to a writer thread.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = ()
+    
+    def __bool__(self) -> bool:
+        return bool(self._subscribers)
+    
+    def subscribe(self, subscriber: Callable[[Dict[str, Any]], None]) -> Callable[[Dict[str, Any]], None]:
+        """Add a subscriber and return it (for a later ``unsubscribe``)."""
+        with self._lock:
+            self._subscribers = self._subscribers + (subscriber,)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Callable[[Dict[str, Any]], None]):
+        """Remove a subscriber if present."""
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscriber)
+    
+    def emit(self, name: str, **fields):
+        """Deliver an event to every subscriber."""
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+        event = {'event': name, 'time': time.time()}
+        event.update(fields)
+        for subscriber in subscribers:
+            subscriber(event)
+    
+    def close(self):
+        """Close and drop every subscriber that has a ``close`` method."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, ()
+        for subscriber in subscribers:
+            close = getattr(subscriber, 'close', None)
+            if close is not None:
+                close()
+
+
+def format_event(event: Dict[str, Any], verbose: bool = False) -> Optional[str]:
+    """
+    Render an event as console text.
+    
+    Returns:
+        The text to print (possibly several lines), or None for events that
+        are not shown
+    """
+    name = event['event']
+    media_type = event.get('media_type', '')
+    
+    if name == ARTIFACT_WRITTEN:
+        path = event['path']
+        if media_type == 'text':
+            return f"✓ Text generated and saved to: {path}"
+        params = event.get('params', {})
+        prompt = event.get('prompt')
+        lines = [f"✓ {media_type.capitalize()} generation initiated: {path}"]
+        if media_type == 'image':
+            lines.append(f"  Prompt: {prompt}")
+            lines.append(f"  Size: {params['size']}, Style: {params['style']}")
+        elif media_type == 'audio':
+            lines.append(f"  Type: {params['type']}, Voice: {params['voice']}")
+            lines.append(f"  Prompt: {prompt}")
+        elif media_type == 'video':
+            lines.append(f"  Duration: {params['duration']}s, Resolution: {params['resolution']}")
+            lines.append(f"  Style: {params['style']}, FPS: {params['fps']}")
+            lines.append(f"  Prompt: {prompt}")
+        lines.append(f"  Metadata saved to: {event['metadata_path']}")
+        return '\n'.join(lines)
+    if name == CACHE_HIT:
+        if event.get('coalesced'):
+            return f"✓ {media_type.capitalize()} shared with an identical request in progress: {event['path']}"
+        return f"✓ {media_type.capitalize()} served from cache: {event['path']}"
+    if name == PROJECT_STARTED:
+        return "\n" + "=" * 60 + "\nUNLIMITED MULTIMEDIA PROJECT GENERATION\n" + "=" * 60 + "\n"
+    if name == PROJECT_JOB_STARTED:
+        newline = "\n" if not event.get('concurrent') and event.get('index', 1) > 1 else ""
+        return newline + PROJECT_LABELS[media_type]
+    if name == PROJECT_JOB_FAILED:
+        return f"✗ {media_type.capitalize()} generation failed: {event['error']}"
+    if name == PROJECT_DONE:
+        return ("\n" + "=" * 60 + "\n✅ MULTIMEDIA PROJECT COMPLETE!\n" + "=" * 60 +
+                f"\n\nAll files saved to: {event['output_dir']}/")
+    if name == BATCH_STARTED:
+        return f"📦 Running batch: {event['jobs_path']} -> {event['results_path']}"
+    if name == JOB_RETRY:
+        return (f"↻ {media_type.capitalize()} job {event['id']} failed (attempt {event['attempt']}), "
+                f"retrying in {event['delay']:.1f}s: {event['error']}")
+    if name == BATCH_PROGRESS:
+        return (f"⏱️  {event['total']} jobs ({event['succeeded']} ok, {event['failed']} failed) - "
+                f"{event['rate']:.1f} jobs/s")
+    if name == BATCH_DONE:
+        return (f"✅ Batch complete: {event['total']} jobs ({event['succeeded']} ok, {event['failed']} failed) "
+                f"in {event['elapsed']:.2f}s - {event['rate']:.1f} jobs/s\n"
+                f"  Results saved to: {event['results_path']}")
+    if name == CONFIG_RELOADED:
+        changed = ', '.join(event['changed']) or 'nothing'
+        return f"🔄 Config reloaded from {event['path']} (changed: {changed})"
+    if name == CONFIG_RELOAD_FAILED:
+        return f"⚠️  Config reload failed, keeping the current config: {event['error']}"
+    if name == SEGMENTS_SKIPPED:
+        return f"⚠️  Video generated in one piece: {event['reason']}"
+    
+    if not verbose:
+        return None
+    if name == JOB_STARTED:
+        return f"→ {media_type.capitalize()} job started: {event['prompt']}"
+    if name == STAGE_DONE:
+        return f"  {media_type} {event['stage']} done ({event['elapsed'] * 1000:.1f} ms)"
+    if name == SEGMENT_DONE:
+        return f"  {media_type} segment {event['index'] + 1}/{event['count']} done"
+    if name == JOB_FAILED:
+        return f"✗ {media_type.capitalize()} job failed: {event['error']}"
+    return None
+
+
+class _QueuedWriter:
+    """
+    Base for subscribers that write text on a background thread.
+    
+    Emitting threads only enqueue; the writer thread drains everything that
+    is queued and writes it in one call, so generation threads never wait
+    on the output stream's lock.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+    
+    def _put(self, text: str):
+        self._queue.put(text)
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            lines = []
+            stop = False
+            while True:
+                if item is self._STOP:
+                    stop = True
+                else:
+                    lines.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if lines:
+                try:
+                    self._stream.write('\n'.join(lines) + '\n')
+                    self._stream.flush()
+                except (OSError, ValueError):
+                    # Closed or broken stream (e.g. piped into ``head``): drop output
+                    pass
+            if stop:
+                return
+    
+    def close(self):
+        """Write everything still queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+
+class ConsoleReporter(_QueuedWriter):
+    """Prints human-readable progress lines for generator events."""
+    
+    def __init__(self, stream: Optional[TextIO] = None, verbose: bool = False):
+        """
+        Initialize the reporter.
+        
+        Args:
+            stream: Stream to write to (defaults to stdout)
+            verbose: Also show job-started and stage-done events
+        """
+        super().__init__(stream or sys.stdout)
+        self.verbose = verbose
+    
+    def __call__(self, event: Dict[str, Any]):
+        text = format_event(event, self.verbose)
+        if text is not None:
+            self._put(text)
+
+
+class JSONEventLog(_QueuedWriter):
+    """Appends every event as one JSON line to a log file."""
+    
+    def __init__(self, path: str):
+        """
+        Initialize the log.
+        
+        Args:
+            path: File to append events to
+        """
+        self._file = open(path, 'a')
+        super().__init__(self._file)
+    
+    def __call__(self, event: Dict[str, Any]):
+        self._put(json.dumps(event, default=str, separators=(',', ':')))
+    
+    def close(self):
+        """Write everything still queued and close the file."""
+        super().close()
+        self._file.close()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Generation History Store
+Persistent, indexed record of past generations, shared by the CLI and the
+web interface.
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterable, Iterator
+
+from events import ARTIFACT_WRITTEN, CACHE_HIT, JOB_FAILED, PROJECT_DONE, PROJECT_FAILED
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    prompt TEXT,
+    prompt_hash TEXT,
+    file_path TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_history_type_timestamp ON history (type, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_history_prompt_hash ON history (prompt_hash);
+"""
+
+# Columns returned by ``query_summaries``; everything else is in the JSON 'data'
+SUMMARY_COLUMNS = ('id', 'timestamp', 'type', 'status', 'prompt', 'file_path')
+
+
+def prompt_hash(prompt: Optional[str]) -> Optional[str]:
+    """Return the short hash used to index prompts."""
+    if prompt is None:
+        return None
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+
+
+class HistoryStore:
+    """
+    SQLite-backed generation history.
+    
+    Each entry is a dictionary with at least 'timestamp', 'type', 'status'
+    and 'prompt' (plus e.g. 'file_path', 'params', 'results', 'error'). The
+    columns used for filtering and ordering are indexed, so paginated queries
+    stay fast however long the history grows. The database runs in WAL mode,
+    so a CLI run and the web interface can use the same file at once.
+    
+    The store is also an event subscriber: attached to a generator's event
+    bus it records every artifact written, cache hit, failure and project.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the history database.
+        
+        Args:
+            path: SQLite database file (':memory:' for a throwaway store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+    
+    def add(self, entry: Dict[str, Any]) -> int:
+        """
+        Append an entry.
+        
+        Returns:
+            The entry's ID
+        """
+        entry = dict(entry)
+        entry.setdefault('timestamp', datetime.now().isoformat())
+        entry.setdefault('status', 'success')
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO history (timestamp, type, status, prompt, prompt_hash, file_path, data) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (entry['timestamp'], entry['type'], entry['status'], entry.get('prompt'),
+                 prompt_hash(entry.get('prompt')), entry.get('file_path'), json.dumps(entry, default=str))
+            )
+        return cursor.lastrowid
+    
+    def _where(self, types: Optional[Iterable[str]], status: Optional[str],
+               prompt: Optional[str], search: Optional[str]) -> tuple:
+        """Build the WHERE clause and its parameters for the query filters."""
+        clauses = []
+        args = []
+        if types is not None:
+            types = list(types)
+            if not types:
+                clauses.append('0')
+            else:
+                clauses.append(f"type IN ({', '.join('?' * len(types))})")
+                args.extend(types)
+        if status is not None:
+            clauses.append('status = ?')
+            args.append(status)
+        if prompt is not None:
+            clauses.append('prompt_hash = ? AND prompt = ?')
+            args.extend((prompt_hash(prompt), prompt))
+        if search:
+            clauses.append("prompt LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            args.append(f'%{escaped}%')
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, args
+    
+    def query(self, types: Optional[Iterable[str]] = None, status: Optional[str] = None,
+              prompt: Optional[str] = None, search: Optional[str] = None,
+              newest_first: bool = True, limit: Optional[int] = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Return one page of entries.
+        
+        Args:
+            types: Only these media types ('project' included); None for all
+            status: Only entries with this status
+            prompt: Only entries with exactly this prompt
+            search: Only entries whose prompt contains this text
+            newest_first: Sort order by timestamp
+            limit: Page size (None for no limit)
+            offset: Number of matching entries to skip
+        
+        Returns:
+            Entry dictionaries, each with its 'id'
+        """
+        rows = self._select(('id', 'data'), types, status, prompt, search, newest_first, limit, offset)
+        return [self._decode(row) for row in rows]
+    
+    def query_summaries(self, types: Optional[Iterable[str]] = None, status: Optional[str] = None,
+                        prompt: Optional[str] = None, search: Optional[str] = None,
+                        newest_first: bool = True, limit: Optional[int] = 50,
+                        offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Like ``query``, but return only the ``SUMMARY_COLUMNS`` of each entry.
+        
+        The stored JSON is not read or decoded, which makes this the cheap
+        choice for listing entries; fetch the full entry with ``get``.
+        """
+        rows = self._select(SUMMARY_COLUMNS, types, status, prompt, search, newest_first, limit, offset)
+        return [dict(row) for row in rows]
+    
+    def _select(self, columns: Iterable[str], types, status, prompt, search,
+                newest_first: bool, limit: Optional[int], offset: int) -> List[sqlite3.Row]:
+        """Run a filtered, ordered and paginated SELECT of ``columns``."""
+        where, args = self._where(types, status, prompt, search)
+        order = 'DESC' if newest_first else 'ASC'
+        sql = f"SELECT {', '.join(columns)} FROM history {where} ORDER BY timestamp {order}, id {order}"
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            args.extend((limit, offset))
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+    
+    def count(self, types: Optional[Iterable[str]] = None, status: Optional[str] = None,
+              prompt: Optional[str] = None, search: Optional[str] = None) -> int:
+        """Return the number of entries matching the filters of ``query``."""
+        where, args = self._where(types, status, prompt, search)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM history {where}', args).fetchone()[0]
+    
+    def count_by_type(self) -> Dict[str, int]:
+        """Return the number of entries per type."""
+        with self._lock:
+            rows = self._conn.execute('SELECT type, COUNT(*) FROM history GROUP BY type').fetchall()
+        return {row[0]: row[1] for row in rows}
+    
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Return one entry by ID, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute('SELECT id, data FROM history WHERE id = ?', (entry_id,)).fetchone()
+        return self._decode(row) if row else None
+    
+    def iter_entries(self, types: Optional[Iterable[str]] = None,
+                     batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every matching entry, oldest first, reading ``batch_size`` rows at a time.
+        
+        Batches continue from the last (timestamp, id) seen rather than using
+        an OFFSET, so each batch is an index seek however deep the scan is.
+        """
+        where, filter_args = self._where(types, None, None, None)
+        keyset = '(timestamp > ? OR (timestamp = ? AND id > ?))'
+        where = f"{where} AND {keyset}" if where else f"WHERE {keyset}"
+        sql = f'SELECT id, timestamp, data FROM history {where} ORDER BY timestamp, id LIMIT ?'
+        last_timestamp, last_id = '', 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    sql, filter_args + [last_timestamp, last_timestamp, last_id, batch_size]
+                ).fetchall()
+            for row in rows:
+                yield self._decode(row)
+            if len(rows) < batch_size:
+                return
+            last_timestamp, last_id = rows[-1]['timestamp'], rows[-1]['id']
+    
+    def export_json(self, path: str, types: Optional[Iterable[str]] = None) -> int:
+        """
+        Write matching entries, oldest first, to ``path`` as a JSON array.
+        
+        Entries are streamed to the file in batches, so memory use does not
+        depend on the size of the history. The file is written under a
+        temporary name and renamed into place when complete.
+        
+        Returns:
+            Number of entries written
+        """
+        tmp_path = f"{path}.tmp"
+        count = 0
+        with open(tmp_path, 'w') as f:
+            f.write('[')
+            for entry in self.iter_entries(types=types):
+                f.write(',\n' if count else '\n')
+                f.write(json.dumps(entry, indent=2, default=str))
+                count += 1
+            f.write('\n]\n')
+        os.replace(tmp_path, path)
+        return count
+    
+    def clear(self):
+        """Delete every entry."""
+        with self._lock:
+            self._conn.execute('DELETE FROM history')
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = json.loads(row['data'])
+        entry['id'] = row['id']
+        return entry
+    
+    def __call__(self, event: Dict[str, Any]):
+        """Record the generator events that make up the history."""
+        name = event['event']
+        if name not in (ARTIFACT_WRITTEN, CACHE_HIT, JOB_FAILED, PROJECT_DONE, PROJECT_FAILED):
+            return
+        entry = {'timestamp': datetime.fromtimestamp(event['time']).isoformat()}
+        if name == PROJECT_DONE or name == PROJECT_FAILED:
+            results = event.get('results', {})
+            entry.update({
+                'type': 'project',
+                'prompt': 'Multimedia Project',
+                'status': 'success' if name == PROJECT_DONE else ('partial' if results else 'failed'),
+                'results': results,
+                'params': event.get('params', {}),
+            })
+            if 'errors' in event:
+                entry['errors'] = event['errors']
+        else:
+            entry.update({
+                'type': event['media_type'],
+                'prompt': event.get('prompt'),
+                'status': 'failed' if name == JOB_FAILED else 'success',
+                'params': event.get('params', {}),
+            })
+            if name == JOB_FAILED:
+                entry['error'] = event['error']
+            else:
+                entry['file_path'] = event['path']
+            if name == CACHE_HIT:
+                entry['cached'] = True
+                if event.get('coalesced'):
+                    entry['coalesced'] = True
+            elif 'artifact_id' in event:
+                entry['artifact_id'] = event['artifact_id']
+        self.add(entry)
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Job Queues
+Runs generation jobs on a worker pool and tracks their state, so callers
+such as the web interface can submit work and poll for results instead of
+blocking on it, and keeps batch runs in a durable, resumable SQLite queue.
+"""
+
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, Tuple
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """State of one submitted job, updated by the worker that runs it."""
+    
+    def __init__(self, job_id: int, kind: str, label: str, owner: Optional[str]):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.owner = owner
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._future = None
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the job is done, failed or cancelled."""
+        return self.state in FINISHED_STATES
+    
+    @property
+    def elapsed(self) -> Optional[float]:
+        """Seconds the job has been running (or ran), None if not started."""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job's state as a plain dictionary."""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'label': self.label,
+            'owner': self.owner,
+            'state': self.state,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Worker pool plus a table of jobs in the queued/running/done/failed states.
+    
+    Jobs are plain callables. Submitting returns a ``Job`` right away; its
+    state, progress, result and error are filled in as a worker runs it.
+    Finished jobs beyond ``max_finished`` are forgotten, oldest first.
+    """
+    
+    def __init__(self, max_workers: int = 4, max_finished: int = 1000):
+        """
+        Initialize the job manager.
+        
+        Args:
+            max_workers: Number of jobs run at the same time
+            max_finished: Number of finished jobs kept for status queries
+        """
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._next_id = 1
+    
+    def submit(self, func: Callable, *args, kind: str = 'job', label: str = '',
+               owner: Optional[str] = None, track_progress: bool = False, **kwargs) -> Job:
+        """
+        Queue ``func(*args, **kwargs)`` to run in the background.
+        
+        Args:
+            func: Callable to run
+            kind: Job category, e.g. the media type
+            label: Short description shown to users
+            owner: Identifier of the submitter, used to filter ``jobs``
+            track_progress: Pass a ``progress_callback(step, completed,
+                total)`` keyword to ``func`` that updates the job's progress
+                (the signature of ``generate_multimedia_project``'s callback)
+        
+        Returns:
+            The queued job
+        """
+        with self._lock:
+            job = Job(self._next_id, kind, label, owner)
+            self._next_id += 1
+            self._jobs[job.id] = job
+        
+        if track_progress:
+            def progress_callback(step, completed, total):
+                job.progress = completed / total if total else 1.0
+                job.message = f"{step} finished ({completed}/{total})"
+            kwargs['progress_callback'] = progress_callback
+        
+        job._future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+    
+    def _run(self, job: Job, func: Callable, args: tuple, kwargs: Dict[str, Any]):
+        """Run one job on a worker thread and record its outcome."""
+        job.started_at = time.time()
+        job.state = RUNNING
+        try:
+            job.result = func(*args, **kwargs)
+            job.progress = 1.0
+            job.state = DONE
+        except Exception as e:
+            job.error = str(e)
+            # Keep partial results, e.g. from a ProjectGenerationError
+            job.result = getattr(e, 'results', None)
+            job.state = FAILED
+        finally:
+            job.finished_at = time.time()
+            self._prune()
+    
+    def get(self, job_id: int) -> Optional[Job]:
+        """Return a job by ID, or None if unknown or already pruned."""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self, owner: Optional[str] = None, kind: Optional[str] = None,
+             active_only: bool = False) -> List[Job]:
+        """
+        Return jobs, newest first.
+        
+        Args:
+            owner: Only jobs submitted by this owner
+            kind: Only jobs of this kind
+            active_only: Only queued and running jobs
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            job for job in reversed(jobs)
+            if (owner is None or job.owner == owner)
+            and (kind is None or job.kind == kind)
+            and not (active_only and job.finished)
+        ]
+    
+    def active_count(self, owner: Optional[str] = None) -> int:
+        """Return the number of queued and running jobs."""
+        return len(self.jobs(owner=owner, active_only=True))
+    
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job that has not started yet.
+        
+        Returns:
+            True if the job was cancelled
+        """
+        job = self.get(job_id)
+        if job is None or job._future is None or not job._future.cancel():
+            return False
+        job.state = CANCELLED
+        job.finished_at = time.time()
+        return True
+    
+    def clear_finished(self, owner: Optional[str] = None):
+        """Forget finished jobs (of ``owner``, or of everyone)."""
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.finished and (owner is None or job.owner == owner)]:
+                del self._jobs[job_id]
+    
+    def _prune(self):
+        """Drop the oldest finished jobs beyond ``max_finished``."""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job_id]
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and, if ``wait``, let running ones finish."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+BATCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    type TEXT,
+    prompt TEXT,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (state, next_attempt_at, seq);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+PENDING = 'pending'
+
+
+def job_key(job: Dict[str, Any]) -> str:
+    """
+    Return the idempotency key of a batch job.
+    
+    A job's own 'id' is used when given; otherwise the key is a hash of the
+    job's type, prompt and parameters, so the same job is never queued twice.
+    """
+    if job.get('id') not in (None, ''):
+        return str(job['id'])
+    payload = json.dumps({k: v for k, v in job.items() if k != 'id'},
+                         sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class BatchQueue:
+    """
+    Durable SQLite queue of batch jobs with checkpointed completion.
+    
+    Every job is stored under its idempotency key (see ``job_key``) in the
+    'pending' state; enqueuing the same job file again adds nothing new.
+    Workers claim jobs (state 'running'), and each outcome is committed as
+    soon as it is known: 'done' with its result, or back to 'pending' with
+    an exponential backoff until ``max_attempts`` is reached, then 'failed'.
+    Jobs left 'running' by a crash or Ctrl-C are returned to 'pending' when
+    the queue is opened again, so a resumed run picks up exactly the
+    unfinished work. One process should drain a queue at a time.
+    """
+    
+    def __init__(self, path: str, max_attempts: int = 3, retry_backoff: float = 1.0,
+                 max_backoff: float = 60.0):
+        """
+        Open (and create if needed) a batch queue.
+        
+        Args:
+            path: SQLite database file
+            max_attempts: Attempts per job before it is marked 'failed'
+            retry_backoff: Delay before the first retry, in seconds; doubled
+                for every further attempt
+            max_backoff: Upper bound on the retry delay, in seconds
+        """
+        self.path = path
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(BATCH_SCHEMA)
+        self.recovered = self.recover()
+    
+    def __enter__(self) -> 'BatchQueue':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def get_meta(self, name: str) -> Optional[str]:
+        """Return a stored run setting (e.g. 'jobs_path', 'results_path')."""
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, name: str, value: str):
+        """Store a run setting."""
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)', (name, value))
+    
+    def enqueue(self, jobs: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """
+        Add jobs that are not queued yet.
+        
+        Jobs are inserted in transactions of ``chunk_size``, so the job
+        source is read lazily.
+        
+        Returns:
+            Number of newly queued jobs
+        """
+        added = 0
+        chunk = []
+        for job in jobs:
+            params = dict(job.get('params') or {})
+            params.update((k, v) for k, v in job.items() if k not in ('id', 'type', 'prompt', 'params'))
+            chunk.append((job_key(job), job.get('type'), job.get('prompt'), json.dumps(params, default=str)))
+            if len(chunk) >= chunk_size:
+                added += self._insert(chunk)
+                chunk = []
+        if chunk:
+            added += self._insert(chunk)
+        return added
+    
+    def _insert(self, rows: List[tuple]) -> int:
+        """Insert a chunk of jobs in one transaction, ignoring known keys."""
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO jobs (key, type, prompt, params) VALUES (?, ?, ?, ?)', rows
+            )
+            self._conn.execute('COMMIT')
+            return self._conn.total_changes - before
+    
+    def recover(self) -> int:
+        """
+        Return jobs interrupted while 'running' to 'pending'.
+        
+        Returns:
+            Number of recovered jobs
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?', (PENDING, time.time(), RUNNING)
+            )
+        return cursor.rowcount
+    
+    def retry_failed(self) -> int:
+        """
+        Give jobs that used up their attempts a fresh set of attempts.
+        
+        Returns:
+            Number of requeued jobs
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE jobs SET state = ?, attempts = 0, next_attempt_at = 0, updated_at = ? WHERE state = ?',
+                (PENDING, time.time(), FAILED)
+            )
+        return cursor.rowcount
+    
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Mark up to ``limit`` due jobs as 'running' and return them.
+        
+        Returns:
+            Job dictionaries with 'id' (the job key), 'type', 'prompt' and
+            'params', in queue order
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute(
+                    'SELECT key, type, prompt, params FROM jobs '
+                    'WHERE state = ? AND next_attempt_at <= ? ORDER BY seq LIMIT ?',
+                    (PENDING, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    'UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE key = ?',
+                    [(RUNNING, now, row['key']) for row in rows]
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [
+            {'id': row['key'], 'type': row['type'], 'prompt': row['prompt'], 'params': json.loads(row['params'])}
+            for row in rows
+        ]
+    
+    def iter_claimed(self, batch_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Claim and yield due jobs lazily, ``batch_size`` at a time, until none are due."""
+        while True:
+            jobs = self.claim(batch_size)
+            if not jobs:
+                return
+            yield from jobs
+    
+    def complete(self, key: str, result: Any):
+        """Checkpoint a job as 'done' with its result."""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE jobs SET state = ?, result = ?, error = NULL, updated_at = ? WHERE key = ?',
+                (DONE, json.dumps(result, default=str), time.time(), key)
+            )
+    
+    def is_last_attempt(self, key: str) -> bool:
+        """Check whether a failure of the job's current attempt would mark it 'failed'."""
+        with self._lock:
+            row = self._conn.execute('SELECT attempts FROM jobs WHERE key = ?', (key,)).fetchone()
+        return row is None or row[0] >= self.max_attempts
+    
+    def fail(self, key: str, error: str, retry: bool = True) -> Tuple[Optional[float], int]:
+        """
+        Record a failed attempt, scheduling a retry if attempts remain.
+        
+        Args:
+            key: Job key
+            error: Error message of the attempt
+            retry: False to mark the job 'failed' right away
+        
+        Returns:
+            Tuple of (retry delay in seconds, or None if the job is now
+            'failed'; attempts made so far)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT attempts FROM jobs WHERE key = ?', (key,)).fetchone()
+            attempts = row[0] if row else self.max_attempts
+            if not retry or attempts >= self.max_attempts:
+                self._conn.execute(
+                    'UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE key = ?',
+                    (FAILED, error, now, key)
+                )
+                return None, attempts
+            # Exponential backoff with jitter, so retries of a failure burst spread out
+            delay = min(self.max_backoff, self.retry_backoff * 2 ** (attempts - 1))
+            delay *= random.uniform(0.75, 1.25)
+            self._conn.execute(
+                'UPDATE jobs SET state = ?, error = ?, next_attempt_at = ?, updated_at = ? WHERE key = ?',
+                (PENDING, error, now + delay, now, key)
+            )
+        return delay, attempts
+    
+    def next_retry_delay(self) -> Optional[float]:
+        """
+        Return seconds until the next pending job is due.
+        
+        Returns:
+            0 if a job is due now, None if no jobs are pending
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT MIN(next_attempt_at) FROM jobs WHERE state = ?', (PENDING,)
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+    
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self._lock:
+            rows = self._conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        return {row[0]: row[1] for row in rows}
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Artifact Manifest
+Append-only index of the artifacts in an output directory, so artifacts can
+be looked up and listed without walking the (sharded) directory tree.
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, List, Iterable, Iterator
+
+from events import ARTIFACT_WRITTEN
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    created_at REAL NOT NULL,
+    params TEXT NOT NULL,
+    metadata_path TEXT,
+    metadata_offset INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_artifacts_type ON artifacts (type, id);
+CREATE INDEX IF NOT EXISTS idx_artifacts_path ON artifacts (path);
+"""
+
+COLUMNS = ('id', 'type', 'path', 'size', 'created_at', 'params', 'metadata_path', 'metadata_offset')
+
+
+class ArtifactManifest:
+    """
+    SQLite-backed manifest mapping artifact IDs to their path, media type,
+    size, generation parameters and where their metadata is stored (a
+    sidecar file, or a segment file and offset of a ``MetadataLog``).
+    
+    Rows are only ever inserted, never updated or deleted. Artifact IDs sort
+    by creation time, so the primary key doubles as the listing order and
+    pages are index seeks. The database runs in WAL mode, so a CLI run and the
+    web interface can use the same file at once.
+    
+    The manifest is also an event subscriber: attached to a generator's event
+    bus it records every artifact written.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the manifest database.
+        
+        Args:
+            path: SQLite database file (':memory:' for a throwaway manifest)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(artifacts)')}
+            for column, column_type in (('metadata_path', 'TEXT'), ('metadata_offset', 'INTEGER')):
+                if column not in columns:
+                    self._conn.execute(f'ALTER TABLE artifacts ADD COLUMN {column} {column_type}')
+    
+    def add(self, artifact_id: str, media_type: str, path: str, size: Optional[int],
+            created_at: float, params: Dict[str, Any], metadata_path: Optional[str] = None,
+            metadata_offset: Optional[int] = None):
+        """Record an artifact; an ID that is already recorded is left as it is."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO artifacts '
+                '(id, type, path, size, created_at, params, metadata_path, metadata_offset) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (artifact_id, media_type, path, size, created_at, json.dumps(params, default=str),
+                 metadata_path, metadata_offset)
+            )
+    
+    def get(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """Return one artifact by ID, or None if it is not recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM artifacts WHERE id = ?", (artifact_id,)
+            ).fetchone()
+        return self._decode(row) if row else None
+    
+    def find(self, path: str) -> Optional[Dict[str, Any]]:
+        """Return the artifact stored at ``path``, or None if it is not recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM artifacts WHERE path = ? LIMIT 1", (path,)
+            ).fetchone()
+        return self._decode(row) if row else None
+    
+    def list(self, types: Optional[Iterable[str]] = None, after: Optional[str] = None,
+             newest_first: bool = True, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        Return one page of artifacts.
+        
+        Args:
+            types: Only these media types; None for all
+            after: ID of the last artifact of the previous page
+            newest_first: Sort order by creation time
+            limit: Page size (None for no limit)
+        
+        Returns:
+            Artifact dictionaries with the manifest's ``COLUMNS``
+        """
+        clauses = []
+        args = []
+        if types is not None:
+            types = list(types)
+            if not types:
+                return []
+            clauses.append(f"type IN ({', '.join('?' * len(types))})")
+            args.extend(types)
+        if after is not None:
+            clauses.append('id < ?' if newest_first else 'id > ?')
+            args.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        order = 'DESC' if newest_first else 'ASC'
+        sql = f"SELECT {', '.join(COLUMNS)} FROM artifacts {where} ORDER BY id {order}"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [self._decode(row) for row in rows]
+    
+    def iter_artifacts(self, types: Optional[Iterable[str]] = None,
+                       batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield every matching artifact, oldest first, reading ``batch_size`` rows at a time."""
+        after = None
+        while True:
+            page = self.list(types=types, after=after, newest_first=False, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = page[-1]['id']
+    
+    def count(self, types: Optional[Iterable[str]] = None) -> int:
+        """Return the number of artifacts, optionally only of some media types."""
+        if types is None:
+            sql, args = 'SELECT COUNT(*) FROM artifacts', []
+        else:
+            types = list(types)
+            if not types:
+                return 0
+            sql = f"SELECT COUNT(*) FROM artifacts WHERE type IN ({', '.join('?' * len(types))})"
+            args = types
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()[0]
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        artifact = dict(row)
+        artifact['params'] = json.loads(artifact['params'])
+        return artifact
+    
+    def __call__(self, event: Dict[str, Any]):
+        """Record the artifact of an artifact-written event."""
+        if event['event'] != ARTIFACT_WRITTEN:
+            return
+        self.add(event['artifact_id'], event['media_type'], event['path'], event.get('size'),
+                 event['time'], event.get('params', {}), event.get('metadata_path'),
+                 event.get('metadata_offset'))
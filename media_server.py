@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Media Server
+Small static-file HTTP endpoint that streams generated media from disk, so
+downloads and previews of large files use constant memory.
+"""
+
+import os
+import hmac
+import socket
+import hashlib
+import secrets
+import mimetypes
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit, parse_qs
+
+
+class MediaServer:
+    """
+    Serves files over HTTP, with ``socket.sendfile`` (zero-copy where the OS
+    supports it) and single-range requests, so browsers can seek in videos.
+    
+    Only files under ``root`` that the application handed out a URL for can
+    be fetched: each URL carries the file's path relative to ``root`` and an
+    HMAC of it, keyed with a secret that lives only in this process. Every
+    connection has its own thread, and none of them
+    reads a file into memory, so memory use does not depend on file sizes or
+    on the number of concurrent downloads.
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, public_url: Optional[str] = None,
+                 root: Optional[str] = None):
+        """
+        Start serving on a background thread.
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 for any free port)
+            public_url: Base URL browsers reach the server at, e.g. through a
+                reverse proxy (defaults to http://<host>:<port>)
+            root: Directory files are served from (defaults to the current
+                directory)
+        """
+        self.root = os.path.realpath(root or os.getcwd())
+        self._secret = secrets.token_bytes(32)
+        self._server = ThreadingHTTPServer((host, port), _MediaRequestHandler)
+        self._server.daemon_threads = True
+        self._server.media_server = self
+        self.host, self.port = self._server.server_address[:2]
+        self.public_url = (public_url or f"http://{self.host}:{self.port}").rstrip('/')
+        self._thread = threading.Thread(target=self._server.serve_forever, name='media-server', daemon=True)
+        self._thread.start()
+    
+    def _sign(self, path: str) -> str:
+        return hmac.new(self._secret, path.encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+    
+    def _contains(self, path: str) -> bool:
+        try:
+            return os.path.commonpath([self.root, path]) == self.root
+        except ValueError:
+            # On another drive (Windows)
+            return False
+    
+    def serves(self, path: str) -> bool:
+        """Check ``path`` is under the served root, so ``url`` can link to it."""
+        return self._contains(os.path.realpath(path))
+    
+    def url(self, path: str, download: bool = False) -> str:
+        """
+        Return the URL that serves ``path``.
+        
+        Args:
+            path: File to serve
+            download: Ask the browser to save the file instead of showing it
+            
+        Raises:
+            ValueError: If ``path`` is not under the served root
+        """
+        path = os.path.realpath(path)
+        if not self._contains(path):
+            raise ValueError(f"Not under the media root {self.root}: {path}")
+        relative = os.path.relpath(path, self.root).replace(os.sep, '/')
+        url = f"{self.public_url}/media/{self._sign(relative)}/{quote(relative)}"
+        return f"{url}?download=1" if download else url
+    
+    def resolve(self, request_path: str) -> Optional[str]:
+        """Return the file a request path refers to, or None if it is not a valid signed path under the root."""
+        prefix = '/media/'
+        if not request_path.startswith(prefix):
+            return None
+        signature, _, quoted = request_path[len(prefix):].partition('/')
+        relative = unquote(quoted)
+        if not hmac.compare_digest(signature, self._sign(relative)):
+            return None
+        path = os.path.realpath(os.path.join(self.root, *relative.split('/')))
+        if not self._contains(path):
+            return None
+        return path
+    
+    def close(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single 'bytes=' range against a file of ``size`` bytes.
+    
+    Returns:
+        (start, end) inclusive, None to send the whole file, or (size, size)
+        for a range that cannot be satisfied
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    start, _, end = header[len('bytes='):].strip().partition('-')
+    try:
+        if not start:
+            # Suffix range: the last N bytes
+            length = int(end)
+            if length <= 0:
+                return size, size
+            return max(0, size - length), size - 1
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return size, size
+    return start, end
+
+
+class _MediaRequestHandler(BaseHTTPRequestHandler):
+    """Handles GET and HEAD requests for signed media URLs."""
+    
+    server_version = 'UnlimitedIronMedia/1.0'
+    
+    def do_HEAD(self):
+        self._serve(send_body=False)
+    
+    def do_GET(self):
+        self._serve(send_body=True)
+    
+    def _serve(self, send_body: bool):
+        url = urlsplit(self.path)
+        path = self.server.media_server.resolve(url.path)
+        if path is None:
+            self.send_error(403)
+            return
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(404)
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            byte_range = _parse_range(self.headers.get('Range'), size)
+            if byte_range == (size, size):
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{size}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            start, end = byte_range or (0, size - 1)
+            self.send_response(206 if byte_range else 200)
+            self.send_header('Content-Type', mimetypes.guess_type(path)[0] or 'application/octet-stream')
+            self.send_header('Content-Length', str(end - start + 1))
+            self.send_header('Accept-Ranges', 'bytes')
+            if byte_range:
+                self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+            if parse_qs(url.query).get('download') == ['1']:
+                filename = quote(os.path.basename(path))
+                self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{filename}")
+            self.end_headers()
+            if send_body and end >= start:
+                self.wfile.flush()
+                try:
+                    self.connection.sendfile(f, start, end - start + 1)
+                except (BrokenPipeError, ConnectionResetError, socket.timeout):
+                    # The client went away (e.g. a video player seeking elsewhere)
+                    self.close_connection = True
+    
+    def log_message(self, format, *args):
+        # Quiet: page loads fetch previews all the time
+        pass
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Consolidated Metadata Store
+Appends artifact metadata to a few large JSONL segment files instead of
+writing one small JSON sidecar per artifact.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Any, Optional, Iterator, List, Tuple
+
+from atomic_io import AtomicWriter
+
+SEGMENT_SUFFIX = '.jsonl'
+
+
+class MetadataLog:
+    """
+    Append-only metadata log made of numbered JSONL segment files.
+    
+    Each artifact's metadata is one compact JSON line,
+    ``{"path": ..., "metadata": {...}}``, appended with a single write to the
+    current segment; a new segment is started once it reaches
+    ``segment_bytes``. Writes go to the OS at once, so other processes can
+    read them; they are fsynced by the first append at least
+    ``fsync_interval`` seconds after the previous fsync (and by ``sync`` and
+    ``close``), so many artifacts share one fsync. The segment and offset
+    returned by ``append`` locate a record directly (the artifact manifest
+    stores them); ``export_sidecars`` writes the classic per-artifact JSON
+    files on demand.
+    """
+    
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 fsync_interval: Optional[float] = 1.0):
+        """
+        Open the log, appending to its newest segment.
+        
+        Args:
+            directory: Directory holding the segment files (created if needed)
+            segment_bytes: Size at which a new segment is started
+            fsync_interval: Longest time in seconds between fsyncs of
+                appended records (0 for every record, None to leave it to
+                the OS)
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        segments = self._segment_numbers()
+        self._number = segments[-1] if segments else 1
+        if self._ends_mid_record(self.segment_path(self._number)):
+            # Left by a crash mid-write: keep the partial line at the end of its segment
+            self._number += 1
+        self._fd = self._open_segment()
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+    
+    def _segment_numbers(self) -> List[int]:
+        return sorted(
+            int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+        )
+    
+    @staticmethod
+    def _ends_mid_record(segment: str) -> bool:
+        try:
+            with open(segment, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b'\n'
+        except OSError:
+            # Missing or empty
+            return False
+    
+    def segment_path(self, number: int) -> str:
+        """Return the path of segment ``number``."""
+        return os.path.join(self.directory, f"{number:08d}{SEGMENT_SUFFIX}")
+    
+    def _open_segment(self) -> int:
+        return os.open(self.segment_path(self._number), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    
+    def append(self, path: str, metadata: Dict[str, Any]) -> Tuple[str, int]:
+        """
+        Append the metadata of the artifact at ``path``.
+        
+        Returns:
+            (segment path, byte offset) of the record, for ``read``
+        """
+        line = json.dumps({'path': path, 'metadata': metadata}, separators=(',', ':'), default=str)
+        data = (line + '\n').encode('utf-8')
+        with self._lock:
+            if self._fd is None:
+                raise ValueError("Metadata log is closed")
+            # O_APPEND places the write at the end even when other processes
+            # append too; the file position afterwards is the end of our record
+            os.write(self._fd, data)
+            end = os.lseek(self._fd, 0, os.SEEK_CUR)
+            segment = self.segment_path(self._number)
+            self._dirty = True
+            now = time.monotonic()
+            if self.fsync_interval is not None and now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._fd)
+                self._last_fsync = now
+                self._dirty = False
+            if end >= self.segment_bytes:
+                self._roll()
+        return segment, end - len(data)
+    
+    def _roll(self):
+        """Seal the current segment and start the next one. Caller holds the lock."""
+        if self._dirty and self.fsync_interval is not None:
+            os.fsync(self._fd)
+            self._dirty = False
+        os.close(self._fd)
+        self._number += 1
+        self._fd = self._open_segment()
+    
+    @staticmethod
+    def read(segment: str, offset: int) -> Dict[str, Any]:
+        """Return the metadata of the record at ``offset`` in ``segment``."""
+        with open(segment, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())['metadata']
+    
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (artifact path, metadata) for every record, oldest first."""
+        for number in self._segment_numbers():
+            with open(self.segment_path(number), 'rb') as f:
+                for line in f:
+                    # A crash can leave a partial last line; it has no newline
+                    if line.endswith(b'\n'):
+                        record = json.loads(line)
+                        yield record['path'], record['metadata']
+    
+    def export_sidecars(self, overwrite: bool = False, writer: Optional[AtomicWriter] = None) -> int:
+        """
+        Write a ``<artifact>.json`` sidecar, as the 'sidecar' store does, for
+        every record.
+        
+        Args:
+            overwrite: Replace sidecars that already exist
+            writer: Writer (and with it durability policy) for the sidecars
+        
+        Returns:
+            Number of sidecars written
+        """
+        writer = writer or AtomicWriter()
+        count = 0
+        for path, metadata in self.iter_records():
+            sidecar = f"{path}.json"
+            if not overwrite and os.path.exists(sidecar):
+                continue
+            os.makedirs(os.path.dirname(sidecar) or '.', exist_ok=True)
+            writer.write(sidecar, json.dumps(metadata, indent=2))
+            count += 1
+        return count
+    
+    def sync(self):
+        """Fsync records appended since the last fsync."""
+        with self._lock:
+            if self._fd is not None and self._dirty:
+                os.fsync(self._fd)
+                self._last_fsync = time.monotonic()
+                self._dirty = False
+    
+    def close(self):
+        """Fsync outstanding records (unless fsync is left to the OS) and close the current segment."""
+        if self.fsync_interval is not None:
+            self.sync()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
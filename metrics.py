@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Generation Metrics
+Per-stage timing of generations, aggregated into histograms and exported
+through pluggable sinks (Prometheus text, JSON log lines, callbacks).
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+import http.server
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, Iterable, TextIO
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Recent samples kept per media type for percentile estimates
+WINDOW_SIZE = 2048
+
+
+class StageTimer:
+    """
+    Records how long each stage of one generation takes.
+    
+    ``mark(stage)`` attributes the time since the previous mark (or since the
+    timer was created) to ``stage``.
+    """
+    
+    __slots__ = ('stages', '_last')
+    
+    def __init__(self):
+        self.stages = {}
+        self._last = time.perf_counter()
+    
+    def mark(self, stage: str):
+        """Close the current stage under the name ``stage``."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+    
+    @property
+    def total(self) -> float:
+        """Sum of all recorded stage durations."""
+        return sum(self.stages.values())
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+    
+    __slots__ = ('counts', 'count', 'sum')
+    
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        """Add one observation."""
+        index = bisect.bisect_left(BUCKETS, value)
+        if index < len(BUCKETS):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+    
+    def cumulative(self) -> List[int]:
+        """Return the cumulative count for each bucket bound."""
+        running = 0
+        result = []
+        for count in self.counts:
+            running += count
+            result.append(running)
+        return result
+
+
+class GenerationMetrics:
+    """
+    Aggregates per-generation stage timings by media type.
+    
+    Each recorded generation updates a counter by media type and outcome, a
+    histogram per (media type, stage) plus one for the 'total', and a window
+    of recent totals used for percentiles. Every record is also passed to the
+    registered sinks.
+    """
+    
+    def __init__(self, sinks: Iterable[Callable[[Dict[str, Any]], None]] = ()):
+        """
+        Initialize the metrics registry.
+        
+        Args:
+            sinks: Callables receiving one record dictionary per generation
+        """
+        self.sinks = list(sinks)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._windows = {}
+        self._extra_counters = {}
+    
+    def add_sink(self, sink: Callable[[Dict[str, Any]], None]):
+        """Register another sink."""
+        self.sinks.append(sink)
+    
+    def remove_sinks(self, sinks: Iterable[Callable[[Dict[str, Any]], None]]):
+        """Unregister sinks and release those that hold files or sockets."""
+        removed = list(sinks)
+        # Replaced, not edited, so a concurrent ``record`` keeps a consistent list
+        self.sinks = [sink for sink in self.sinks if not any(sink is other for other in removed)]
+        for sink in removed:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                close()
+    
+    def close(self):
+        """Flush and release sinks that hold files or sockets."""
+        for sink in self.sinks:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                close()
+    
+    def record(self, media_type: str, timer: StageTimer, status: str = 'success'):
+        """
+        Record one finished generation.
+        
+        Args:
+            media_type: Media type that was generated
+            timer: Stage timings of the generation
+            status: Outcome ('success', 'cached', 'coalesced' or 'failed')
+        """
+        total = timer.total
+        with self._lock:
+            key = (media_type, status)
+            self._counters[key] = self._counters.get(key, 0) + 1
+            for stage, duration in timer.stages.items():
+                self._histogram(media_type, stage).observe(duration)
+            self._histogram(media_type, 'total').observe(total)
+            window = self._windows.get(media_type)
+            if window is None:
+                window = self._windows[media_type] = deque(maxlen=WINDOW_SIZE)
+            window.append(total)
+        
+        if self.sinks:
+            record = {
+                'timestamp': time.time(),
+                'media_type': media_type,
+                'status': status,
+                'total_seconds': total,
+                'stages': dict(timer.stages),
+            }
+            for sink in self.sinks:
+                sink(record)
+    
+    def increment(self, name: str, media_type: str, amount: int = 1):
+        """Increment a named counter (e.g. 'cache_hits') for a media type."""
+        with self._lock:
+            key = (name, media_type)
+            self._extra_counters[key] = self._extra_counters.get(key, 0) + amount
+    
+    def _histogram(self, media_type: str, stage: str) -> Histogram:
+        """Return the histogram for (media_type, stage). Caller holds the lock."""
+        key = (media_type, stage)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        return histogram
+    
+    def percentiles(self, media_type: str, quantiles: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """
+        Return total-latency percentiles (seconds) over recent generations.
+        
+        Returns:
+            Mapping like {'p50': ..., 'p95': ..., 'p99': ...}; empty if there
+            are no samples for ``media_type``
+        """
+        with self._lock:
+            samples = sorted(self._windows.get(media_type, ()))
+        if not samples:
+            return {}
+        return {
+            f"p{round(q * 100):g}": samples[min(len(samples) - 1, int(q * len(samples)))]
+            for q in quantiles
+        }
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters, per-stage means and percentiles as plain data."""
+        with self._lock:
+            counters = {f"{media_type}.{status}": count for (media_type, status), count in self._counters.items()}
+            counters.update({f"{media_type}.{name}": count
+                             for (name, media_type), count in self._extra_counters.items()})
+            stages = {
+                f"{media_type}.{stage}": {
+                    'count': histogram.count,
+                    'mean_seconds': histogram.sum / histogram.count if histogram.count else 0.0,
+                }
+                for (media_type, stage), histogram in self._histograms.items()
+            }
+            media_types = list(self._windows)
+        return {
+            'counters': counters,
+            'stages': stages,
+            'percentiles': {media_type: self.percentiles(media_type) for media_type in media_types},
+        }
+    
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP uic_generations_total Generations by media type and outcome.",
+            "# TYPE uic_generations_total counter",
+        ]
+        with self._lock:
+            for (media_type, status), count in sorted(self._counters.items()):
+                lines.append(f'uic_generations_total{{media_type="{media_type}",status="{status}"}} {count}')
+            
+            names = sorted({name for name, _ in self._extra_counters})
+            for name in names:
+                lines.append(f"# TYPE uic_{name}_total counter")
+                for (counter, media_type), count in sorted(self._extra_counters.items()):
+                    if counter == name:
+                        lines.append(f'uic_{name}_total{{media_type="{media_type}"}} {count}')
+            
+            lines.append("# HELP uic_stage_duration_seconds Time spent in each generation stage.")
+            lines.append("# TYPE uic_stage_duration_seconds histogram")
+            for (media_type, stage), histogram in sorted(self._histograms.items()):
+                labels = f'media_type="{media_type}",stage="{stage}"'
+                for bound, count in zip(BUCKETS, histogram.cumulative()):
+                    lines.append(f'uic_stage_duration_seconds_bucket{{{labels},le="{bound:g}"}} {count}')
+                lines.append(f'uic_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'uic_stage_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+                lines.append(f'uic_stage_duration_seconds_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+class JSONLogSink:
+    """Writes one JSON line per generation to a file or stream."""
+    
+    def __init__(self, path: Optional[str] = None, stream: Optional[TextIO] = None):
+        """
+        Initialize the sink.
+        
+        Args:
+            path: File to append to (takes precedence over ``stream``)
+            stream: Stream to write to (defaults to stderr)
+        """
+        self._lock = threading.Lock()
+        self._owns_stream = bool(path)
+        self._stream = open(path, 'a', buffering=1) if path else (stream or sys.stderr)
+    
+    def __call__(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            self._stream.write(line + '\n')
+    
+    def close(self):
+        """Close the log file if this sink opened it."""
+        if self._owns_stream:
+            self._stream.close()
+
+
+class PrometheusFileSink:
+    """
+    Periodically rewrites a Prometheus text file (e.g. for node_exporter's
+    textfile collector) with the current metrics.
+    """
+    
+    def __init__(self, metrics: GenerationMetrics, path: str, interval: float = 5.0):
+        """
+        Initialize the sink.
+        
+        Args:
+            metrics: Registry to export
+            path: Output .prom file, replaced atomically
+            interval: Minimum seconds between rewrites
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+    
+    def __call__(self, record: Dict[str, Any]):
+        now = time.monotonic()
+        if now - self._last_write < self.interval or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_write = now
+            self.flush()
+        finally:
+            self._lock.release()
+    
+    def flush(self):
+        """Write the current metrics right away."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.metrics.render_prometheus())
+        os.replace(tmp_path, self.path)
+    
+    def close(self):
+        """Write the final metrics."""
+        self.flush()
+
+
+class PrometheusHTTPSink:
+    """Serves the current metrics at http://<host>:<port>/metrics."""
+    
+    def __init__(self, metrics: GenerationMetrics, port: int = 9108, host: str = '127.0.0.1'):
+        """
+        Start the metrics endpoint on a background thread.
+        
+        Args:
+            metrics: Registry to export
+            port: Port to listen on
+            host: Interface to bind
+        """
+        registry = metrics
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_address[1]}/metrics"
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+    
+    def __call__(self, record: Dict[str, Any]):
+        # Metrics are read on demand by the endpoint
+        pass
+    
+    def close(self):
+        """Stop the endpoint."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def create_sink(metrics: GenerationMetrics, sink_config: Dict[str, Any]) -> Callable[[Dict[str, Any]], None]:
+    """
+    Build a sink from a config entry.
+    
+    Supported types: 'json_log' (path), 'prometheus_file' (path, interval)
+    and 'prometheus_http' (port, host).
+    """
+    options = dict(sink_config)
+    sink_type = options.pop('type', None)
+    if sink_type == 'json_log':
+        return JSONLogSink(**options)
+    if sink_type == 'prometheus_file':
+        return PrometheusFileSink(metrics, **options)
+    if sink_type == 'prometheus_http':
+        return PrometheusHTTPSink(metrics, **options)
+    raise ValueError(f"Unknown metrics sink type: {sink_type}")
@@ -7,23 +7,243 @@ No limits on creativity!
 
 import os
 import sys
+import csv
+import copy
 import json
+import time
+import base64
+import hashlib
+import signal
+import asyncio
 import argparse
-from typing import Dict, Any, Optional, List
+import warnings
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, AsyncIterator, Union
 from datetime import datetime, timezone
 
+from atomic_io import AtomicWriter
+from backends import Backend, create_backend
+from compiled_config import CompiledConfig, ConfigError, ConfigWatcher, MEDIA_TYPES
+from events import (
+    EventBus, ConsoleReporter, JSONEventLog, JOB_STARTED, STAGE_DONE, CACHE_HIT, ARTIFACT_WRITTEN,
+    JOB_FAILED, PROJECT_STARTED, PROJECT_JOB_STARTED, PROJECT_JOB_DONE, PROJECT_JOB_FAILED, PROJECT_DONE,
+    PROJECT_FAILED, BATCH_STARTED, BATCH_PROGRESS, BATCH_DONE, JOB_RETRY, CONFIG_RELOADED,
+    CONFIG_RELOAD_FAILED, SEGMENT_DONE, SEGMENTS_SKIPPED
+)
+from history_store import HistoryStore
+from job_queue import BatchQueue
+from manifest import ArtifactManifest
+from metadata_store import MetadataLog
+from metrics import GenerationMetrics, StageTimer, create_sink
+from postprocess import PostProcessor
+from result_cache import ResultCache, SingleFlight, Flight
+from video_segments import SegmentedVideo, can_join, segmenting_limitation
+
+
+class ProjectGenerationError(Exception):
+    """Raised when one or more jobs of a multimedia project fail.
+
+    Carries the partial ``results`` of the jobs that succeeded and the
+    ``errors`` (media type -> exception) of the ones that did not.
+    """
+
+    def __init__(self, results: Dict[str, str], errors: Dict[str, Exception]):
+        self.results = results
+        self.errors = errors
+        failed = ', '.join(f"{media_type} ({error})" for media_type, error in errors.items())
+        super().__init__(f"Project generation failed for: {failed}")
+
+
+class _ArtifactIdGenerator:
+    """
+    Monotonic, ULID-style artifact IDs.
+    
+    Each ID is 26 Crockford base32 characters: a 48-bit millisecond timestamp
+    followed by 80 random bits. IDs sort by creation time; within the same
+    millisecond the random part is incremented, so IDs from one process are
+    strictly increasing and never collide across threads. The random part is
+    reseeded after a fork, which keeps concurrent processes apart.
+    """
+    
+    ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+    RANDOM_BITS = 80
+    # base64.b32encode uses A-Z2-7; map it onto Crockford's alphabet
+    _B32_TO_CROCKFORD = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ234567', ALPHABET)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last_ms = -1
+        self._last_random = 0
+        self._prefix_ms = -1
+        self._prefix = ''
+    
+    def new_id(self, timestamp_ns: int) -> str:
+        """Return a new ID for the given ``time.time_ns()`` reading."""
+        ms = timestamp_ns // 1_000_000
+        with self._lock:
+            pid = os.getpid()
+            if pid != self._pid or ms > self._last_ms:
+                self._pid = pid
+                self._last_ms = max(ms, self._last_ms)
+                self._last_random = int.from_bytes(os.urandom(10), 'big')
+            else:
+                # Same millisecond (or the clock stepped back): stay monotonic
+                self._last_random += 1
+                if self._last_random >> self.RANDOM_BITS:
+                    self._last_ms += 1
+                    self._last_random = 0
+            
+            if self._last_ms != self._prefix_ms:
+                self._prefix_ms = self._last_ms
+                self._prefix = self._encode_timestamp(self._last_ms)
+            prefix = self._prefix
+            random_part = self._last_random
+        
+        # 80 random bits are exactly 16 base32 characters
+        suffix = base64.b32encode(random_part.to_bytes(10, 'big')).decode('ascii')
+        return prefix + suffix.translate(self._B32_TO_CROCKFORD)
+    
+    @classmethod
+    def timestamp_ms(cls, artifact_id: str) -> int:
+        """Return the millisecond timestamp encoded in the first 10 characters of an ID."""
+        ms = 0
+        for char in artifact_id[:10]:
+            ms = (ms << 5) | cls.ALPHABET.index(char)
+        return ms
+    
+    def _encode_timestamp(self, ms: int) -> str:
+        """Encode a 48-bit millisecond timestamp as 10 base32 characters."""
+        chars = []
+        for _ in range(10):
+            chars.append(self.ALPHABET[ms & 0x1F])
+            ms >>= 5
+        return ''.join(reversed(chars))
+
+
+_artifact_ids = _ArtifactIdGenerator()
+
+
+class _GenerationState:
+    """
+    The settings and resources one generation call works with.
+    
+    A new state is built whenever the config or output directory changes,
+    and each call takes the current one when it starts, so a config reload
+    midway through a call cannot send its artifact to another directory,
+    layout, writer or metadata store than the one it started with.
+    """
+    
+    __slots__ = ('config', 'compiled', 'output_dir', 'backends', 'writer', 'postprocessor', 'cache',
+                 'inflight', 'manifest', 'metadata_log')
+    
+    def __init__(self, generator: 'UnlimitedMultimediaGenerator'):
+        self.config = generator.config
+        self.compiled = generator.compiled
+        self.output_dir = generator.output_dir
+        self.backends = generator.backends
+        self.writer = generator.writer
+        self.postprocessor = generator.postprocessor
+        self.cache = generator.cache
+        self.inflight = generator._inflight
+        self.manifest = generator.manifest
+        self.metadata_log = generator.metadata_log
+
+
+BATCH_JOB_FIELDS = ('id', 'type', 'prompt', 'params')
+
+
+def iter_batch_jobs(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read batch jobs from a JSONL or CSV file.
+    
+    Each job has a 'type' and 'prompt'; an optional 'id' and 'params' object
+    may be given, and any other field is treated as a generation parameter.
+    CSV cells are decoded as JSON where possible, so "10" becomes 10 and a
+    'params' column may hold a JSON object.
+    
+    Args:
+        path: Path to a .jsonl or .csv job file
+        
+    Yields:
+        One job dictionary per row, without loading the whole file
+    """
+    with open(path, 'r', newline='') as f:
+        if path.lower().endswith('.csv'):
+            for row in csv.DictReader(f):
+                job = {}
+                for key, value in row.items():
+                    if key in ('id', 'type', 'prompt') or value is None:
+                        job[key] = value
+                    elif value != '':
+                        try:
+                            job[key] = json.loads(value)
+                        except ValueError:
+                            job[key] = value
+                yield job
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
 
 class UnlimitedMultimediaGenerator:
     """Main class for the unlimited AI multimedia generator."""
     
     def __init__(self, config_path: Optional[str] = None):
         """Initialize the multimedia generator with optional config file."""
+        # Progress is reported as events; nothing is printed unless a
+        # subscriber such as ConsoleReporter is attached
+        self.events = EventBus()
+        self.history = None
+        self.manifest = None
+        self.metadata_log = None
+        # Close functions of what this generator opened besides its event bus
+        self._owned = []
+        self._finalizer = weakref.finalize(self, self._close_owned, self.events, self._owned)
+        self.config_path = config_path
         self.config = self._load_config(config_path)
+        # Validated per-type defaults; invalid settings fail here, not mid-batch
+        self.compiled = CompiledConfig(self.config)
+        self.backends = self._create_backends()
+        # Sinks created from the 'metrics' config, replaced when it changes
+        self._config_sinks = []
+        self._metrics_requested = False
+        self.metrics = self._create_metrics()
+        self.postprocessor = self._create_postprocessor()
+        self.writer = self._create_writer()
+        self._io_executor = None
+        self._io_executor_lock = threading.Lock()
+        # Views of other output directories, least recently used first, and
+        # views dropped from it that are still in use somewhere
+        self._views = OrderedDict()
+        self._detached_views = weakref.WeakValueDictionary()
+        self._views_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        # Shard directories already created, so each is only created once
+        self._shard_dirs = set()
+        # Resources replaced by a config reload; closed with the generator
+        # because calls that started before the reload may still use them
+        self._retired = []
+        # Identical requests in progress in the output directory, shared with its result cache
+        self._inflight = SingleFlight()
         self.output_dir = self.config.get('output_dir', 'generated_media')
         self._ensure_output_dir()
         
-    def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
-        """Load configuration from file or use defaults."""
+    def _load_config(self, config_path: Optional[str], strict: bool = False) -> Dict[str, Any]:
+        """
+        Load configuration from file or use defaults.
+        
+        Args:
+            config_path: JSON config file merged over the defaults
+            strict: Raise if the file cannot be read or parsed, instead of
+                warning and using the defaults
+        """
         default_config = {
             'output_dir': 'generated_media',
             'default_format': 'png',
@@ -32,6 +252,59 @@ class UnlimitedMultimediaGenerator:
             'enable_image': True,
             'enable_audio': True,
             'enable_video': True,
+            'concurrent_projects': True,
+            'max_workers': 4,
+            'io_workers': 4,
+            'max_views': 32,
+            'cache': {
+                'enabled': True,
+                'disk': True,
+                'max_entries': 1024,
+                'max_disk_entries': 100000,
+                'ttl_seconds': None,
+            },
+            'backends': {
+                'default': {'provider': 'simulated'},
+            },
+            'metrics': {
+                'enabled': False,
+                'sinks': [],
+            },
+            'history': {
+                'enabled': True,
+                'path': None,
+            },
+            'jobs': {
+                'max_workers': 4,
+                'max_finished': 1000,
+            },
+            'batch': {
+                'max_attempts': 3,
+                'retry_backoff': 1.0,
+                'max_backoff': 60.0,
+            },
+            'postprocess': {
+                'workers': 0,
+                'resize': True,
+                'thumbnails': True,
+                'thumbnail_size': 256,
+            },
+            'video_segments': {
+                'enabled': False,
+                'segment_seconds': 10,
+                'max_parallel': 4,
+                'playlist': True,
+            },
+            'storage': {
+                'layout': 'flat',
+                'manifest': True,
+                'metadata': 'sidecar',
+                'segment_size_mb': 64,
+                'fsync_interval': 1.0,
+                'durability': 'none',
+                'group_commit_files': 64,
+                'group_commit_ms': 100,
+            },
         }
         
         if config_path and os.path.exists(config_path):
@@ -40,10 +313,553 @@ class UnlimitedMultimediaGenerator:
                     user_config = json.load(f)
                     default_config.update(user_config)
             except Exception as e:
-                print(f"Warning: Could not load config file: {e}")
+                if strict:
+                    raise
+                warnings.warn(f"Could not load config file: {e}")
         
         return default_config
     
+    @property
+    def output_dir(self) -> str:
+        """Directory generated files are written to."""
+        return self._output_dir
+    
+    @output_dir.setter
+    def output_dir(self, value: str):
+        # The disk cache tier, history, manifest and metadata log live under the output directory,
+        # so rebind them
+        self._output_dir = value
+        self.cache = self._create_cache()
+        self.history = self._open_history()
+        self.manifest = self._open_manifest()
+        self.metadata_log = self._open_metadata_log()
+        self._state = _GenerationState(self)
+    
+    def with_output_dir(self, output_dir: str) -> 'UnlimitedMultimediaGenerator':
+        """
+        Return a generator that writes to ``output_dir`` but shares this one's resources.
+        
+        The returned view shares config, backends (and their connection
+        pools) and metrics with this generator. It has its own event bus and
+        uses the result cache, history store and manifest of its directory.
+        Views are created once per directory and reused, so any number of
+        callers (e.g. web sessions) writing to the same directory share one
+        cache and one history and manifest connection. At most 'max_views'
+        views are kept; creating one more drops the least recently used one.
+        A dropped view is never closed while anything still holds it (a
+        session or a queued job keeps working with it, and gets it back from
+        here); its stores are closed once the last reference is gone, or by
+        ``close``, which closes them all.
+        
+        Args:
+            output_dir: Directory the view writes to
+            
+        Returns:
+            This generator if it already writes to ``output_dir``, otherwise
+            the shared view for that directory
+        """
+        if output_dir == self.output_dir:
+            return self
+        with self._views_lock:
+            view = self._views.get(output_dir) or self._detached_views.pop(output_dir, None)
+            if view is not None:
+                self._views[output_dir] = view
+                self._views.move_to_end(output_dir)
+            else:
+                # Shallow copy: backends, metrics and the view registry stay shared
+                view = copy.copy(self)
+                view.events = EventBus()
+                view.history = None
+                view.manifest = None
+                view.metadata_log = None
+                view._io_executor = None
+                view._inflight = SingleFlight()
+                view._owned = []
+                view._finalizer = weakref.finalize(view, self._close_owned, view.events, view._owned)
+                view.output_dir = output_dir
+                view._ensure_output_dir()
+                self._views[output_dir] = view
+            while len(self._views) > self.config.get('max_views', 32):
+                # Only forgotten here; closed when no longer referenced
+                old_dir, old_view = self._views.popitem(last=False)
+                self._detached_views[old_dir] = old_view
+        return view
+    
+    def _all_views(self) -> List['UnlimitedMultimediaGenerator']:
+        """Return every open view, including dropped ones still in use."""
+        with self._views_lock:
+            return list(self._views.values()) + list(self._detached_views.values())
+    
+    def _close_view(self):
+        """Close what a view owns: its event bus (with its history and manifest), metadata log and I/O pool."""
+        self._finalizer()
+    
+    @staticmethod
+    def _close_owned(events: EventBus, owned: List[Callable[[], None]]):
+        """Close a generator's event bus and what it opened; also run when it is garbage collected."""
+        events.close()
+        for close in owned:
+            close()
+    
+    def _open_history(self) -> Optional[HistoryStore]:
+        """
+        Open the history store from config and subscribe it to generation events.
+        
+        The store defaults to ``history.db`` in the output directory; a store
+        that is already open at the resolved path is kept, and one that is
+        replaced stays open until ``close``, for calls still in progress.
+        
+        Returns:
+            The history store, or None if history is disabled
+        """
+        history_config = self.config.get('history') or {}
+        path = None
+        if history_config.get('enabled', True):
+            path = history_config.get('path') or os.path.join(self.output_dir, 'history.db')
+        
+        previous = self.history
+        if previous is not None:
+            if previous.path == path:
+                return previous
+            self.events.unsubscribe(previous)
+            self._retired.append(previous)
+        if path is None:
+            return None
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        return self.events.subscribe(HistoryStore(path))
+    
+    def _open_manifest(self) -> Optional[ArtifactManifest]:
+        """
+        Open the output directory's artifact manifest and subscribe it to generation events.
+        
+        A manifest that is already open at the same path is kept; one that
+        is replaced stays open until ``close``, for calls still in progress.
+        
+        Returns:
+            The manifest (``manifest.db`` in the output directory), or None
+            if it is disabled
+        """
+        storage_config = self.config.get('storage') or {}
+        path = os.path.join(self.output_dir, 'manifest.db') if storage_config.get('manifest', True) else None
+        
+        previous = self.manifest
+        if previous is not None:
+            if previous.path == path:
+                return previous
+            self.events.unsubscribe(previous)
+            self._retired.append(previous)
+        if path is None:
+            return None
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        return self.events.subscribe(ArtifactManifest(path))
+    
+    def _open_metadata_log(self) -> Optional[MetadataLog]:
+        """
+        Open the output directory's consolidated metadata log if the
+        'storage.metadata' config is 'jsonl'.
+        
+        A log that is already open in the same directory is kept (with the
+        new segment size and fsync interval); one that is replaced stays
+        open until ``close``, for saves still in progress.
+        
+        Returns:
+            The log (segments in ``metadata/`` in the output directory), or
+            None to write a JSON sidecar per artifact
+        """
+        storage_config = self.config.get('storage') or {}
+        directory = None
+        if storage_config.get('metadata', 'sidecar') == 'jsonl':
+            directory = os.path.join(self.output_dir, 'metadata')
+        segment_bytes = int(storage_config.get('segment_size_mb', 64) * 1024 * 1024)
+        fsync_interval = storage_config.get('fsync_interval', 1.0)
+        
+        previous = self.metadata_log
+        if previous is not None:
+            if previous.directory == directory:
+                previous.segment_bytes = segment_bytes
+                previous.fsync_interval = fsync_interval
+                return previous
+            self._retired.append(previous)
+        if directory is None:
+            return None
+        metadata_log = MetadataLog(directory, segment_bytes, fsync_interval)
+        self._owned.append(metadata_log.close)
+        return metadata_log
+    
+    def get_metadata(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the metadata of the artifact at ``path``, from the
+        consolidated metadata log or its JSON sidecar.
+        
+        Returns:
+            The metadata, or None if none is stored (e.g. for text)
+        """
+        artifact = self.manifest.find(path) if self.manifest is not None else None
+        if artifact is not None and artifact['metadata_offset'] is not None:
+            return MetadataLog.read(artifact['metadata_path'], artifact['metadata_offset'])
+        try:
+            with open(f"{path}.json", 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def export_sidecars(self, overwrite: bool = False) -> int:
+        """
+        Write a JSON sidecar next to every artifact whose metadata is in the
+        consolidated metadata log, for tools that expect one per artifact.
+        
+        Args:
+            overwrite: Replace sidecars that already exist
+            
+        Returns:
+            Number of sidecars written (0 if the log is not in use)
+        """
+        if self.metadata_log is None:
+            return 0
+        return self.metadata_log.export_sidecars(overwrite, self.writer)
+    
+    def find_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an artifact of the output directory in its manifest.
+        
+        Returns:
+            The artifact's 'id', 'type', 'path', 'size', 'created_at' and
+            'params', or None if it is unknown or the manifest is disabled
+        """
+        if self.manifest is None:
+            return None
+        return self.manifest.get(artifact_id)
+    
+    def list_artifacts(self, types: Optional[Iterable[str]] = None, after: Optional[str] = None,
+                       limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        List the output directory's artifacts, newest first, from its manifest.
+        
+        Args:
+            types: Only these media types; None for all
+            after: ID of the last artifact of the previous page
+            limit: Page size (None for no limit)
+            
+        Returns:
+            Artifacts as returned by ``find_artifact`` (empty if the manifest
+            is disabled)
+        """
+        if self.manifest is None:
+            return []
+        return self.manifest.list(types=types, after=after, limit=limit)
+    
+    def _create_cache(self) -> Optional[ResultCache]:
+        """Build the result cache from config, or None if caching is disabled."""
+        cache_config = self.config.get('cache') or {}
+        if not cache_config.get('enabled', True):
+            return None
+        cache_dir = os.path.join(self.output_dir, '.cache') if cache_config.get('disk', True) else None
+        return ResultCache(
+            cache_dir,
+            max_entries=cache_config.get('max_entries', 1024),
+            ttl_seconds=cache_config.get('ttl_seconds'),
+            max_disk_entries=cache_config.get('max_disk_entries', 100000),
+            exists=self._artifact_exists,
+            inflight=self._inflight
+        )
+    
+    def _artifact_exists(self, path: str) -> bool:
+        """Check an artifact (or its metadata sidecar or log record) is still there."""
+        if os.path.exists(path) or os.path.exists(f"{path}.json"):
+            return True
+        return self.metadata_log is not None and self.manifest is not None and self.manifest.find(path) is not None
+    
+    @staticmethod
+    def _backend_options(config: Dict[str, Any], media_type: str) -> Dict[str, Any]:
+        """
+        Resolve the backend settings for ``media_type``.
+        
+        The media type uses its own entry of 'backends' if present, otherwise
+        'default'. An 'api_key' naming an entry of 'api_keys' is replaced by
+        that key.
+        """
+        backend_config = config.get('backends') or {}
+        api_keys = config.get('api_keys') or {}
+        options = dict(backend_config.get(media_type, backend_config.get('default', {'provider': 'simulated'})))
+        if options.get('api_key') in api_keys:
+            options['api_key'] = api_keys[options['api_key']]
+        return options
+    
+    def _create_backends(self, config: Optional[Dict[str, Any]] = None,
+                         reuse: Optional[Dict[str, Backend]] = None) -> Dict[str, Backend]:
+        """
+        Create a backend for each media type from the 'backends' config.
+        
+        Media types with identical settings share one backend instance.
+        
+        Args:
+            config: Config to use (defaults to the current one)
+            reuse: Existing backends by settings signature, kept instead of
+                creating a new backend with the same settings
+        """
+        config = self.config if config is None else config
+        instances = dict(reuse or {})
+        backends = {}
+        for media_type in MEDIA_TYPES:
+            options = self._backend_options(config, media_type)
+            signature = json.dumps(options, sort_keys=True, default=str)
+            if signature not in instances:
+                provider = options.pop('provider', 'simulated')
+                instances[signature] = create_backend(provider, **options)
+            backends[media_type] = instances[signature]
+        return backends
+    
+    def reload_config(self) -> bool:
+        """
+        Re-read the config file and swap the new settings in.
+        
+        The new config is loaded, validated and its backends created before
+        anything is replaced, so an unreadable or invalid file leaves the
+        current config in place. Backends whose settings are unchanged are
+        kept, with their connection pools and rate limiters, and so are the
+        result cache, history, manifest, metrics and post-processor unless
+        their section changed. Metrics sinks from the previous config are
+        closed right away; other replaced resources stay open until
+        ``close``, so calls already running finish with what they started
+        with. Views
+        of other output directories are updated too.
+        
+        Returns:
+            True if the new config was applied
+        """
+        with self._reload_lock:
+            previous = self.config
+            try:
+                config = self._load_config(self.config_path, strict=True)
+                compiled = CompiledConfig(config)
+                reuse = {
+                    json.dumps(self._backend_options(previous, media_type), sort_keys=True, default=str):
+                        self.backends[media_type]
+                    for media_type in MEDIA_TYPES
+                }
+                backends = self._create_backends(config, reuse)
+            except Exception as e:
+                self.events.emit(CONFIG_RELOAD_FAILED, path=self.config_path, error=str(e))
+                return False
+            
+            self._retired.extend(set(self.backends.values()) - set(backends.values()))
+            self._apply_config(config, compiled, backends, previous)
+            for view in self._all_views():
+                view._apply_config(config, compiled, backends, previous, root=self)
+        
+        changed = sorted(key for key in config.keys() | previous.keys() if config.get(key) != previous.get(key))
+        self.events.emit(CONFIG_RELOADED, path=self.config_path, changed=changed)
+        return True
+    
+    def _apply_config(self, config: Dict[str, Any], compiled: CompiledConfig, backends: Dict[str, Backend],
+                      previous: Dict[str, Any], root: Optional['UnlimitedMultimediaGenerator'] = None):
+        """
+        Swap in a reloaded config, rebuilding only what its changes affect.
+        
+        Views pass the generator they belong to as ``root`` and take its
+        metrics and post-processor; they keep their own output directory.
+        """
+        def changed(key: str) -> bool:
+            return config.get(key) != previous.get(key)
+        
+        self.config = config
+        self.compiled = compiled
+        self.backends = backends
+        if root is not None:
+            self.metrics = root.metrics
+            self.postprocessor = root.postprocessor
+            self.writer = root.writer
+        else:
+            if changed('metrics'):
+                self._reload_metrics()
+            if changed('postprocess'):
+                self._retired.append(self.postprocessor)
+                self.postprocessor = self._create_postprocessor()
+            if changed('storage'):
+                self._retired.append(self.writer)
+                self.writer = self._create_writer()
+        
+        if root is None and changed('output_dir'):
+            # Rebinds the cache, history and manifest as well
+            self.output_dir = config.get('output_dir', 'generated_media')
+            self._ensure_output_dir()
+            return
+        if changed('cache'):
+            self.cache = self._create_cache()
+        if changed('history'):
+            self.history = self._open_history()
+        if changed('storage'):
+            self.manifest = self._open_manifest()
+            self.metadata_log = self._open_metadata_log()
+        # Calls starting from now on use the new config; running ones keep theirs
+        self._state = _GenerationState(self)
+    
+    def watch_config(self, interval: float = 2.0, reload_signal: bool = True) -> ConfigWatcher:
+        """
+        Reload the config whenever its file changes (see ``reload_config``).
+        
+        Args:
+            interval: Seconds between checks of the file
+            reload_signal: Also reload on SIGHUP (Unix; only possible from
+                the main thread)
+            
+        Returns:
+            The watcher, stopped by ``close``
+            
+        Raises:
+            ValueError: If the generator was not created from a config file
+        """
+        if not self.config_path:
+            raise ValueError("Generator has no config file to watch")
+        if self._watcher is None:
+            self._watcher = ConfigWatcher(self.config_path, self.reload_config, interval)
+        if (reload_signal and hasattr(signal, 'SIGHUP')
+                and threading.current_thread() is threading.main_thread()):
+            # Reload off the signal handler, which may interrupt a thread holding our locks
+            signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(
+                target=self.reload_config, name='config-reload', daemon=True).start())
+        return self._watcher
+    
+    def _create_metrics(self) -> Optional[GenerationMetrics]:
+        """Build the metrics registry and its sinks from config, or None if disabled."""
+        metrics_config = self.config.get('metrics') or {}
+        if not metrics_config.get('enabled', False):
+            return None
+        metrics = GenerationMetrics()
+        self._add_config_sinks(metrics)
+        return metrics
+    
+    def _add_config_sinks(self, metrics: GenerationMetrics):
+        """Add the sinks of the 'metrics' config to ``metrics``."""
+        for sink_config in (self.config.get('metrics') or {}).get('sinks', []):
+            sink = create_sink(metrics, sink_config)
+            self._config_sinks.append(sink)
+            metrics.add_sink(sink)
+    
+    def _reload_metrics(self):
+        """
+        Apply a changed 'metrics' config.
+        
+        The sinks of the previous config are closed first (releasing e.g. an
+        HTTP sink's port) and those of the new one added. The registry and
+        its counts are kept while metrics stay enabled, or were turned on with
+        ``enable_metrics``; otherwise it is dropped.
+        """
+        if self.metrics is not None:
+            self.metrics.remove_sinks(self._config_sinks)
+        self._config_sinks = []
+        if not (self.config.get('metrics') or {}).get('enabled', False):
+            if not self._metrics_requested:
+                self.metrics = None
+            return
+        if self.metrics is None:
+            self.metrics = GenerationMetrics()
+        self._add_config_sinks(self.metrics)
+    
+    def _create_postprocessor(self) -> PostProcessor:
+        """Build the media post-processor from the 'postprocess' config."""
+        postprocess_config = self.config.get('postprocess') or {}
+        return PostProcessor(
+            workers=postprocess_config.get('workers', 0),
+            resize=postprocess_config.get('resize', True),
+            thumbnails=postprocess_config.get('thumbnails', True),
+            thumbnail_size=postprocess_config.get('thumbnail_size', 256)
+        )
+    
+    def _create_writer(self) -> AtomicWriter:
+        """Build the atomic file writer with the 'storage' config's durability policy."""
+        storage_config = self.config.get('storage') or {}
+        return AtomicWriter(
+            mode=storage_config.get('durability', 'none'),
+            group_files=storage_config.get('group_commit_files', 64),
+            group_ms=storage_config.get('group_commit_ms', 100)
+        )
+    
+    def enable_metrics(self, *sinks: Callable[[Dict[str, Any]], None]) -> GenerationMetrics:
+        """
+        Turn on per-stage timing, creating the metrics registry if needed.
+        
+        Args:
+            *sinks: Extra callables to receive one record per generation
+            
+        Returns:
+            The generator's metrics registry
+        """
+        if self.metrics is None:
+            self.metrics = GenerationMetrics()
+        self._metrics_requested = True
+        for sink in sinks:
+            self.metrics.add_sink(sink)
+        return self.metrics
+    
+    def disable_cache(self):
+        """
+        Turn off the result cache, so every call generates new output.
+        
+        Identical requests in progress are still coalesced. The change is made
+        to the config (and to the views of other output directories), so the
+        calls that start from now on see it; reloading the config file applies
+        the file's 'cache' settings again.
+        """
+        with self._reload_lock:
+            cache_config = dict(self.config.get('cache') or {}, enabled=False)
+            config = dict(self.config, cache=cache_config)
+            for generator in [self] + self._all_views():
+                generator.config = config
+                generator.cache = None
+                generator._state = _GenerationState(generator)
+    
+    def _record_metrics(self, media_type: str, timer: Optional[StageTimer], status: str):
+        """Record a finished generation if metrics are enabled."""
+        if timer is not None and self.metrics is not None:
+            self.metrics.record(media_type, timer, status)
+    
+    def close(self):
+        """Release backend resources such as pooled connections."""
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+        for backend in set(self.backends.values()):
+            backend.close()
+        if self.metrics is not None:
+            self.metrics.close()
+        self.postprocessor.close()
+        self.writer.close()
+        views = self._all_views()
+        with self._views_lock:
+            self._views.clear()
+            self._detached_views.clear()
+        for generator in views + [self]:
+            generator._close_view()
+        for resource in self._retired:
+            resource.close()
+        self._retired.clear()
+    
+    @staticmethod
+    def _cache_key(state: _GenerationState, media_type: str, prompt: str, params: Dict[str, Any]) -> str:
+        """
+        Return the cache key for a request.
+        
+        The key also identifies the request for coalescing, so it is
+        computed whether or not caching is enabled.
+        """
+        return ResultCache.make_key(media_type, prompt, params, state.backends[media_type].cache_id)
+    
+    @staticmethod
+    def _cache_lookup(state: _GenerationState, cache_key: Optional[str]) -> Optional[str]:
+        """Return the cached artifact path for ``cache_key``, if any."""
+        if cache_key is None or state.cache is None:
+            return None
+        return state.cache.get(cache_key)
+    
+    @staticmethod
+    def _cache_store(state: _GenerationState, cache_key: Optional[str], path: str):
+        """Remember ``path`` as the artifact for ``cache_key``."""
+        if cache_key is not None and state.cache is not None:
+            state.cache.put(cache_key, path)
+    
     def _ensure_output_dir(self):
         """Create output directory if it doesn't exist."""
         if not os.path.exists(self.output_dir):
@@ -51,15 +867,317 @@ class UnlimitedMultimediaGenerator:
     
     def _get_timestamp(self) -> tuple[str, str]:
         """
-        Generate consistent timestamp for filename and metadata.
+        Generate a unique artifact ID and a consistent timestamp for metadata.
+        
+        The ID is derived from the same clock reading as the timestamp, sorts
+        by creation time and is unique across threads and processes, so it is
+        safe to use in filenames under parallel or high-rate generation.
+        
+        Returns:
+            Tuple of (artifact_id, iso_timestamp)
+        """
+        now_ns = time.time_ns()
+        artifact_id = _artifact_ids.new_id(now_ns)
+        iso_ts = datetime.fromtimestamp(now_ns / 1e9, tz=timezone.utc).isoformat()
+        return artifact_id, iso_ts
+    
+    def _resolve_params(self, media_type: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check ``media_type`` is enabled and resolve its generation parameters.
+        
+        Args:
+            media_type: One of 'text', 'image', 'audio', 'video'
+            kwargs: Parameters passed by the caller
+            
+        Returns:
+            Parameters with the compiled defaults filled in
+        """
+        return self.compiled.resolve(media_type, kwargs)
+    
+    def _artifact_path(self, state: _GenerationState, media_type: str, artifact_id: str,
+                       params: Dict[str, Any]) -> str:
+        """
+        Return the output path for a new artifact, creating its directory.
+        
+        The 'storage.layout' config decides the directory: the output
+        directory itself ('flat'), a YYYY/MM/DD subdirectory for the UTC date
+        encoded in the artifact ID ('date'), or one of 256 subdirectories
+        named by a hash of the ID ('hash'). Each call computes the path once,
+        from the state it started with, and hands it to every later stage.
+        """
+        extension = 'txt' if media_type == 'text' else params['format']
+        layout = state.compiled.layout
+        if layout == 'flat':
+            return f"{state.output_dir}/{media_type}_{artifact_id}.{extension}"
+        if layout == 'date':
+            shard = time.strftime('%Y/%m/%d', time.gmtime(_artifact_ids.timestamp_ms(artifact_id) / 1000))
+        else:
+            shard = hashlib.sha1(artifact_id.encode('ascii')).hexdigest()[:2]
+        directory = f"{state.output_dir}/{shard}"
+        if directory not in self._shard_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._shard_dirs.add(directory)
+        return f"{directory}/{media_type}_{artifact_id}.{extension}"
+    
+    @staticmethod
+    def _join_flight(state: _GenerationState, cache_key: str) -> Flight:
+        """
+        Join the identical request in progress for ``cache_key``, or lead it.
+        
+        Requests are coalesced per output directory whether or not caching
+        is enabled.
+        
+        Returns:
+            The caller's flight
+        """
+        return state.inflight.join(cache_key)
+    
+    def _cached_result(self, media_type: str, path: str, prompt: str, params: Dict[str, Any],
+                       coalesced: bool = False) -> str:
+        """Return the cached result for ``media_type``: file content for text, the path otherwise."""
+        if coalesced:
+            self.events.emit(CACHE_HIT, media_type=media_type, path=path, prompt=prompt, params=params,
+                             coalesced=True)
+        else:
+            self.events.emit(CACHE_HIT, media_type=media_type, path=path, prompt=prompt, params=params)
+        if media_type == 'text':
+            with open(path, 'r') as f:
+                return f.read()
+        return path
+    
+    def _save_artifact(self, state: _GenerationState, media_type: str, prompt: str, params: Dict[str, Any],
+                       payload: Optional[Union[str, bytes]], artifact_id: str, iso_ts: str, filename: str,
+                       backend: Backend, cache_key: Optional[str],
+                       timer: Optional[StageTimer] = None,
+                       segments: Optional[SegmentedVideo] = None) -> str:
+        """
+        Write a backend result to disk and record it in the cache.
+        
+        Text is saved as-is; media bytes (if any) are written to ``filename``,
+        post-processed (resized, thumbnailed) and described by a JSON
+        metadata sidecar, or a record in the metadata log. A segmented video
+        (``segments``) has already been joined into ``filename``. Files are
+        written atomically with the writer of ``state`` and made durable per
+        its 'storage.durability' policy. Stage durations are added to
+        ``timer`` when one is given.
+        
+        Returns:
+            The generated text for 'text', otherwise the artifact path
+        """
+        if media_type == 'text':
+            size = state.writer.write(filename, payload)
+            if timer:
+                timer.mark('write')
+            self._cache_store(state, cache_key, filename)
+            if timer:
+                timer.mark('cache')
+            self.events.emit(ARTIFACT_WRITTEN, media_type='text', path=filename, artifact_id=artifact_id,
+                             size=size, prompt=prompt, params=params)
+            if timer:
+                timer.mark('report')
+            return payload
+        
+        size = None
+        if payload is not None:
+            size = state.writer.write(filename, payload)
+        elif segments is not None and segments.joined:
+            size = os.path.getsize(filename)
+        if timer:
+            timer.mark('write')
+        
+        postprocessed = None
+        if size is not None and state.postprocessor.handles(media_type):
+            postprocessed = state.postprocessor.process(media_type, filename, params, state.writer)
+            if postprocessed.keys() & {'resized', 'transcoded'}:
+                size = os.path.getsize(filename)
+            if timer:
+                timer.mark('postprocess')
+        
+        metadata = {'id': artifact_id, 'prompt': prompt}
+        metadata.update(params)
+        metadata['generated_at'] = iso_ts
+        metadata.setdefault('type', media_type)
+        metadata['backend'] = backend.name
+        if segments is not None:
+            metadata['segments'] = segments.info()
+        if postprocessed:
+            metadata['postprocess'] = postprocessed
+        
+        metadata_offset = None
+        if state.metadata_log is not None:
+            metadata_file, metadata_offset = state.metadata_log.append(filename, metadata)
+        else:
+            serialized = json.dumps(metadata, indent=2)
+            if timer:
+                timer.mark('serialize')
+            
+            metadata_file = f"{filename}.json"
+            state.writer.write(metadata_file, serialized)
+        if timer:
+            timer.mark('write')
+        self._cache_store(state, cache_key, filename)
+        if timer:
+            timer.mark('cache')
+        
+        self.events.emit(ARTIFACT_WRITTEN, media_type=media_type, path=filename, artifact_id=artifact_id,
+                         size=size, metadata_path=metadata_file, metadata_offset=metadata_offset,
+                         prompt=prompt, params=params)
+        if timer:
+            timer.mark('report')
+        
+        return filename
+    
+    def _plan_segments(self, state: _GenerationState, media_type: str, filename: str,
+                       params: Dict[str, Any]) -> Optional[SegmentedVideo]:
+        """
+        Plan a segmented generation for the long video at ``filename``.
         
         Returns:
-            Tuple of (filename_timestamp, iso_timestamp)
+            The segments, or None to generate the artifact in one backend
+            call (not a video, segmenting disabled, short enough to fit in
+            one segment, or a format whose segments cannot be joined here,
+            which is reported as a segments-skipped event)
+        """
+        segment_config = state.config.get('video_segments') or {}
+        if media_type != 'video' or not segment_config.get('enabled', False):
+            return None
+        segment_seconds = segment_config.get('segment_seconds', 10)
+        if params['duration'] <= segment_seconds:
+            return None
+        if not can_join(params['format']):
+            self.events.emit(SEGMENTS_SKIPPED, media_type=media_type, path=filename,
+                             reason=segmenting_limitation(params['format']))
+            return None
+        return SegmentedVideo(filename, params, segment_seconds, state.writer,
+                              playlist=segment_config.get('playlist', True),
+                              max_parallel=segment_config.get('max_parallel', 4))
+    
+    def _segment_done(self, segments: SegmentedVideo, index: int, path: Optional[str]):
+        """Emit a segment-done event."""
+        self.events.emit(SEGMENT_DONE, media_type='video', index=index, count=segments.count, path=path,
+                         playlist=segments.playlist_path, artifact=segments.path)
+    
+    def _generate_segments(self, segments: SegmentedVideo, prompt: str, backend: Backend, iso_ts: str):
+        """
+        Generate a video's segments in parallel and join them into its artifact.
+        
+        Segments are published (and byte-joinable ones appended to the
+        artifact) in order as they finish. If any segment fails, the others
+        are cancelled and everything written so far is removed.
+        """
+        with ThreadPoolExecutor(max_workers=min(segments.max_parallel, segments.count),
+                                thread_name_prefix='video-segment') as executor:
+            futures = {
+                executor.submit(backend.generate, 'video', prompt, segments.segment_params(index),
+                                generated_at=iso_ts): index
+                for index in range(segments.count)
+            }
+            try:
+                for future in as_completed(futures):
+                    index = futures[future]
+                    self._segment_done(segments, index, segments.add(index, future.result()))
+                segments.finish()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                segments.abort()
+                raise
+    
+    async def _agenerate_segments(self, segments: SegmentedVideo, prompt: str, backend: Backend, iso_ts: str):
+        """Async counterpart of ``_generate_segments``."""
+        semaphore = asyncio.Semaphore(segments.max_parallel)
+        
+        async def run(index):
+            async with semaphore:
+                payload = await backend.agenerate('video', prompt, segments.segment_params(index),
+                                                  generated_at=iso_ts)
+            return index, payload
+        
+        tasks = [asyncio.ensure_future(run(index)) for index in range(segments.count)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, payload = await next_done
+                self._segment_done(segments, index, await self._run_io(segments.add, index, payload))
+            await self._run_io(segments.finish)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            segments.abort()
+            raise
+    
+    def _stage_done(self, media_type: str, stage: str, started: float):
+        """Emit a stage-done event with the time elapsed since the job started."""
+        if self.events:
+            self.events.emit(STAGE_DONE, media_type=media_type, stage=stage,
+                             elapsed=time.perf_counter() - started)
+    
+    def _generate(self, media_type: str, prompt: str, params: Dict[str, Any]) -> str:
+        """
+        Run the cache lookup, backend call and save stages for one request.
+        
+        A request identical to one already in progress waits for that one
+        and shares its artifact instead of calling the backend again.
         """
-        now = datetime.now(timezone.utc)
-        filename_ts = now.strftime('%Y%m%d_%H%M%S')
-        iso_ts = now.isoformat()
-        return filename_ts, iso_ts
+        state = self._state
+        started = time.perf_counter()
+        self.events.emit(JOB_STARTED, media_type=media_type, prompt=prompt)
+        timer = StageTimer() if self.metrics is not None else None
+        flight = None
+        try:
+            cache_key = self._cache_key(state, media_type, prompt, params)
+            flight = self._join_flight(state, cache_key)
+            if not flight.leader:
+                path = flight.result()
+                if timer:
+                    timer.mark('coalesce')
+                result = self._cached_result(media_type, path, prompt, params, coalesced=True)
+                self._record_metrics(media_type, timer, 'coalesced')
+                return result
+            
+            cached = self._cache_lookup(state, cache_key)
+            if timer:
+                timer.mark('cache')
+            if cached:
+                flight.finish(cached)
+                result = self._cached_result(media_type, cached, prompt, params)
+                self._record_metrics(media_type, timer, 'cached')
+                return result
+            
+            # Get unique artifact ID and consistent timestamp
+            artifact_id, iso_ts = self._get_timestamp()
+            filename = self._artifact_path(state, media_type, artifact_id, params)
+            if timer:
+                timer.mark('timestamp')
+            
+            backend = state.backends[media_type]
+            segments = self._plan_segments(state, media_type, filename, params)
+            if segments is not None:
+                payload = None
+                self._generate_segments(segments, prompt, backend, iso_ts)
+            else:
+                payload = backend.generate(media_type, prompt, params, generated_at=iso_ts)
+            if timer:
+                timer.mark('backend')
+            self._stage_done(media_type, 'backend', started)
+            try:
+                result = self._save_artifact(state, media_type, prompt, params, payload, artifact_id, iso_ts,
+                                             filename, backend, cache_key, timer, segments)
+            except BaseException:
+                if segments is not None:
+                    segments.abort()
+                raise
+            flight.finish(filename)
+        except Exception as e:
+            if flight is not None:
+                flight.finish(error=e)
+            self._record_metrics(media_type, timer, 'failed')
+            self.events.emit(JOB_FAILED, media_type=media_type, prompt=prompt, error=str(e))
+            raise
+        finally:
+            if flight is not None:
+                flight.finish(error=RuntimeError("Identical generation was interrupted"))
+        self._record_metrics(media_type, timer, 'success')
+        return result
     
     def generate_text(self, prompt: str, **kwargs) -> str:
         """
@@ -72,41 +1190,62 @@ class UnlimitedMultimediaGenerator:
         Returns:
             Generated text content
         """
-        if not self.config.get('enable_text', True):
-            raise ValueError("Text generation is disabled in config")
-        
-        max_length = kwargs.get('max_length', 500)
-        temperature = kwargs.get('temperature', 0.7)
-        style = kwargs.get('style', 'creative')
+        return self._generate('text', prompt, self._resolve_params('text', kwargs))
+    
+    def stream_text(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Generate text content, yielding it in chunks as it is produced.
         
-        # Get consistent timestamp
-        filename_ts, iso_ts = self._get_timestamp()
-        readable_time = datetime.fromisoformat(iso_ts).strftime('%Y-%m-%d %H:%M:%S UTC')
+        Chunks are yielded as soon as they arrive, so the first words are
+        available long before the full text is done. They are written to a
+        temporary file that is renamed to the artifact path once the text is
+        complete, so an interrupted stream never leaves a partial artifact.
         
-        # Simulated text generation (in real implementation, would use GPT, Claude, etc.)
-        generated_text = f"""Generated Text (Prompt: "{prompt}")
+        Args:
+            prompt: The prompt for text generation
+            **kwargs: Additional parameters (max_length, temperature, etc.)
+            
+        Yields:
+            Chunks of generated text; joined, they equal ``generate_text``'s result
+        """
+        params = self._resolve_params('text', kwargs)
+        state = self._state
+        started = time.perf_counter()
+        self.events.emit(JOB_STARTED, media_type='text', prompt=prompt)
+        timer = StageTimer() if self.metrics is not None else None
+        cache_key = self._cache_key(state, 'text', prompt, params)
+        cached = self._cache_lookup(state, cache_key)
+        if timer:
+            timer.mark('cache')
+        if cached:
+            yield self._cached_result('text', cached, prompt, params)
+            self._record_metrics('text', timer, 'cached')
+            return
         
-Style: {style}
-Temperature: {temperature}
-Max Length: {max_length}
-
-[AI-Generated Content]
-This is a powerful AI multimedia generator that creates unlimited content.
-Based on your prompt: "{prompt}"
-
-The system is designed to be flexible, extensible, and capable of generating
-various types of multimedia content without artificial limitations.
-
-Generated at: {readable_time}
-"""
+        # Get unique artifact ID and consistent timestamp
+        artifact_id, iso_ts = self._get_timestamp()
+        filename = self._artifact_path(state, 'text', artifact_id, params)
+        if timer:
+            timer.mark('timestamp')
         
-        # Save to file
-        filename = f"{self.output_dir}/text_{filename_ts}.txt"
-        with open(filename, 'w') as f:
-            f.write(generated_text)
+        try:
+            with state.writer.open(filename) as f:
+                for chunk in state.backends['text'].stream('text', prompt, params, generated_at=iso_ts):
+                    f.write(chunk)
+                    yield chunk
+                size = f.tell()
+        except Exception as e:
+            self._record_metrics('text', timer, 'failed')
+            self.events.emit(JOB_FAILED, media_type='text', prompt=prompt, error=str(e))
+            raise
+        if timer:
+            timer.mark('stream')
+        self._stage_done('text', 'stream', started)
+        self._cache_store(state, cache_key, filename)
         
-        print(f"✓ Text generated and saved to: {filename}")
-        return generated_text
+        self.events.emit(ARTIFACT_WRITTEN, media_type='text', path=filename, artifact_id=artifact_id,
+                         size=size, prompt=prompt, params=params)
+        self._record_metrics('text', timer, 'success')
     
     def generate_image(self, prompt: str, **kwargs) -> str:
         """
@@ -119,38 +1258,7 @@ Generated at: {readable_time}
         Returns:
             Path to generated image file
         """
-        if not self.config.get('enable_image', True):
-            raise ValueError("Image generation is disabled in config")
-        
-        size = kwargs.get('size', '1024x1024')
-        style = kwargs.get('style', 'realistic')
-        img_format = kwargs.get('format', self.config.get('default_format', 'png'))
-        
-        # Get consistent timestamp
-        filename_ts, iso_ts = self._get_timestamp()
-        filename = f"{self.output_dir}/image_{filename_ts}.{img_format}"
-        
-        # Create placeholder image metadata file
-        metadata = {
-            'prompt': prompt,
-            'size': size,
-            'style': style,
-            'format': img_format,
-            'generated_at': iso_ts,
-            'type': 'image'
-        }
-        
-        metadata_file = f"{filename}.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        # In real implementation, would call DALL-E, Midjourney, Stable Diffusion, etc.
-        print(f"✓ Image generation initiated: {filename}")
-        print(f"  Prompt: {prompt}")
-        print(f"  Size: {size}, Style: {style}")
-        print(f"  Metadata saved to: {metadata_file}")
-        
-        return filename
+        return self._generate('image', prompt, self._resolve_params('image', kwargs))
     
     def generate_audio(self, prompt: str, **kwargs) -> str:
         """
@@ -163,39 +1271,7 @@ Generated at: {readable_time}
         Returns:
             Path to generated audio file
         """
-        if not self.config.get('enable_audio', True):
-            raise ValueError("Audio generation is disabled in config")
-        
-        audio_type = kwargs.get('type', 'speech')  # speech, music, sound_effect
-        voice = kwargs.get('voice', 'neutral')
-        duration = kwargs.get('duration', 'auto')
-        audio_format = kwargs.get('format', 'mp3')
-        
-        # Get consistent timestamp
-        filename_ts, iso_ts = self._get_timestamp()
-        filename = f"{self.output_dir}/audio_{filename_ts}.{audio_format}"
-        
-        # Create audio metadata
-        metadata = {
-            'prompt': prompt,
-            'type': audio_type,
-            'voice': voice,
-            'duration': duration,
-            'format': audio_format,
-            'generated_at': iso_ts
-        }
-        
-        metadata_file = f"{filename}.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        # In real implementation, would use ElevenLabs, Google TTS, MusicGen, etc.
-        print(f"✓ Audio generation initiated: {filename}")
-        print(f"  Type: {audio_type}, Voice: {voice}")
-        print(f"  Prompt: {prompt}")
-        print(f"  Metadata saved to: {metadata_file}")
-        
-        return filename
+        return self._generate('audio', prompt, self._resolve_params('audio', kwargs))
     
     def generate_video(self, prompt: str, **kwargs) -> str:
         """
@@ -208,84 +1284,536 @@ Generated at: {readable_time}
         Returns:
             Path to generated video file
         """
-        if not self.config.get('enable_video', True):
-            raise ValueError("Video generation is disabled in config")
-        
-        duration = kwargs.get('duration', 5)
-        resolution = kwargs.get('resolution', '1920x1080')
-        fps = kwargs.get('fps', 30)
-        style = kwargs.get('style', 'realistic')
-        video_format = kwargs.get('format', 'mp4')
-        
-        # Get consistent timestamp
-        filename_ts, iso_ts = self._get_timestamp()
-        filename = f"{self.output_dir}/video_{filename_ts}.{video_format}"
-        
-        # Create video metadata
-        metadata = {
-            'prompt': prompt,
-            'duration': duration,
-            'resolution': resolution,
-            'fps': fps,
-            'style': style,
-            'format': video_format,
-            'generated_at': iso_ts,
-            'type': 'video'
+        return self._generate('video', prompt, self._resolve_params('video', kwargs))
+    
+    async def _run_io(self, func: Callable, *args):
+        """Run blocking file I/O on the generator's small I/O thread pool."""
+        if self._io_executor is None:
+            with self._io_executor_lock:
+                if self._io_executor is None:
+                    self._io_executor = ThreadPoolExecutor(
+                        max_workers=self.config.get('io_workers', 4),
+                        thread_name_prefix='generator-io'
+                    )
+                    self._owned.append(self._io_executor.shutdown)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, func, *args)
+    
+    async def _agenerate(self, media_type: str, prompt: str, params: Dict[str, Any]) -> str:
+        """Async counterpart of ``_generate``: awaits the backend and offloads file I/O."""
+        state = self._state
+        started = time.perf_counter()
+        self.events.emit(JOB_STARTED, media_type=media_type, prompt=prompt)
+        timer = StageTimer() if self.metrics is not None else None
+        flight = None
+        try:
+            cache_key = self._cache_key(state, media_type, prompt, params)
+            flight = self._join_flight(state, cache_key)
+            if not flight.leader:
+                # Shielded: a cancelled follower must not cancel the leader's future
+                path = await asyncio.shield(asyncio.wrap_future(flight.future))
+                if timer:
+                    timer.mark('coalesce')
+                result = await self._run_io(self._cached_result, media_type, path, prompt, params, True)
+                self._record_metrics(media_type, timer, 'coalesced')
+                return result
+            
+            cached = await self._run_io(self._cache_lookup, state, cache_key)
+            if timer:
+                timer.mark('cache')
+            if cached:
+                flight.finish(cached)
+                result = await self._run_io(self._cached_result, media_type, cached, prompt, params)
+                self._record_metrics(media_type, timer, 'cached')
+                return result
+            
+            # Get unique artifact ID and consistent timestamp
+            artifact_id, iso_ts = self._get_timestamp()
+            filename = self._artifact_path(state, media_type, artifact_id, params)
+            if timer:
+                timer.mark('timestamp')
+            
+            backend = state.backends[media_type]
+            segments = self._plan_segments(state, media_type, filename, params)
+            if segments is not None:
+                payload = None
+                await self._agenerate_segments(segments, prompt, backend, iso_ts)
+            else:
+                payload = await backend.agenerate(media_type, prompt, params, generated_at=iso_ts)
+            if timer:
+                timer.mark('backend')
+            self._stage_done(media_type, 'backend', started)
+            try:
+                result = await self._run_io(self._save_artifact, state, media_type, prompt, params, payload,
+                                            artifact_id, iso_ts, filename, backend, cache_key, timer, segments)
+            except BaseException:
+                if segments is not None:
+                    await self._run_io(segments.abort)
+                raise
+            flight.finish(filename)
+        except Exception as e:
+            if flight is not None:
+                flight.finish(error=e)
+            self._record_metrics(media_type, timer, 'failed')
+            self.events.emit(JOB_FAILED, media_type=media_type, prompt=prompt, error=str(e))
+            raise
+        finally:
+            if flight is not None:
+                flight.finish(error=RuntimeError("Identical generation was interrupted"))
+        self._record_metrics(media_type, timer, 'success')
+        return result
+    
+    async def agenerate_text(self, prompt: str, **kwargs) -> str:
+        """Async version of ``generate_text``."""
+        return await self._agenerate('text', prompt, self._resolve_params('text', kwargs))
+    
+    async def astream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Async version of ``stream_text``."""
+        params = self._resolve_params('text', kwargs)
+        state = self._state
+        started = time.perf_counter()
+        self.events.emit(JOB_STARTED, media_type='text', prompt=prompt)
+        timer = StageTimer() if self.metrics is not None else None
+        cache_key = self._cache_key(state, 'text', prompt, params)
+        cached = await self._run_io(self._cache_lookup, state, cache_key)
+        if timer:
+            timer.mark('cache')
+        if cached:
+            yield await self._run_io(self._cached_result, 'text', cached, prompt, params)
+            self._record_metrics('text', timer, 'cached')
+            return
+        
+        # Get unique artifact ID and consistent timestamp
+        artifact_id, iso_ts = self._get_timestamp()
+        filename = self._artifact_path(state, 'text', artifact_id, params)
+        if timer:
+            timer.mark('timestamp')
+        
+        f = await self._run_io(state.writer.open, filename)
+        committed = False
+        try:
+            async for chunk in state.backends['text'].astream('text', prompt, params, generated_at=iso_ts):
+                await self._run_io(f.write, chunk)
+                yield chunk
+            size = await self._run_io(f.tell)
+            await self._run_io(f.commit)
+            committed = True
+        except Exception as e:
+            self._record_metrics('text', timer, 'failed')
+            self.events.emit(JOB_FAILED, media_type='text', prompt=prompt, error=str(e))
+            raise
+        finally:
+            if not committed:
+                await self._run_io(f.abort)
+        if timer:
+            timer.mark('stream')
+        self._stage_done('text', 'stream', started)
+        self._cache_store(state, cache_key, filename)
+        
+        self.events.emit(ARTIFACT_WRITTEN, media_type='text', path=filename, artifact_id=artifact_id,
+                         size=size, prompt=prompt, params=params)
+        self._record_metrics('text', timer, 'success')
+    
+    async def agenerate_image(self, prompt: str, **kwargs) -> str:
+        """Async version of ``generate_image``."""
+        return await self._agenerate('image', prompt, self._resolve_params('image', kwargs))
+    
+    async def agenerate_audio(self, prompt: str, **kwargs) -> str:
+        """Async version of ``generate_audio``."""
+        return await self._agenerate('audio', prompt, self._resolve_params('audio', kwargs))
+    
+    async def agenerate_video(self, prompt: str, **kwargs) -> str:
+        """Async version of ``generate_video``."""
+        return await self._agenerate('video', prompt, self._resolve_params('video', kwargs))
+    
+    def _generate_by_type(self, media_type: str, prompt: str, **params) -> str:
+        """Dispatch a generation request to the method for ``media_type``."""
+        generators = {
+            'text': self.generate_text,
+            'image': self.generate_image,
+            'audio': self.generate_audio,
+            'video': self.generate_video,
         }
+        if media_type not in generators:
+            raise ValueError(f"Unknown media type: {media_type}")
+        return generators[media_type](prompt, **params)
+    
+    def generate_batch(self, jobs: Iterable[Dict[str, Any]],
+                       max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream many generation jobs through a bounded worker pool.
         
-        metadata_file = f"{filename}.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        Jobs are pulled from ``jobs`` lazily and at most ``2 * max_workers``
+        are pending at any time, so memory use does not grow with the number
+        of jobs. Failures are reported per job instead of stopping the batch.
         
-        # In real implementation, would use Runway, Pika, Stable Video Diffusion, etc.
-        print(f"✓ Video generation initiated: {filename}")
-        print(f"  Duration: {duration}s, Resolution: {resolution}")
-        print(f"  Style: {style}, FPS: {fps}")
-        print(f"  Prompt: {prompt}")
-        print(f"  Metadata saved to: {metadata_file}")
+        Args:
+            jobs: Iterable of job dictionaries with 'type', 'prompt' and
+                optional 'id' and 'params' keys (see ``iter_batch_jobs``)
+            max_workers: Number of worker threads (defaults to the
+                'max_workers' config setting)
+            
+        Yields:
+            One result record per job, in completion order, with 'id', 'type',
+            'prompt', 'status' ('success' or 'failed'), 'result' or 'error'
+            (plus 'retryable', False for invalid jobs), and 'elapsed' seconds
+        """
+        if max_workers is None:
+            max_workers = self.config.get('max_workers', 4)
+        max_workers = max(1, int(max_workers))
+        max_pending = max_workers * 2
         
-        return filename
+        jobs = iter(jobs)
+        index = 0
+        exhausted = False
+        pending = set()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch') as executor:
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        job = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    index += 1
+                    pending.add(executor.submit(self._run_batch_job, index, job))
+                
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
     
-    def generate_multimedia_project(self, prompts: Dict[str, str], **kwargs) -> Dict[str, str]:
+    def _run_batch_job(self, index: int, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one batch job, turning any failure into a 'failed' record."""
+        started = time.perf_counter()
+        media_type = job.get('type')
+        prompt = job.get('prompt')
+        record = {'id': job.get('id') or index, 'type': media_type, 'prompt': prompt}
+        
+        params = dict(job.get('params') or {})
+        params.update((key, value) for key, value in job.items() if key not in BATCH_JOB_FIELDS)
+        
+        try:
+            if not prompt:
+                raise ValueError("Job has no prompt")
+            record['result'] = self._generate_by_type(media_type, prompt, **params)
+            record['status'] = 'success'
+        except Exception as e:
+            record['status'] = 'failed'
+            record['error'] = str(e)
+            # Invalid jobs (unknown type, missing prompt, ...) fail the same way every time
+            record['retryable'] = not isinstance(e, ValueError)
+        
+        record['elapsed'] = round(time.perf_counter() - started, 6)
+        return record
+    
+    def generate_multimedia_project(self, prompts: Dict[str, str],
+                                    concurrent: Optional[bool] = None,
+                                    max_workers: Optional[int] = None,
+                                    progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                                    **kwargs) -> Dict[str, str]:
         """
         Generate a complete multimedia project with multiple content types.
         
         Args:
             prompts: Dictionary with keys 'text', 'image', 'audio', 'video' and their prompts
+            concurrent: Run the per-type jobs in parallel (defaults to the
+                'concurrent_projects' config setting)
+            max_workers: Maximum number of jobs in flight at once (defaults to
+                the 'max_workers' config setting)
+            progress_callback: Called as ``(media_type, completed, total)`` in
+                the calling thread each time a job finishes
             **kwargs: Additional parameters for each generation type
             
         Returns:
             Dictionary with paths to all generated files
+            
+        Raises:
+            ProjectGenerationError: In concurrent mode, if any job failed. The
+                remaining jobs still run to completion.
         """
-        results = {}
+        if concurrent is None:
+            concurrent = self.config.get('concurrent_projects', True)
+        
+        jobs = [
+            (media_type, prompts[media_type], kwargs.get(f'{media_type}_params', {}))
+            for media_type in MEDIA_TYPES if media_type in prompts
+        ]
+        
+        self.events.emit(PROJECT_STARTED, media_types=[media_type for media_type, _, _ in jobs],
+                         concurrent=bool(concurrent))
+        
+        if concurrent:
+            try:
+                results = self._generate_project_concurrently(jobs, max_workers, progress_callback)
+            except ProjectGenerationError as e:
+                self.events.emit(PROJECT_FAILED, output_dir=self.output_dir, results=e.results,
+                                 errors={media_type: str(error) for media_type, error in e.errors.items()},
+                                 params=kwargs)
+                raise
+        else:
+            results = {}
+            for completed, (media_type, prompt, params) in enumerate(jobs, 1):
+                self.events.emit(PROJECT_JOB_STARTED, media_type=media_type, index=completed,
+                                 total=len(jobs), concurrent=False)
+                results[media_type] = self._generate_by_type(media_type, prompt, **params)
+                self.events.emit(PROJECT_JOB_DONE, media_type=media_type, completed=completed, total=len(jobs))
+                if progress_callback:
+                    progress_callback(media_type, completed, len(jobs))
+        
+        self.events.emit(PROJECT_DONE, output_dir=self.output_dir, results=results, params=kwargs)
+        
+        return results
+    
+    def _generate_project_concurrently(self, jobs: List[tuple],
+                                       max_workers: Optional[int],
+                                       progress_callback: Optional[Callable[[str, int, int], None]]) -> Dict[str, str]:
+        """Run project jobs on a thread pool, collecting per-job failures."""
+        if max_workers is None:
+            max_workers = self.config.get('max_workers', 4)
+        max_workers = max(1, min(int(max_workers), len(jobs) or 1))
         
-        print("\n" + "="*60)
-        print("UNLIMITED MULTIMEDIA PROJECT GENERATION")
-        print("="*60 + "\n")
+        completed_results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='project') as executor:
+            futures = {}
+            for index, (media_type, prompt, params) in enumerate(jobs, 1):
+                self.events.emit(PROJECT_JOB_STARTED, media_type=media_type, index=index,
+                                 total=len(jobs), concurrent=True)
+                future = executor.submit(self._generate_by_type, media_type, prompt, **params)
+                futures[future] = media_type
+            
+            for completed, future in enumerate(as_completed(futures), 1):
+                media_type = futures[future]
+                try:
+                    completed_results[media_type] = future.result()
+                except Exception as e:
+                    errors[media_type] = e
+                    self.events.emit(PROJECT_JOB_FAILED, media_type=media_type, error=str(e))
+                self.events.emit(PROJECT_JOB_DONE, media_type=media_type, completed=completed, total=len(jobs))
+                if progress_callback:
+                    progress_callback(media_type, completed, len(jobs))
         
-        if 'text' in prompts:
-            print("📝 Generating text content...")
-            results['text'] = self.generate_text(prompts['text'], **kwargs.get('text_params', {}))
+        # Keep the same key order as a sequential run
+        results = {media_type: completed_results[media_type]
+                   for media_type, _, _ in jobs if media_type in completed_results}
+        if errors:
+            raise ProjectGenerationError(results, errors)
+        return results
+    
+    async def agenerate_multimedia_project(self, prompts: Dict[str, str],
+                                           max_workers: Optional[int] = None,
+                                           **kwargs) -> Dict[str, str]:
+        """
+        Async version of ``generate_multimedia_project``.
         
-        if 'image' in prompts:
-            print("\n🖼️  Generating image content...")
-            results['image'] = self.generate_image(prompts['image'], **kwargs.get('image_params', {}))
+        All per-type jobs run concurrently on the event loop via
+        ``asyncio.gather``; ``max_workers`` caps how many are in flight.
         
-        if 'audio' in prompts:
-            print("\n🔊 Generating audio content...")
-            results['audio'] = self.generate_audio(prompts['audio'], **kwargs.get('audio_params', {}))
+        Args:
+            prompts: Dictionary with keys 'text', 'image', 'audio', 'video' and their prompts
+            max_workers: Maximum number of jobs in flight at once
+            **kwargs: Additional parameters for each generation type
+            
+        Returns:
+            Dictionary with paths to all generated files
+            
+        Raises:
+            ProjectGenerationError: If any job failed, once all jobs have finished
+        """
+        generators = {
+            'text': self.agenerate_text,
+            'image': self.agenerate_image,
+            'audio': self.agenerate_audio,
+            'video': self.agenerate_video,
+        }
+        jobs = [media_type for media_type in MEDIA_TYPES if media_type in prompts]
+        if max_workers is None:
+            max_workers = self.config.get('max_workers', 4)
+        slots = asyncio.Semaphore(max(1, int(max_workers)))
         
-        if 'video' in prompts:
-            print("\n🎬 Generating video content...")
-            results['video'] = self.generate_video(prompts['video'], **kwargs.get('video_params', {}))
+        async def run(media_type):
+            async with slots:
+                return await generators[media_type](
+                    prompts[media_type], **kwargs.get(f'{media_type}_params', {})
+                )
         
-        print("\n" + "="*60)
-        print("✅ MULTIMEDIA PROJECT COMPLETE!")
-        print("="*60)
-        print(f"\nAll files saved to: {self.output_dir}/")
+        outcomes = await asyncio.gather(*(run(media_type) for media_type in jobs), return_exceptions=True)
         
+        results = {}
+        errors = {}
+        for media_type, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                errors[media_type] = outcome
+            else:
+                results[media_type] = outcome
+        if errors:
+            self.events.emit(PROJECT_FAILED, output_dir=self.output_dir, results=results,
+                             errors={media_type: str(error) for media_type, error in errors.items()},
+                             params=kwargs)
+            raise ProjectGenerationError(results, errors)
+        self.events.emit(PROJECT_DONE, output_dir=self.output_dir, results=results, params=kwargs)
         return results
 
+def _open_batch_queue(generator: UnlimitedMultimediaGenerator, queue_path: str,
+                      max_attempts: Optional[int] = None) -> BatchQueue:
+    """Open a batch queue with the generator's 'batch' retry settings."""
+    batch_config = generator.config.get('batch') or {}
+    return BatchQueue(
+        queue_path,
+        max_attempts=max_attempts or batch_config.get('max_attempts', 3),
+        retry_backoff=batch_config.get('retry_backoff', 1.0),
+        max_backoff=batch_config.get('max_backoff', 60.0)
+    )
+
+
+def run_batch(generator: UnlimitedMultimediaGenerator, jobs_path: str,
+              results_path: Optional[str] = None, max_workers: Optional[int] = None,
+              report_interval: float = 5.0, queue_path: Optional[str] = None,
+              max_attempts: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run a batch job file through a durable queue and append one JSON result line per job.
+    
+    Jobs are first added to a SQLite queue (``<jobs_path>.queue.db`` by
+    default) under their idempotency key, then drained: each outcome is
+    checkpointed in the queue as soon as it is known, and failed jobs are
+    retried with exponential backoff. Running the same job file again, or
+    ``resume_batch`` after a crash, only runs the jobs that are not done.
+    Results are written as jobs complete and a batch-progress event with the
+    current throughput is emitted every ``report_interval`` seconds.
+    
+    Args:
+        generator: Generator used to run the jobs
+        jobs_path: Path to a .jsonl or .csv job file
+        results_path: Output JSONL path (defaults to the queue's previous
+            results file, or a timestamped file in the generator's output
+            directory)
+        max_workers: Number of worker threads
+        report_interval: Seconds between batch-progress events
+        queue_path: Queue database (defaults to ``<jobs_path>.queue.db``)
+        max_attempts: Attempts per job (defaults to the 'batch' config)
+        
+    Returns:
+        Summary with 'total', 'succeeded', 'failed', 'retried', 'elapsed',
+        'results_path' and the queue's job 'counts' by state
+    """
+    with _open_batch_queue(generator, queue_path or f"{jobs_path}.queue.db", max_attempts) as queue:
+        queue.enqueue(iter_batch_jobs(jobs_path))
+        if queue.get_meta('jobs_path') is None:
+            queue.set_meta('jobs_path', jobs_path)
+        return _drain_batch_queue(generator, queue, results_path, max_workers, report_interval)
+
+
+def resume_batch(generator: UnlimitedMultimediaGenerator, path: str,
+                 results_path: Optional[str] = None, max_workers: Optional[int] = None,
+                 report_interval: float = 5.0, max_attempts: Optional[int] = None,
+                 retry_failed: bool = False) -> Dict[str, Any]:
+    """
+    Finish an interrupted batch run.
+    
+    Jobs that were running when the previous run stopped are queued again;
+    jobs already done are not re-run.
+    
+    Args:
+        generator: Generator used to run the jobs
+        path: Queue database, or the job file it was created from
+        results_path: Output JSONL path (defaults to the previous run's)
+        max_workers: Number of worker threads
+        report_interval: Seconds between batch-progress events
+        max_attempts: Attempts per job (defaults to the 'batch' config)
+        retry_failed: Also re-run jobs that used up their attempts
+        
+    Returns:
+        Summary as returned by ``run_batch``
+        
+    Raises:
+        FileNotFoundError: If there is no queue for ``path``
+    """
+    queue_path = path
+    if os.path.exists(f"{path}.queue.db"):
+        queue_path = f"{path}.queue.db"
+    elif not os.path.exists(path):
+        raise FileNotFoundError(f"No batch queue found for: {path}")
+    
+    with _open_batch_queue(generator, queue_path, max_attempts) as queue:
+        if retry_failed:
+            queue.retry_failed()
+        return _drain_batch_queue(generator, queue, results_path, max_workers, report_interval)
+
+
+def _drain_batch_queue(generator: UnlimitedMultimediaGenerator, queue: BatchQueue,
+                       results_path: Optional[str], max_workers: Optional[int],
+                       report_interval: float) -> Dict[str, Any]:
+    """
+    Run queued jobs until none are pending, checkpointing each outcome.
+    
+    A finished job's result line is written and flushed before the job is
+    checkpointed as done or failed, so a crash can at worst repeat a line on
+    resume, never lose one.
+    """
+    if results_path is None:
+        results_path = queue.get_meta('results_path')
+    if results_path is None:
+        artifact_id, _ = generator._get_timestamp()
+        results_path = f"{generator.output_dir}/batch_results_{artifact_id}.jsonl"
+    queue.set_meta('results_path', results_path)
+    
+    events = generator.events
+    events.emit(BATCH_STARTED, jobs_path=queue.get_meta('jobs_path') or queue.path, results_path=results_path)
+    
+    total = succeeded = failed = retried = 0
+    started = last_report = time.perf_counter()
+    with open(results_path, 'a') as out:
+        while True:
+            for record in generator.generate_batch(queue.iter_claimed(), max_workers=max_workers):
+                key = record['id']
+                success = record['status'] == 'success'
+                retryable = not success and record.pop('retryable', True)
+                if success or not retryable or queue.is_last_attempt(key):
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    total += 1
+                
+                if success:
+                    queue.complete(key, record['result'])
+                    succeeded += 1
+                else:
+                    delay, attempt = queue.fail(key, record['error'], retry=retryable)
+                    if delay is not None:
+                        retried += 1
+                        events.emit(JOB_RETRY, media_type=record['type'], id=key, attempt=attempt,
+                                    delay=delay, error=record['error'])
+                        continue
+                    failed += 1
+                
+                now = time.perf_counter()
+                if now - last_report >= report_interval:
+                    last_report = now
+                    events.emit(BATCH_PROGRESS, total=total, succeeded=succeeded, failed=failed,
+                                rate=total / (now - started))
+            
+            # Wait for the earliest scheduled retry, if any
+            delay = queue.next_retry_delay()
+            if delay is None:
+                break
+            time.sleep(delay)
+    
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0.0
+    events.emit(BATCH_DONE, total=total, succeeded=succeeded, failed=failed, elapsed=elapsed,
+                rate=rate, results_path=results_path)
+    
+    return {
+        'total': total,
+        'succeeded': succeeded,
+        'failed': failed,
+        'retried': retried,
+        'elapsed': elapsed,
+        'results_path': results_path,
+        'counts': queue.counts(),
+    }
+
 
 def main():
     """Command-line interface for the multimedia generator."""
@@ -308,12 +1836,27 @@ Examples:
   
   # Generate complete project
   python multimedia_generator.py project --config project_config.json
+  
+  # Run a batch of jobs from a JSONL or CSV file
+  python multimedia_generator.py batch jobs.jsonl --max-workers 16
+  
+  # Finish an interrupted batch run
+  python multimedia_generator.py resume jobs.jsonl
+  
+  # Show the 20 most recent image generations
+  python multimedia_generator.py history image --limit 20
+  
+  # Write a JSON sidecar per artifact from the consolidated metadata log
+  python multimedia_generator.py sidecars
         """
     )
     
-    parser.add_argument('mode', choices=['text', 'image', 'audio', 'video', 'project'],
+    parser.add_argument('mode', choices=['text', 'image', 'audio', 'video', 'project', 'batch', 'resume',
+                                         'history', 'sidecars'],
                         help='Type of content to generate')
-    parser.add_argument('prompt', nargs='?', help='Generation prompt')
+    parser.add_argument('prompt', nargs='?',
+                        help='Generation prompt (job file path for batch and resume modes, type filter '
+                             'for history mode)')
     parser.add_argument('--config', help='Path to configuration file')
     parser.add_argument('--output-dir', help='Output directory for generated files')
     parser.add_argument('--style', help='Generation style')
@@ -323,17 +1866,59 @@ Examples:
     parser.add_argument('--resolution', help='Video resolution (e.g., 1920x1080)')
     parser.add_argument('--fps', type=int, help='Frames per second (for video)')
     parser.add_argument('--format', help='Output format')
+    parser.add_argument('--max-workers', type=int,
+                        help='Maximum number of generation jobs in flight at once')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for image/video post-processing (0 runs it in-process)')
+    parser.add_argument('--sequential', action='store_true',
+                        help='Run project jobs one after another instead of concurrently')
+    parser.add_argument('--results', help='Output JSONL file for batch results')
+    parser.add_argument('--queue', help='Batch queue database (defaults to <job file>.queue.db)')
+    parser.add_argument('--max-attempts', type=int, help='Attempts per batch job before it is marked failed')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='In resume mode, also re-run jobs that used up their attempts')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always generate new output instead of reusing cached results')
+    parser.add_argument('--metrics-file',
+                        help='Write per-stage timing metrics to this Prometheus text file')
+    parser.add_argument('--quiet', action='store_true', help='Do not print progress output')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Also print job-started and stage-done progress events')
+    parser.add_argument('--watch-config', action='store_true',
+                        help='Reload --config when the file changes or on SIGHUP, without restarting')
+    parser.add_argument('--events-log', help='Append every progress event as a JSON line to this file')
+    parser.add_argument('--limit', type=int, default=20, help='Number of entries to show in history mode')
     
     args = parser.parse_args()
     
     # Create generator instance
-    generator = UnlimitedMultimediaGenerator(config_path=args.config)
+    try:
+        generator = UnlimitedMultimediaGenerator(config_path=args.config)
+    except ConfigError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not args.quiet:
+        generator.events.subscribe(ConsoleReporter(verbose=args.verbose))
+    if args.events_log:
+        generator.events.subscribe(JSONEventLog(args.events_log))
+    if args.watch_config and args.config:
+        generator.watch_config()
     
     # Override output directory if specified
     if args.output_dir:
         generator.output_dir = args.output_dir
         generator._ensure_output_dir()
     
+    if args.no_cache:
+        generator.disable_cache()
+    
+    if args.workers is not None:
+        generator.postprocessor.workers = args.workers
+    
+    if args.metrics_file:
+        metrics = generator.enable_metrics()
+        metrics.add_sink(create_sink(metrics, {'type': 'prometheus_file', 'path': args.metrics_file}))
+    
     # Prepare kwargs
     kwargs = {}
     if args.style:
@@ -365,7 +1950,52 @@ Examples:
             prompts = project_config.get('prompts', {})
             params = project_config.get('params', {})
             
-            generator.generate_multimedia_project(prompts, **params)
+            generator.generate_multimedia_project(
+                prompts,
+                concurrent=not args.sequential,
+                max_workers=args.max_workers,
+                **params
+            )
+        
+        elif args.mode == 'batch':
+            if not args.prompt:
+                print("Error: job file required for batch mode")
+                sys.exit(1)
+            
+            summary = run_batch(generator, args.prompt, args.results, args.max_workers,
+                                queue_path=args.queue, max_attempts=args.max_attempts)
+            if summary['counts'].get('failed'):
+                sys.exit(1)
+        
+        elif args.mode == 'resume':
+            if not (args.prompt or args.queue):
+                print("Error: job file or --queue required for resume mode")
+                sys.exit(1)
+            
+            summary = resume_batch(generator, args.queue or args.prompt, args.results, args.max_workers,
+                                   max_attempts=args.max_attempts, retry_failed=args.retry_failed)
+            if summary['counts'].get('failed'):
+                sys.exit(1)
+        
+        elif args.mode == 'sidecars':
+            if generator.metadata_log is None:
+                print("Error: metadata is already written as sidecars ('storage.metadata' is not 'jsonl')")
+                sys.exit(1)
+            
+            print(f"📝 Wrote {generator.export_sidecars()} metadata sidecars to {generator.output_dir}")
+        
+        elif args.mode == 'history':
+            if generator.history is None:
+                print("Error: history is disabled in config")
+                sys.exit(1)
+            
+            types = [args.prompt] if args.prompt else None
+            entries = generator.history.query(types=types, limit=args.limit)
+            print(f"📜 {len(entries)} of {generator.history.count(types=types)} entries")
+            for entry in entries:
+                location = entry.get('file_path') or entry.get('error') or ''
+                print(f"{entry['timestamp'][:19]}  {entry['type']:<7} {entry['status']:<8} "
+                      f"{entry.get('prompt', '')[:60]}  {location}")
         
         else:
             if not args.prompt:
@@ -382,8 +2012,12 @@ Examples:
                 generator.generate_video(args.prompt, **kwargs)
     
     except Exception as e:
+        # Let queued progress output go out before the error
+        generator.events.close()
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        generator.close()
 
 
 if __name__ == '__main__':
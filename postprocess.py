@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Media Post-Processing
+Resizing, transcoding and thumbnailing of generated media. The CPU-heavy work
+can run on a process pool, so it is not serialized by the GIL.
+"""
+
+import os
+import shutil
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+from atomic_io import AtomicWriter, temp_path
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; images are left as returned
+    Image = None
+
+
+def parse_size(value: Any) -> Optional[Tuple[int, int]]:
+    """Parse a 'WIDTHxHEIGHT' string, returning None if it is not one."""
+    try:
+        width, height = str(value).lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        return None
+
+
+def thumbnail_path(path: str) -> str:
+    """Return the thumbnail path for an artifact."""
+    return f"{os.path.splitext(path)[0]}.thumb.jpg"
+
+
+def process_image(path: str, params: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resize an image to its requested 'size' and write a JPEG thumbnail.
+    
+    Runs in a worker process: the image is read from ``path``, so only the
+    path and parameters cross the process boundary. New files are written
+    under temporary names and listed in 'files' as (temporary, final) pairs,
+    for ``PostProcessor.process`` to move into place.
+    
+    Returns:
+        What was done, e.g. {'resized': '1024x1024', 'thumbnail': path}
+    """
+    outputs = {'files': []}
+    if Image is None:
+        return outputs
+    with Image.open(path) as image:
+        image_format = image.format
+        image.load()
+    
+    try:
+        size = parse_size(params.get('size'))
+        if options.get('resize', True) and size and image.size != size:
+            image = image.resize(size, Image.LANCZOS)
+            tmp_path = temp_path(path)
+            outputs['files'].append((tmp_path, path))
+            image.save(tmp_path, format=image_format)
+            outputs['resized'] = f"{size[0]}x{size[1]}"
+        
+        if options.get('thumbnails', True):
+            limit = options.get('thumbnail_size', 256)
+            thumbnail = image.convert('RGB')
+            thumbnail.thumbnail((limit, limit))
+            outputs['thumbnail'] = thumbnail_path(path)
+            tmp_path = temp_path(outputs['thumbnail'])
+            outputs['files'].append((tmp_path, outputs['thumbnail']))
+            thumbnail.save(tmp_path, format='JPEG', quality=85)
+    except BaseException:
+        _discard(outputs['files'])
+        raise
+    return outputs
+
+
+def _probe_video(ffprobe: str, path: str) -> Optional[Tuple[int, int, float]]:
+    """Return (width, height, fps) of a video's first stream, or None if unknown."""
+    proc = subprocess.run(
+        [ffprobe, '-v', 'error', '-select_streams', 'v:0', '-show_entries',
+         'stream=width,height,r_frame_rate', '-of', 'csv=p=0', path],
+        capture_output=True, text=True
+    )
+    try:
+        width, height, rate = proc.stdout.strip().split(',')
+        numerator, _, denominator = rate.partition('/')
+        return int(width), int(height), float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def process_video(path: str, params: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Transcode a video to its requested 'resolution' and 'fps' and write a
+    JPEG thumbnail of its first frame, using ffmpeg.
+    
+    Runs in a worker process; ffmpeg reads the files directly and writes
+    new ones under temporary names, listed in 'files' as for
+    ``process_image``.
+    
+    Returns:
+        What was done, e.g. {'transcoded': '1920x1080@30', 'thumbnail': path}
+    """
+    outputs = {'files': []}
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        return outputs
+    
+    source = path
+    try:
+        size = parse_size(params.get('resolution'))
+        fps = params.get('fps')
+        if options.get('resize', True) and size:
+            ffprobe = shutil.which('ffprobe')
+            current = _probe_video(ffprobe, path) if ffprobe else None
+            if current is None or current[:2] != size or (fps and abs(current[2] - fps) > 0.01):
+                tmp_path = temp_path(path)
+                outputs['files'].append((tmp_path, path))
+                command = [ffmpeg, '-v', 'error', '-y', '-i', path, '-vf', f"scale={size[0]}:{size[1]}"]
+                if fps:
+                    command += ['-r', str(fps)]
+                subprocess.run(command + [tmp_path], check=True, capture_output=True)
+                source = tmp_path
+                outputs['transcoded'] = f"{size[0]}x{size[1]}@{fps}" if fps else f"{size[0]}x{size[1]}"
+        
+        if options.get('thumbnails', True):
+            limit = options.get('thumbnail_size', 256)
+            outputs['thumbnail'] = thumbnail_path(path)
+            tmp_path = temp_path(outputs['thumbnail'])
+            outputs['files'].append((tmp_path, outputs['thumbnail']))
+            subprocess.run(
+                [ffmpeg, '-v', 'error', '-y', '-i', source, '-frames:v', '1',
+                 '-vf', f"scale='min({limit},iw)':-2", tmp_path],
+                check=True, capture_output=True
+            )
+    except BaseException:
+        _discard(outputs['files'])
+        raise
+    return outputs
+
+
+def _discard(files):
+    """Remove the temporary files of (temporary, final) pairs."""
+    for tmp_path, _ in files:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+PROCESSORS = {
+    'image': process_image,
+    'video': process_video,
+}
+
+
+class PostProcessor:
+    """
+    Runs post-processing of generated media files.
+    
+    With ``workers`` set to 0 the work runs in the calling thread; otherwise
+    it runs on a pool of that many processes, created on first use (so
+    ``workers`` can still be changed until then). Payloads are handed over
+    as file paths: the artifact is already on disk and the worker process
+    opens it itself, so no media bytes are pickled. Pillow (images) and
+    ffmpeg (video) are optional; without them the media type is skipped.
+    """
+    
+    def __init__(self, workers: int = 0, resize: bool = True, thumbnails: bool = True,
+                 thumbnail_size: int = 256):
+        """
+        Initialize the post-processor.
+        
+        Args:
+            workers: Number of worker processes (0 to run in-process)
+            resize: Resize images and transcode videos to the requested
+                size, resolution and fps
+            thumbnails: Write a '<artifact>.thumb.jpg' thumbnail
+            thumbnail_size: Longest side of thumbnails, in pixels
+        """
+        self.workers = workers
+        self.options = {'resize': resize, 'thumbnails': thumbnails, 'thumbnail_size': thumbnail_size}
+        self._has_ffmpeg = shutil.which('ffmpeg') is not None
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def handles(self, media_type: str) -> bool:
+        """Check whether ``media_type`` has post-processing and its tools are installed."""
+        if not (self.options['resize'] or self.options['thumbnails']):
+            return False
+        if media_type == 'image':
+            return Image is not None
+        if media_type == 'video':
+            return self._has_ffmpeg
+        return False
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        """Return the process pool, creating it on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # Spawned workers only import this module, and inherit no
+                    # locks from the parent's threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+    
+    def process(self, media_type: str, path: str, params: Dict[str, Any],
+                writer: Optional[AtomicWriter] = None) -> Dict[str, Any]:
+        """
+        Post-process one artifact file in place, blocking until done.
+        
+        The files the processor wrote are moved into place with ``writer``,
+        so they are replaced atomically and made durable under its policy.
+        
+        Returns:
+            What was done (see ``process_image`` and ``process_video``)
+        """
+        func = PROCESSORS[media_type]
+        if self.workers <= 0:
+            outputs = func(path, params, self.options)
+        else:
+            outputs = self._pool().submit(func, path, params, self.options).result()
+        files = outputs.pop('files')
+        writer = writer or AtomicWriter()
+        for index, (tmp_path, final_path) in enumerate(files):
+            try:
+                writer.replace(tmp_path, final_path)
+            except BaseException:
+                _discard(files[index:])
+                raise
+        return outputs
+    
+    def close(self):
+        """Shut down the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
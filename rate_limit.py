@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Rate Limiting
+Token-bucket request and token budgets plus AIMD adaptive concurrency, used
+by backends to stay within a provider's rate limits.
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Optional, Iterator, AsyncIterator
+
+# Outcomes reported to ``AdaptiveConcurrency.release``
+SUCCESS = 'success'
+THROTTLED = 'throttled'
+ERROR = 'error'
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at a fixed rate.
+    
+    ``reserve`` takes tokens right away and returns how long the caller must
+    wait for them, letting the balance go negative, so waiters are served in
+    the order they arrived and nobody polls.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate_per_minute: Tokens added per minute
+            capacity: Largest burst (defaults to one second's worth of
+                tokens, at least 1)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Take ``amount`` tokens.
+        
+        Returns:
+            Seconds to wait before the tokens may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def pause(self, seconds: float):
+        """Hold back every caller for at least ``seconds`` (e.g. after a Retry-After)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._updated) * self.rate, -seconds * self.rate)
+            self._updated = now
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit that adapts to the provider (AIMD).
+    
+    Each successful call raises the limit by ``1 / limit`` (about one more
+    slot per round of calls); a throttled call multiplies it by ``backoff``,
+    unless the limit was already lowered after that call started, so one
+    burst of rejections counts as a single signal. Slots are handed to waiters in arrival order, for
+    threads and coroutines (on any event loop) alike.
+    """
+    
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 64,
+                 backoff: float = 0.5):
+        """
+        Initialize the limiter.
+        
+        Args:
+            initial: Starting concurrency
+            minimum: Lowest concurrency after backing off
+            maximum: Highest concurrency after ramping up
+            backoff: Factor applied to the limit when throttled
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self) -> bool:
+        """Take a free slot if nobody is queued for one. Caller holds the lock."""
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+    
+    def acquire(self):
+        """Wait for a slot."""
+        with self._lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+    
+    async def aacquire(self):
+        """Wait for a slot without blocking the event loop."""
+        with self._lock:
+            if self._try_acquire():
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    granted = False
+                except ValueError:
+                    granted = True
+            if granted and waiter[1].done() and not waiter[1].cancelled():
+                self.release(None)
+            raise
+    
+    def release(self, outcome: Optional[str] = SUCCESS, started: float = 0.0):
+        """
+        Free a slot and adapt the limit to the call's outcome.
+        
+        Args:
+            outcome: SUCCESS, THROTTLED, ERROR (no change) or None
+            started: ``time.monotonic()`` when the call got its slot
+        """
+        with self._lock:
+            if outcome == SUCCESS:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif outcome == THROTTLED and started >= self._last_decrease:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+            self.in_flight -= 1
+            granted = []
+            while self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                granted.append(self._waiters.popleft())
+        for waiter in granted:
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+                continue
+            loop, future = waiter
+            try:
+                loop.call_soon_threadsafe(self._resolve, future)
+            except RuntimeError:
+                # The waiter's loop is closed: give the slot back
+                self.release(None)
+    
+    def _resolve(self, future: asyncio.Future):
+        """Hand a slot to an async waiter, or return it if the waiter gave up."""
+        if future.cancelled():
+            self.release(None)
+        else:
+            future.set_result(None)
+
+
+def estimate_tokens(prompt: Optional[str], params: Dict[str, Any]) -> int:
+    """
+    Estimate the provider tokens a request uses: about 4 characters of
+    prompt per token, plus the requested 'max_length' for text.
+    """
+    tokens = len(prompt or '') // 4 + 1
+    max_length = params.get('max_length')
+    if isinstance(max_length, (int, float)):
+        tokens += int(max_length)
+    return tokens
+
+
+class RateLimiter:
+    """
+    Per-backend request budget: requests and tokens per minute, and an
+    adaptive concurrency limit.
+    
+    Use ``with limiter.limit(prompt, params) as call:`` around one provider
+    call and ``call.throttled(retry_after)`` when the provider rejects it;
+    ``async with limiter.alimit(...)`` does the same for coroutines.
+    """
+    
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, adaptive: bool = True,
+                 initial_concurrency: int = 4, min_concurrency: int = 1,
+                 max_concurrency: int = 64, backoff: float = 0.5,
+                 burst: Optional[float] = None):
+        """
+        Initialize the limiter.
+        
+        Args:
+            requests_per_minute: Request budget (None for unlimited)
+            tokens_per_minute: Token budget, see ``estimate_tokens`` (None
+                for unlimited)
+            adaptive: Adapt concurrency to throttling (AIMD)
+            initial_concurrency: Starting concurrency when adaptive
+            min_concurrency: Lowest concurrency when adaptive
+            max_concurrency: Highest concurrency when adaptive
+            backoff: Factor applied to the concurrency when throttled
+            burst: Largest burst of requests (defaults to one second's worth)
+        """
+        self.requests = TokenBucket(requests_per_minute, burst) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(
+            initial_concurrency, min_concurrency, max_concurrency, backoff
+        ) if adaptive else None
+        self.throttled_count = 0
+        self._count_lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['RateLimiter']:
+        """Build a limiter from a backend's 'rate_limit' config, or None if not set."""
+        if not config:
+            return None
+        return cls(**config)
+    
+    def _wait_time(self, prompt: Optional[str], params: Dict[str, Any]) -> float:
+        """Reserve budget for one request and return how long to wait for it."""
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.reserve(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(estimate_tokens(prompt, params)))
+        return wait
+    
+    def _throttled(self, retry_after: Optional[float]):
+        """Record a throttled call and hold back the request budget for ``retry_after``."""
+        with self._count_lock:
+            self.throttled_count += 1
+        if retry_after and self.requests is not None:
+            self.requests.pause(retry_after)
+    
+    @contextmanager
+    def limit(self, prompt: Optional[str], params: Dict[str, Any]) -> Iterator['_Call']:
+        """Wait for a concurrency slot and budget, then run one call."""
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        call = _Call(self, time.monotonic())
+        try:
+            wait = self._wait_time(prompt, params)
+            if wait > 0:
+                time.sleep(wait)
+            yield call
+        except BaseException:
+            call.outcome = call.outcome or ERROR
+            raise
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.release(call.outcome or SUCCESS, call.started)
+    
+    @asynccontextmanager
+    async def alimit(self, prompt: Optional[str], params: Dict[str, Any]) -> AsyncIterator['_Call']:
+        """Async version of ``limit``."""
+        if self.concurrency is not None:
+            await self.concurrency.aacquire()
+        call = _Call(self, time.monotonic())
+        try:
+            wait = self._wait_time(prompt, params)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield call
+        except BaseException:
+            call.outcome = call.outcome or ERROR
+            raise
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.release(call.outcome or SUCCESS, call.started)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current concurrency limit, calls in flight and throttled count."""
+        snapshot = {'throttled': self.throttled_count}
+        if self.concurrency is not None:
+            snapshot['concurrency_limit'] = int(self.concurrency.limit)
+            snapshot['in_flight'] = self.concurrency.in_flight
+        return snapshot
+
+
+class _Call:
+    """Handle for one rate-limited call, used to report throttling."""
+    
+    __slots__ = ('limiter', 'started', 'outcome')
+    
+    def __init__(self, limiter: RateLimiter, started: float):
+        self.limiter = limiter
+        self.started = started
+        self.outcome = None
+    
+    def throttled(self, retry_after: Optional[float] = None):
+        """Report that the provider rejected this call for exceeding its rate limit."""
+        self.outcome = THROTTLED
+        self.limiter._throttled(retry_after)
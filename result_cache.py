@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Result Cache
+Content-addressed cache mapping generation requests to existing artifacts,
+and single-flight deduplication of identical requests in progress.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Callable
+
+
+class ResultCache:
+    """
+    Two-tier (memory LRU + on-disk) cache of generated artifact paths.
+    
+    Entries are keyed by a stable hash of the media type, prompt, normalized
+    parameters and backend, and map to the path of an artifact that was
+    already generated for that request. The memory tier holds the most
+    recently used ``max_entries`` keys; the disk tier stores one small JSON
+    file per key under ``cache_dir`` so hits survive restarts.
+    
+    ``inflight`` deduplicates requests for keys that are being generated
+    right now, which the cache cannot answer yet.
+    """
+    
+    PRUNE_EVERY = 256
+    
+    def __init__(self, cache_dir: Optional[str], max_entries: int = 1024,
+                 ttl_seconds: Optional[float] = None,
+                 max_disk_entries: Optional[int] = None,
+                 exists: Callable[[str], bool] = os.path.exists,
+                 inflight: Optional['SingleFlight'] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir: Directory for the on-disk tier (None for memory only)
+            max_entries: Maximum number of entries kept in memory
+            ttl_seconds: Age after which entries expire (None for no expiry)
+            max_disk_entries: Maximum number of entries kept on disk
+            exists: Predicate used to check a cached artifact still exists
+            inflight: Single-flight group to report in ``stats`` (e.g. one
+                its owner also uses while caching is off); a new one by default
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._exists = exists
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.inflight = inflight if inflight is not None else SingleFlight()
+        self._counters = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+    
+    @staticmethod
+    def make_key(media_type: str, prompt: str, params: Dict[str, Any], backend: str) -> str:
+        """Return a stable content hash for a generation request."""
+        payload = json.dumps(
+            [media_type, prompt, params, backend],
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up the artifact path for ``key``.
+        
+        Returns:
+            Path to the cached artifact, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            path, created_at = entry
+            if self._is_live(path, created_at, now):
+                with self._lock:
+                    if key in self._memory:
+                        self._memory.move_to_end(key)
+                    self._counters['hits'] += 1
+                    self._counters['memory_hits'] += 1
+                return path
+            with self._lock:
+                self._memory.pop(key, None)
+        
+        entry = self._read_disk_entry(key)
+        if entry is not None:
+            path, created_at = entry['path'], entry['created_at']
+            if self._is_live(path, created_at, now):
+                with self._lock:
+                    self._remember(key, path, created_at)
+                    self._counters['hits'] += 1
+                    self._counters['disk_hits'] += 1
+                return path
+            self._remove_disk_entry(key)
+        
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+    
+    def put(self, key: str, path: str):
+        """Record that ``path`` is the artifact generated for ``key``."""
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, path, created_at)
+            self._puts_since_prune += 1
+            prune = self._puts_since_prune >= self.PRUNE_EVERY
+            if prune:
+                self._puts_since_prune = 0
+        
+        if self.cache_dir:
+            entry_file = self._disk_path(key)
+            os.makedirs(os.path.dirname(entry_file), exist_ok=True)
+            tmp_file = f"{entry_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'path': path, 'created_at': created_at}, f)
+            os.replace(tmp_file, entry_file)
+            if prune:
+                self.prune()
+    
+    def invalidate(self, key: str):
+        """Drop ``key`` from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+        self._remove_disk_entry(key)
+    
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        for entry_file in self._iter_disk_entries():
+            self._unlink(entry_file)
+    
+    def prune(self):
+        """Evict expired disk entries and the oldest ones beyond ``max_disk_entries``."""
+        if not self.cache_dir:
+            return
+        now = time.time()
+        live = []
+        for entry_file in self._iter_disk_entries():
+            try:
+                mtime = os.path.getmtime(entry_file)
+            except OSError:
+                continue
+            if self.ttl_seconds is not None and now - mtime > self.ttl_seconds:
+                self._unlink(entry_file)
+                with self._lock:
+                    self._counters['expirations'] += 1
+            else:
+                live.append((mtime, entry_file))
+        
+        if self.max_disk_entries is not None and len(live) > self.max_disk_entries:
+            live.sort()
+            for _, entry_file in live[:len(live) - self.max_disk_entries]:
+                self._unlink(entry_file)
+                with self._lock:
+                    self._counters['evictions'] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current memory size."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+        stats['coalesced'] = self.inflight.coalesced
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+    
+    def _remember(self, key: str, path: str, created_at: float):
+        """Insert into the memory tier, evicting the least recently used entry. Caller holds the lock."""
+        self._memory[key] = (path, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters['evictions'] += 1
+    
+    def _is_live(self, path: str, created_at: float, now: float) -> bool:
+        """Check an entry has not expired and its artifact still exists."""
+        if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+            with self._lock:
+                self._counters['expirations'] += 1
+            return False
+        return self._exists(path)
+    
+    def _disk_path(self, key: str) -> str:
+        """Return the disk tier file for ``key``, sharded by hash prefix."""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+    
+    def _read_disk_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a disk tier entry, returning None if absent or unreadable."""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _remove_disk_entry(self, key: str):
+        """Delete a disk tier entry if present."""
+        if self.cache_dir:
+            self._unlink(self._disk_path(key))
+    
+    def _iter_disk_entries(self):
+        """Yield every entry file in the disk tier."""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith('.json'):
+                        yield entry.path
+    
+    @staticmethod
+    def _unlink(path: str):
+        """Remove a file, ignoring it if already gone."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+    
+    The first caller to ``join`` a key becomes the leader of a ``Flight``
+    and does the work; callers that join while it runs become followers and
+    wait for the leader's result instead of repeating the work.
+    """
+    
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+    
+    def join(self, key: str) -> 'Flight':
+        """Attach to the call in progress for ``key``, or lead a new one."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return Flight(self, key, flight.future, leader=False)
+            flight = self._flights[key] = Flight(self, key, Future(), leader=True)
+            return flight
+    
+    def _forget(self, flight: 'Flight'):
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+
+class Flight:
+    """One caller's handle on a single-flight call."""
+    
+    __slots__ = ('_group', 'key', 'future', 'leader')
+    
+    def __init__(self, group: SingleFlight, key: str, future: Future, leader: bool):
+        self._group = group
+        self.key = key
+        self.future = future
+        self.leader = leader
+    
+    def result(self) -> Any:
+        """Wait for the leader's result (followers only); raises the leader's error."""
+        return self.future.result()
+    
+    def finish(self, result: Any = None, error: Optional[BaseException] = None):
+        """
+        Publish the leader's result (or error) to the followers.
+        
+        Only the first call of the leader has an effect, so it is safe to
+        call again from cleanup code.
+        """
+        if not self.leader or self.future.done():
+            return
+        self._group._forget(self)
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(result)
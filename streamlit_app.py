@@ -7,8 +7,14 @@ A comprehensive web interface for AI multimedia generation
 import streamlit as st
 import json
 import os
+import uuid
+import threading
 from datetime import datetime
+from typing import Optional
 from multimedia_generator import UnlimitedMultimediaGenerator
+from job_queue import JobManager, QUEUED, RUNNING, DONE
+from media_server import MediaServer
+from video_segments import segmenting_limitation
 """
 UNLIMITED IRON CREATOR - Streamlit Application
 
@@ -29,11 +35,243 @@ import numpy as np
 #     initial_sidebar_state="expanded"
 # )
 
-# Initialize session state
-if 'generator' not in st.session_state:
-    st.session_state.generator = UnlimitedMultimediaGenerator()
-    st.session_state.history = []
-    st.session_state.output_dir = 'generated_media'
+@st.cache_resource
+def get_shared_generator() -> UnlimitedMultimediaGenerator:
+    """Create the process-wide generator (config, backends, caches, metrics) shared by all sessions."""
+    # A config given by UIC_CONFIG is reloaded when it changes, without restarting the app
+    generator = UnlimitedMultimediaGenerator(config_path=os.environ.get('UIC_CONFIG'))
+    generator.enable_metrics()
+    if generator.config_path:
+        generator.watch_config(reload_signal=False)
+    return generator
+
+
+@st.cache_resource
+def get_media_server() -> Optional[MediaServer]:
+    """
+    Start the process-wide server that streams generated files to browsers.
+    
+    Files are sent from disk in chunks instead of being loaded into each
+    session's memory. The server only runs when UIC_MEDIA_URL gives the
+    address browsers reach it at (UIC_MEDIA_HOST / UIC_MEDIA_PORT set where
+    it listens, UIC_MEDIA_ROOT the directory it serves); otherwise files are
+    sent through Streamlit itself, which works in any deployment.
+    
+    Returns:
+        The server, or None if it is not configured
+    """
+    public_url = os.environ.get('UIC_MEDIA_URL')
+    if not public_url:
+        return None
+    return MediaServer(
+        host=os.environ.get('UIC_MEDIA_HOST', '127.0.0.1'),
+        port=int(os.environ.get('UIC_MEDIA_PORT', '0')),
+        public_url=public_url,
+        root=os.environ.get('UIC_MEDIA_ROOT')
+    )
+
+
+def media_url(path, download=False):
+    """Return the media server URL for ``path``, or None to send the file through Streamlit."""
+    media_server = get_media_server()
+    if media_server is None or not media_server.serves(path):
+        return None
+    return media_server.url(path, download=download)
+
+
+def render_download(label, path, mime=None):
+    """Show a download button for the file at ``path``."""
+    url = media_url(path, download=True)
+    if url is not None:
+        st.link_button(label, url)
+        return
+    with open(path, 'rb') as f:
+        st.download_button(label=label, data=f, file_name=os.path.basename(path), mime=mime)
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Create the process-wide background job queue that runs generations for all sessions."""
+    jobs_config = get_shared_generator().config.get('jobs') or {}
+    return JobManager(
+        max_workers=jobs_config.get('max_workers', 4),
+        max_finished=jobs_config.get('max_finished', 1000)
+    )
+
+
+# Initialize session state; sessions only keep their output directory, an ID
+# for their jobs and a reference to the shared generator's view of the directory
+if 'output_dir' not in st.session_state:
+    st.session_state.output_dir = get_shared_generator().output_dir
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'text_streams' not in st.session_state:
+    # Text streamed so far by this session's running text jobs, by job ID
+    st.session_state.text_streams = {}
+st.session_state.generator = get_shared_generator().with_output_dir(st.session_state.output_dir)
+job_manager = get_job_manager()
+
+# Seconds between refreshes of the job lists while jobs are queued or running,
+# and of the text of running text jobs
+JOB_REFRESH_SECONDS = 1.0
+TEXT_STREAM_REFRESH_SECONDS = 0.2
+
+# Metadata fields shown as metrics for each media type: (label, key, suffix)
+MEDIA_METRICS = {
+    'image': [("Size", 'size', ''), ("Style", 'style', ''), ("Format", 'format', '')],
+    'audio': [("Type", 'type', ''), ("Voice/Style", 'voice', ''), ("Duration", 'duration', 's'),
+              ("Format", 'format', '')],
+    'video': [("Resolution", 'resolution', ''), ("FPS", 'fps', ''), ("Duration", 'duration', 's'),
+              ("Style", 'style', ''), ("Format", 'format', '')],
+}
+
+
+def submit_job(func, *args, kind, label, **kwargs):
+    """Queue a generation for this session and confirm it to the user."""
+    job = job_manager.submit(func, *args, kind=kind, label=label,
+                             owner=st.session_state.session_id, **kwargs)
+    st.success(f"📥 Queued {kind} job #{job.id} - it runs in the background, so you can keep working")
+    return job
+
+
+class TextStream:
+    """Text appended by a job's worker thread while the page reads it."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chunks = []
+    
+    def append(self, chunk: str):
+        with self._lock:
+            self._chunks.append(chunk)
+    
+    def text(self) -> str:
+        with self._lock:
+            return ''.join(self._chunks)
+
+
+def collect_text(stream, text_stream, prompt, **kwargs):
+    """Run a text stream to the end in a job, appending each chunk to ``text_stream`` as it arrives."""
+    for chunk in stream(prompt, **kwargs):
+        text_stream.append(chunk)
+    return text_stream.text()
+
+
+def render_text_result(text, key):
+    """Show generated text with a download button."""
+    st.text_area("Result", value=text, height=300, key=f"text_{key}", label_visibility="collapsed")
+    st.download_button(
+        label="📥 Download Text",
+        data=text,
+        file_name=f"text_{key}.txt",
+        mime="text/plain",
+        key=f"download_text_{key}"
+    )
+
+
+def render_media_details(media_type, result):
+    """Show the metadata of a generated media file."""
+    # From the sidecar or the consolidated metadata log, whichever the config uses
+    metadata = st.session_state.generator.get_metadata(result)
+    if metadata is None:
+        return
+    
+    fields = MEDIA_METRICS[media_type]
+    for column, (label, field, suffix) in zip(st.columns(len(fields)), fields):
+        with column:
+            st.metric(label, f"{metadata.get(field, 'N/A')}{suffix}")
+    
+    st.info(f"📁 File path: `{result}`")
+    if os.path.exists(result):
+        # With a media server, the browser fetches the file from it, streamed from disk
+        source = media_url(result) or result
+        if media_type == 'image':
+            st.image(source)
+        elif media_type == 'audio':
+            st.audio(source)
+        elif media_type == 'video':
+            st.video(source)
+        render_download(f"📥 Download {media_type.capitalize()}", result)
+    st.json(metadata, expanded=False)
+
+
+def render_project_results(results, key):
+    """Show the outputs of a multimedia project."""
+    for media_type, file_path in results.items():
+        st.markdown(f"**{media_type.capitalize()}** - `{file_path}`")
+        if media_type == 'text':
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    st.text_area("Content", f.read(), height=200, key=f"result_{key}_{media_type}")
+        else:
+            render_media_details(media_type, file_path)
+
+
+def render_jobs(kind, limit=5):
+    """
+    Show this session's most recent jobs of ``kind`` with their state and results.
+    
+    The list is a fragment: while any of the jobs are queued or running (and
+    auto-refresh is on) it reruns by itself every ``JOB_REFRESH_SECONDS``,
+    without rerunning the rest of the page. Running text jobs show their
+    text above it in a fragment of its own, refreshed every
+    ``TEXT_STREAM_REFRESH_SECONDS`` so it reads as it is written.
+    """
+    polling = auto_refresh and bool(job_manager.jobs(owner=st.session_state.session_id, kind=kind,
+                                                     active_only=True))
+    if kind == 'text':
+        stream = st.fragment(render_text_streams, run_every=TEXT_STREAM_REFRESH_SECONDS if polling else None)
+        stream()
+    refresh = st.fragment(render_job_list, run_every=JOB_REFRESH_SECONDS if polling else None)
+    refresh(kind, limit, polling)
+
+
+def render_text_streams():
+    """Show the text this session's running text jobs have streamed so far."""
+    running = job_manager.jobs(owner=st.session_state.session_id, kind='text', active_only=True)
+    streams = st.session_state.text_streams
+    # Finished jobs show their result in the job list instead
+    running_ids = {job.id for job in running}
+    for job_id in [job_id for job_id in streams if job_id not in running_ids]:
+        del streams[job_id]
+    for job in running:
+        if job.state == RUNNING and job.id in streams:
+            st.caption(f"✍️ #{job.id} {job.label}")
+            st.text(streams[job.id].text())
+
+
+def render_job_list(kind, limit, polling):
+    """Body of ``render_jobs``; ``polling`` if it was set up to refresh itself."""
+    jobs = job_manager.jobs(owner=st.session_state.session_id, kind=kind)
+    if polling and all(job.finished for job in jobs):
+        # Everything finished: rerun the whole page, which stops the refreshes
+        # and updates the job counts elsewhere on it
+        st.rerun()
+    jobs = jobs[:limit]
+    if not jobs:
+        return
+    st.subheader("📋 Your Jobs")
+    state_icons = {QUEUED: '⏳', RUNNING: '⚙️', DONE: '✅'}
+    for job in jobs:
+        title = f"{state_icons.get(job.state, '❌')} #{job.id} {job.label} - {job.state}"
+        if job.elapsed is not None:
+            title += f" ({job.elapsed:.1f}s)"
+        with st.expander(title, expanded=job is jobs[0] and job.finished):
+            if job.state in (QUEUED, RUNNING):
+                st.progress(job.progress, text=job.message or "Waiting for a worker...")
+                if job.state == QUEUED and st.button("Cancel", key=f"cancel_{job.id}"):
+                    job_manager.cancel(job.id)
+                    st.rerun()
+                continue
+            if job.error:
+                st.error(f"❌ Error: {job.error}")
+            if job.result:
+                if kind == 'text':
+                    render_text_result(job.result, job.id)
+                elif kind == 'project':
+                    render_project_results(job.result, job.id)
+                else:
+                    render_media_details(kind, job.result)
 
 # Custom CSS for better styling
 st.markdown("""
@@ -116,8 +354,14 @@ with st.sidebar:
     
     if output_dir != st.session_state.output_dir:
         st.session_state.output_dir = output_dir
-        st.session_state.generator.output_dir = output_dir
-        st.session_state.generator._ensure_output_dir()
+        st.session_state.generator = get_shared_generator().with_output_dir(output_dir)
+    
+    # Background jobs
+    active_jobs = job_manager.active_count(owner=st.session_state.session_id)
+    st.caption(f"⚙️ {active_jobs} job(s) queued or running")
+    auto_refresh = st.toggle("Auto-refresh while jobs run", value=True)
+    if st.button("🔄 Refresh Jobs"):
+        st.rerun()
     
     st.divider()
     
@@ -149,19 +393,28 @@ with st.sidebar:
     st.divider()
     
     # Statistics
-    if st.session_state.history:
+    history = st.session_state.generator.history
+    type_counts = history.count_by_type() if history is not None else {}
+    if type_counts:
         st.subheader("📊 Statistics")
-        total_gens = len(st.session_state.history)
+        total_gens = sum(type_counts.values())
         st.metric("Total Generations", total_gens)
         
         # Count by type
-        type_counts = {}
-        for item in st.session_state.history:
-            media_type = item.get('type', 'unknown')
-            type_counts[media_type] = type_counts.get(media_type, 0) + 1
-        
         for media_type, count in type_counts.items():
             st.metric(f"{media_type.capitalize()}", count)
+        
+        # Latency percentiles from the generator's stage timings
+        metrics = st.session_state.generator.metrics
+        if metrics is not None:
+            st.markdown("**⏱️ Latency (p50 / p95 / p99)**")
+            for media_type in type_counts:
+                percentiles = metrics.percentiles(media_type)
+                if percentiles:
+                    st.caption(
+                        f"{media_type.capitalize()}: " +
+                        " / ".join(f"{value * 1000:.1f} ms" for value in percentiles.values())
+                    )
 
 # Main tabs
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
@@ -222,49 +475,23 @@ with tab1:
         if not text_prompt:
             st.error("❌ Please enter a prompt")
         else:
-            with st.spinner("Generating text..."):
-                try:
-                    result = st.session_state.generator.generate_text(
-                        text_prompt,
-                        max_length=text_max_length,
-                        temperature=text_temperature,
-                        style=text_style
-                    )
-                    
-                    st.success("✅ Text generated successfully!")
-                    
-                    # Display generated text
-                    st.subheader("Generated Text:")
-                    generated_display = st.text_area(
-                        "Result (editable)",
-                        value=result,
-                        height=300,
-                        label_visibility="collapsed"
-                    )
-                    
-                    # Download button
-                    st.download_button(
-                        label="📥 Download Text",
-                        data=generated_display,
-                        file_name=f"text_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                        mime="text/plain"
-                    )
-                    
-                    # Add to history
-                    st.session_state.history.append({
-                        'timestamp': datetime.now().isoformat(),
-                        'type': 'text',
-                        'prompt': text_prompt,
-                        'status': 'success',
-                        'params': {
-                            'style': text_style,
-                            'max_length': text_max_length,
-                            'temperature': text_temperature
-                        }
-                    })
-                    
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+            # The worker collects the streamed chunks, so the tab can show the
+            # text while it is still being written
+            text_stream = TextStream()
+            job = submit_job(
+                collect_text,
+                st.session_state.generator.stream_text,
+                text_stream,
+                text_prompt,
+                kind='text',
+                label=text_prompt[:60],
+                max_length=text_max_length,
+                temperature=text_temperature,
+                style=text_style
+            )
+            st.session_state.text_streams[job.id] = text_stream
+    
+    render_jobs('text')
     
     # Example prompts
     with st.expander("💡 Example Prompts"):
@@ -321,53 +548,17 @@ with tab2:
         if not image_prompt:
             st.error("❌ Please enter an image description")
         else:
-            with st.spinner("Generating image..."):
-                try:
-                    result = st.session_state.generator.generate_image(
-                        image_prompt,
-                        size=image_size,
-                        style=image_style,
-                        format=image_format
-                    )
-                    
-                    st.success("✅ Image generation initiated successfully!")
-                    
-                    # Display metadata
-                    st.subheader("📋 Generation Details:")
-                    metadata_file = f"{result}.json"
-                    if os.path.exists(metadata_file):
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Size", metadata.get('size', 'N/A'))
-                        with col2:
-                            st.metric("Style", metadata.get('style', 'N/A'))
-                        with col3:
-                            st.metric("Format", metadata.get('format', 'N/A'))
-                        
-                        st.info(f"📁 File path: `{result}`")
-                        
-                        with st.expander("View Full Metadata"):
-                            st.json(metadata)
-                    
-                    # Add to history
-                    st.session_state.history.append({
-                        'timestamp': datetime.now().isoformat(),
-                        'type': 'image',
-                        'prompt': image_prompt,
-                        'status': 'success',
-                        'file_path': result,
-                        'params': {
-                            'size': image_size,
-                            'style': image_style,
-                            'format': image_format
-                        }
-                    })
-                    
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+            submit_job(
+                st.session_state.generator.generate_image,
+                image_prompt,
+                kind='image',
+                label=image_prompt[:60],
+                size=image_size,
+                style=image_style,
+                format=image_format
+            )
+    
+    render_jobs('image')
     
     # Example prompts
     with st.expander("💡 Example Prompts"):
@@ -431,57 +622,18 @@ with tab3:
         if not audio_prompt:
             st.error("❌ Please enter an audio description")
         else:
-            with st.spinner("Generating audio..."):
-                try:
-                    result = st.session_state.generator.generate_audio(
-                        audio_prompt,
-                        type=audio_type,
-                        voice=audio_voice,
-                        duration=audio_duration,
-                        format=audio_format
-                    )
-                    
-                    st.success("✅ Audio generation initiated successfully!")
-                    
-                    # Display metadata
-                    st.subheader("📋 Generation Details:")
-                    metadata_file = f"{result}.json"
-                    if os.path.exists(metadata_file):
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            st.metric("Type", metadata.get('type', 'N/A'))
-                        with col2:
-                            st.metric("Voice/Style", metadata.get('voice', 'N/A'))
-                        with col3:
-                            st.metric("Duration", f"{metadata.get('duration', 'N/A')}s")
-                        with col4:
-                            st.metric("Format", metadata.get('format', 'N/A'))
-                        
-                        st.info(f"📁 File path: `{result}`")
-                        
-                        with st.expander("View Full Metadata"):
-                            st.json(metadata)
-                    
-                    # Add to history
-                    st.session_state.history.append({
-                        'timestamp': datetime.now().isoformat(),
-                        'type': 'audio',
-                        'prompt': audio_prompt,
-                        'status': 'success',
-                        'file_path': result,
-                        'params': {
-                            'type': audio_type,
-                            'voice': audio_voice,
-                            'duration': audio_duration,
-                            'format': audio_format
-                        }
-                    })
-                    
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+            submit_job(
+                st.session_state.generator.generate_audio,
+                audio_prompt,
+                kind='audio',
+                label=audio_prompt[:60],
+                type=audio_type,
+                voice=audio_voice,
+                duration=audio_duration,
+                format=audio_format
+            )
+    
+    render_jobs('audio')
     
     # Example prompts
     with st.expander("💡 Example Prompts"):
@@ -543,7 +695,7 @@ with tab4:
             
             video_format = st.selectbox(
                 "Format",
-                options=["mp4", "webm", "avi"],
+                options=["mp4", "webm", "avi", "ts"],
                 help="Output video format"
             )
         
@@ -553,61 +705,30 @@ with tab4:
         if not video_prompt:
             st.error("❌ Please enter a video description")
         else:
-            with st.spinner("Generating video..."):
-                try:
-                    result = st.session_state.generator.generate_video(
-                        video_prompt,
-                        resolution=video_resolution,
-                        fps=video_fps,
-                        duration=video_duration,
-                        style=video_style,
-                        format=video_format
-                    )
-                    
-                    st.success("✅ Video generation initiated successfully!")
-                    
-                    # Display metadata
-                    st.subheader("📋 Generation Details:")
-                    metadata_file = f"{result}.json"
-                    if os.path.exists(metadata_file):
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                        
-                        col1, col2, col3, col4, col5 = st.columns(5)
-                        with col1:
-                            st.metric("Resolution", metadata.get('resolution', 'N/A'))
-                        with col2:
-                            st.metric("FPS", metadata.get('fps', 'N/A'))
-                        with col3:
-                            st.metric("Duration", f"{metadata.get('duration', 'N/A')}s")
-                        with col4:
-                            st.metric("Style", metadata.get('style', 'N/A'))
-                        with col5:
-                            st.metric("Format", metadata.get('format', 'N/A'))
-                        
-                        st.info(f"📁 File path: `{result}`")
-                        
-                        with st.expander("View Full Metadata"):
-                            st.json(metadata)
-                    
-                    # Add to history
-                    st.session_state.history.append({
-                        'timestamp': datetime.now().isoformat(),
-                        'type': 'video',
-                        'prompt': video_prompt,
-                        'status': 'success',
-                        'file_path': result,
-                        'params': {
-                            'resolution': video_resolution,
-                            'fps': video_fps,
-                            'duration': video_duration,
-                            'style': video_style,
-                            'format': video_format
-                        }
-                    })
-                    
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+            submit_job(
+                st.session_state.generator.generate_video,
+                video_prompt,
+                kind='video',
+                label=video_prompt[:60],
+                resolution=video_resolution,
+                fps=video_fps,
+                duration=video_duration,
+                style=video_style,
+                format=video_format
+            )
+    
+    # Long videos are segmented when the config enables it; say what the format allows
+    segment_config = st.session_state.generator.config.get('video_segments') or {}
+    if segment_config.get('enabled', False):
+        segment_seconds = segment_config.get('segment_seconds', 10)
+        limitation = segmenting_limitation(video_format)
+        if limitation:
+            st.info(f"ℹ️ Videos longer than {segment_seconds}s are generated in segments, but {limitation}.")
+        else:
+            st.caption(f"Videos longer than {segment_seconds}s are generated in segments and can be "
+                       f"watched from their .m3u8 playlist while the rest is still being generated.")
+    
+    render_jobs('video')
     
     # Example prompts
     with st.expander("💡 Example Prompts"):
@@ -782,89 +903,18 @@ with tab5:
         elif not prompts:
             st.error("❌ Please enter prompts for enabled media types")
         else:
-            # Create progress tracking
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            total_steps = len(prompts)
-            current_step = 0
-            
-            results = {}
-            
-            try:
-                status_text.text("Starting multimedia project generation...")
-                
-                if 'text' in prompts and prompts['text']:
-                    current_step += 1
-                    progress_bar.progress(current_step / total_steps)
-                    status_text.text(f"📝 Generating text content... ({current_step}/{total_steps})")
-                    results['text'] = st.session_state.generator.generate_text(
-                        prompts['text'],
-                        **params.get('text_params', {})
-                    )
-                
-                if 'image' in prompts and prompts['image']:
-                    current_step += 1
-                    progress_bar.progress(current_step / total_steps)
-                    status_text.text(f"🖼️ Generating image content... ({current_step}/{total_steps})")
-                    results['image'] = st.session_state.generator.generate_image(
-                        prompts['image'],
-                        **params.get('image_params', {})
-                    )
-                
-                if 'audio' in prompts and prompts['audio']:
-                    current_step += 1
-                    progress_bar.progress(current_step / total_steps)
-                    status_text.text(f"🔊 Generating audio content... ({current_step}/{total_steps})")
-                    results['audio'] = st.session_state.generator.generate_audio(
-                        prompts['audio'],
-                        **params.get('audio_params', {})
-                    )
-                
-                if 'video' in prompts and prompts['video']:
-                    current_step += 1
-                    progress_bar.progress(current_step / total_steps)
-                    status_text.text(f"🎬 Generating video content... ({current_step}/{total_steps})")
-                    results['video'] = st.session_state.generator.generate_video(
-                        prompts['video'],
-                        **params.get('video_params', {})
-                    )
-                
-                progress_bar.progress(1.0)
-                status_text.text("✅ Project generation complete!")
-                
-                st.success("🎉 Complete multimedia project generated successfully!")
-                
-                # Display results
-                st.subheader("📊 Generation Results")
-                
-                for media_type, file_path in results.items():
-                    with st.expander(f"{media_type.capitalize()} - {file_path}"):
-                        if media_type == 'text':
-                            if os.path.exists(file_path):
-                                with open(file_path, 'r') as f:
-                                    st.text_area("Content", f.read(), height=200, key=f"result_{media_type}")
-                        else:
-                            metadata_file = f"{file_path}.json"
-                            if os.path.exists(metadata_file):
-                                with open(metadata_file, 'r') as f:
-                                    metadata = json.load(f)
-                                st.json(metadata)
-                
-                # Add to history
-                st.session_state.history.append({
-                    'timestamp': datetime.now().isoformat(),
-                    'type': 'project',
-                    'prompt': 'Multimedia Project',
-                    'status': 'success',
-                    'results': results,
-                    'params': params
-                })
-                
-            except Exception as e:
-                st.error(f"❌ Error generating project: {str(e)}")
-                progress_bar.empty()
-                status_text.empty()
+            project_prompts = {media_type: prompt for media_type, prompt in prompts.items() if prompt}
+            submit_job(
+                st.session_state.generator.generate_multimedia_project,
+                project_prompts,
+                kind='project',
+                label=f"{len(project_prompts)} media types",
+                concurrent=True,
+                track_progress=True,
+                **params
+            )
+    
+    render_jobs('project')
 
 # ============================================================================
 # TAB 6: HISTORY
@@ -873,7 +923,10 @@ with tab6:
     st.header("📊 Generation History")
     st.markdown("View and manage your generation history")
     
-    if not st.session_state.history:
+    history = st.session_state.generator.history
+    if history is None:
+        st.info("📭 Generation history is disabled in the configuration.")
+    elif not history.count():
         st.info("📭 No generation history yet. Start creating content to see it here!")
     else:
         # Filter options
@@ -885,6 +938,7 @@ with tab6:
                 options=["text", "image", "audio", "video", "project"],
                 default=["text", "image", "audio", "video", "project"]
             )
+            search = st.text_input("Search prompts", placeholder="Text contained in the prompt")
         
         with col2:
             sort_order = st.radio(
@@ -892,72 +946,104 @@ with tab6:
                 options=["Newest First", "Oldest First"],
                 horizontal=True
             )
+            page_size = st.selectbox("Entries per page", options=[25, 50, 100], index=0)
         
         with col3:
             if st.button("🗑️ Clear History", type="secondary"):
-                st.session_state.history = []
-                st.rerun()
+                st.session_state.confirm_clear_history = True
+        
+        # The history is shared with other sessions and the CLI, so clearing it is confirmed explicitly
+        if st.session_state.get('confirm_clear_history'):
+            st.warning(
+                f"⚠️ This history is shared by every session using this output directory and by the "
+                f"command line. Clearing it deletes all {history.count()} entries for everyone."
+            )
+            confirmation = st.text_input("Type CLEAR to confirm", key='clear_history_confirmation')
+            confirm_col, cancel_col = st.columns(2)
+            with confirm_col:
+                if st.button("🗑️ Delete All History", type="primary", disabled=confirmation != 'CLEAR'):
+                    history.clear()
+                    st.session_state.pop('history_export', None)
+                    st.session_state.pop('clear_history_confirmation', None)
+                    st.session_state.confirm_clear_history = False
+                    st.rerun()
+            with cancel_col:
+                if st.button("Cancel"):
+                    st.session_state.pop('clear_history_confirmation', None)
+                    st.session_state.confirm_clear_history = False
+                    st.rerun()
+        
+        # Filter, sort and paginate in the history store; only one page is loaded
+        total_matches = history.count(types=filter_type, search=search or None)
+        page_count = max(1, -(-total_matches // page_size))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+        st.caption(f"{total_matches} entries - page {page} of {page_count}")
         
         st.divider()
         
-        # Filter and sort history
-        filtered_history = [
-            item for item in st.session_state.history
-            if item.get('type') in filter_type
-        ]
+        page_rows = history.query_summaries(
+            types=filter_type,
+            search=search or None,
+            newest_first=sort_order == "Newest First",
+            limit=page_size,
+            offset=(page - 1) * page_size
+        )
         
-        if sort_order == "Oldest First":
-            filtered_history = filtered_history
-        else:
-            filtered_history = list(reversed(filtered_history))
+        # One virtualized table per page instead of a row of widgets per entry
+        icons = {
+            'text': '📝',
+            'image': '🖼️',
+            'audio': '🔊',
+            'video': '🎬',
+            'project': '🎯'
+        }
+        st.dataframe(
+            [
+                {
+                    'ID': row['id'],
+                    'Type': f"{icons.get(row['type'], '📄')} {row['type']}",
+                    'Time': row['timestamp'][:19].replace('T', ' '),
+                    'Status': f"{'✅' if row['status'] == 'success' else '❌'} {row['status']}",
+                    'Prompt': row['prompt'] or 'N/A',
+                    'File': row['file_path'] or '',
+                }
+                for row in page_rows
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
         
-        # Display history items
-        for idx, item in enumerate(filtered_history):
-            with st.container():
-                col1, col2, col3, col4 = st.columns([1, 2, 3, 1])
-                
-                with col1:
-                    # Icon based on type
-                    icons = {
-                        'text': '📝',
-                        'image': '🖼️',
-                        'audio': '🔊',
-                        'video': '🎬',
-                        'project': '🎯'
-                    }
-                    st.markdown(f"### {icons.get(item['type'], '📄')}")
-                    st.caption(item['type'].upper())
-                
-                with col2:
-                    timestamp = datetime.fromisoformat(item['timestamp'])
-                    st.markdown(f"**{timestamp.strftime('%Y-%m-%d %H:%M:%S')}**")
-                    status_emoji = "✅" if item.get('status') == 'success' else "❌"
-                    st.caption(f"Status: {status_emoji} {item.get('status', 'unknown')}")
-                
-                with col3:
-                    prompt = item.get('prompt', 'N/A')
-                    if len(prompt) > 100:
-                        prompt = prompt[:100] + "..."
-                    st.markdown(f"**Prompt:** {prompt}")
-                    if 'file_path' in item:
-                        st.caption(f"📁 {item['file_path']}")
-                
-                with col4:
-                    if st.button("View Details", key=f"view_{idx}"):
-                        with st.expander("Details", expanded=True):
-                            st.json(item)
-                
-                st.divider()
+        # Details are loaded only for the selected entry, and only when asked for
+        if page_rows:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                detail_id = st.selectbox(
+                    "Entry",
+                    options=[row['id'] for row in page_rows],
+                    format_func=lambda entry_id: f"#{entry_id}"
+                )
+            with col2:
+                show_details = st.toggle("View Details")
+            if show_details:
+                st.json(history.get(detail_id))
         
-        # Export history
+        # Export history, written to a file only when requested
         st.subheader("💾 Export History")
-        history_json = json.dumps(st.session_state.history, indent=2)
-        st.download_button(
-            label="📥 Download History as JSON",
-            data=history_json,
-            file_name=f"generation_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-            mime="application/json"
-        )
+        if st.button("📦 Prepare Export"):
+            export_dir = os.path.join(st.session_state.generator.output_dir, 'exports')
+            os.makedirs(export_dir, exist_ok=True)
+            export_path = os.path.join(
+                export_dir, f"generation_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            )
+            with st.spinner("Exporting history..."):
+                exported = history.export_json(export_path, types=filter_type)
+            st.session_state.history_export = (export_path, exported)
+        
+        if st.session_state.get('history_export'):
+            export_path, exported = st.session_state.history_export
+            if os.path.exists(export_path):
+                render_download(f"📥 Download History as JSON ({exported} entries)", export_path,
+                                mime="application/json")
 
 # Footer
 st.divider()
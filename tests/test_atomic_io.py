@@ -0,0 +1,86 @@
+"""Tests of the atomic writer and its durability policies."""
+
+import os
+import threading
+import time
+
+import pytest
+
+import atomic_io
+from atomic_io import AtomicWriter
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Record the paths fsynced by the writer."""
+    synced = []
+    monkeypatch.setattr(atomic_io, '_fsync_path', synced.append)
+    monkeypatch.setattr(atomic_io.os, 'fsync', synced.append)
+    return synced
+
+
+@pytest.mark.parametrize('mode', atomic_io.DURABILITY_MODES)
+def test_write_replaces_file(tmp_path, mode):
+    writer = AtomicWriter(mode)
+    path = tmp_path / 'out.txt'
+    path.write_text('old')
+    
+    assert writer.write(str(path), 'new') == 3
+    assert writer.write(str(tmp_path / 'out.bin'), b'\x00\x01') == 2
+    writer.close()
+    assert path.read_text() == 'new'
+    assert (tmp_path / 'out.bin').read_bytes() == b'\x00\x01'
+    assert sorted(os.listdir(tmp_path)) == ['out.bin', 'out.txt']
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    writer = AtomicWriter('fsync')
+    path = tmp_path / 'out.txt'
+    with pytest.raises(RuntimeError):
+        with writer.open(str(path)) as f:
+            f.write('partial')
+            raise RuntimeError('boom')
+    assert os.listdir(tmp_path) == []
+
+
+def test_none_mode_does_not_fsync(tmp_path, fsyncs):
+    AtomicWriter('none').write(str(tmp_path / 'out.txt'), 'data')
+    assert fsyncs == []
+
+
+def test_fsync_mode_syncs_file_and_directory(tmp_path, fsyncs):
+    AtomicWriter('fsync').write(str(tmp_path / 'out.txt'), 'data')
+    # The open file by descriptor, then its directory by path
+    assert len(fsyncs) == 2
+    assert fsyncs[1] == str(tmp_path)
+
+
+def test_group_mode_lone_writer_does_not_wait(tmp_path):
+    writer = AtomicWriter('group', group_ms=1000)
+    started = time.monotonic()
+    for i in range(5):
+        writer.write(str(tmp_path / f"{i}.txt"), 'data')
+    assert time.monotonic() - started < 0.5
+    writer.close()
+
+
+def test_group_mode_waits_for_open_files(tmp_path, fsyncs):
+    writer = AtomicWriter('group', group_ms=5000)
+    held = writer.open(str(tmp_path / 'held.txt'))
+    done = threading.Event()
+    
+    def write():
+        writer.write(str(tmp_path / 'first.txt'), 'data')
+        done.set()
+    
+    thread = threading.Thread(target=write)
+    thread.start()
+    # The leader waits for the file still being written...
+    assert not done.wait(0.2)
+    held.write('data')
+    held.commit()
+    thread.join(5)
+    # ...and commits both files in one group, with one directory fsync
+    assert done.is_set()
+    assert fsyncs.count(str(tmp_path)) == 1
+    assert sorted(os.listdir(tmp_path)) == ['first.txt', 'held.txt']
@@ -0,0 +1,94 @@
+"""Tests of the generation backends."""
+
+import asyncio
+
+import pytest
+
+import backends as backends_module
+from backends import (
+    create_backend, get_async_connection_pool, get_connection_pool, loop_resources, parse_retry_after
+)
+
+
+@pytest.fixture
+def backends():
+    """Create backends by provider and options, closing them afterwards."""
+    created = []
+    
+    def make(provider, **options):
+        backend = create_backend(provider, **options)
+        created.append(backend)
+        return backend
+    
+    yield make
+    for backend in created:
+        backend.close()
+
+
+def test_stub_backends_get_a_server_with_their_settings(backends):
+    small = backends('stub', payload_size=16)
+    large = backends('stub', payload_size=64)
+    
+    assert small.base_url != large.base_url
+    assert len(small.generate('image', 'a cat', {})) == 16
+    assert len(large.generate('image', 'a cat', {})) == 64
+    assert small.cache_id != large.cache_id
+
+
+def test_stub_backends_with_equal_settings_share_a_server(backends):
+    assert backends('stub', payload_size=32).base_url == backends('stub', payload_size=32).base_url
+
+
+def test_stub_text_is_deterministic(backends):
+    backend = backends('stub')
+    
+    first = backend.generate('text', 'hello', {'style': 'formal'})
+    
+    assert backend.generate('text', 'hello', {'style': 'formal'}) == first
+    assert ''.join(backend.stream('text', 'hello', {})) == backend.generate('text', 'hello', {})
+
+
+def test_unknown_provider_is_rejected():
+    with pytest.raises(ValueError, match="Unknown backend provider"):
+        create_backend('nope')
+
+
+def test_async_pools_are_closed_with_their_loop(backends):
+    backend = backends('stub', max_concurrency=2)
+    pools = []
+    
+    async def run():
+        await asyncio.gather(*(backend.agenerate('image', f"prompt {index}", {}) for index in range(4)))
+        pools.append(get_async_connection_pool(backend.base_url))
+        assert loop_resources()
+    
+    for _ in range(3):
+        asyncio.run(run())
+    
+    assert len(pools) == 3 and len({id(pool) for pool in pools}) == 3
+    assert all(not pool._idle for pool in pools)
+    assert backends_module._loop_resources == {}
+
+
+def test_connections_are_reused(backends):
+    backend = backends('stub', payload_size=8)
+    pool = get_connection_pool(backend.base_url)
+    created = pool.connections_created
+    
+    for index in range(5):
+        backend.generate('image', f"prompt {index}", {})
+    
+    assert pool.connections_created - created <= 1
+    assert pool.connections_reused >= 4
+
+
+def test_backends_of_one_origin_share_a_pool():
+    assert get_connection_pool('http://127.0.0.1:9/a') is get_connection_pool('http://127.0.0.1:9/b')
+    assert get_connection_pool('http://127.0.0.1:9/') is not get_connection_pool('http://127.0.0.2:9/')
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('2.5') == 2.5
+    assert parse_retry_after('-1') == 0.0
+    assert parse_retry_after('Wed, 21 Oct 2026 07:28:00 GMT') is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,45 @@
+"""Tests of the benchmark suite's statistics and regression check."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from run_benchmarks import compare, summarize  # noqa: E402
+
+
+def test_summarize_reports_percentiles_in_milliseconds():
+    stats = summarize([i / 1000 for i in range(1, 101)], elapsed=2.0)
+    
+    assert stats['operations'] == 100
+    assert stats['mean_ms'] == pytest.approx(50.5)
+    assert stats['p50_ms'] == pytest.approx(51)
+    assert stats['p99_ms'] == pytest.approx(100)
+    assert stats['throughput_ops'] == 50
+
+
+def test_compare_flags_slower_latency_and_lower_throughput():
+    baseline = {'fast': {'p50_ms': 10.0, 'throughput_ops': 100.0}}
+    
+    assert compare({'fast': {'p50_ms': 12.0, 'throughput_ops': 90.0}}, baseline, 0.25) == []
+    regressions = compare({'fast': {'p50_ms': 13.0, 'throughput_ops': 70.0}}, baseline, 0.25)
+    assert len(regressions) == 2
+    # Benchmarks missing from the baseline are not compared
+    assert compare({'new': {'p50_ms': 1.0, 'throughput_ops': 1.0}}, baseline, 0.25) == []
+
+
+def test_suite_runs_and_checks_a_baseline(tmp_path):
+    output = tmp_path / 'results.json'
+    baseline = tmp_path / 'baseline.json'
+    command = [sys.executable, os.path.join(ROOT, 'benchmarks', 'run_benchmarks.py'), '--iterations', '5',
+               '--only', 'load_config', '--output', str(output), '--baseline', str(baseline)]
+    
+    subprocess.run(command + ['--update-baseline'], check=True, capture_output=True, cwd=tmp_path)
+    assert json.loads(baseline.read_text())['results']['load_config']['operations'] > 0
+    # A generous threshold, so timing noise cannot fail the comparison
+    subprocess.run(command + ['--threshold', '1000'], check=True, capture_output=True, cwd=tmp_path)
@@ -0,0 +1,34 @@
+"""Tests of the multimedia_generator command-line interface."""
+
+import os
+import sys
+import subprocess
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'multimedia_generator.py')
+
+
+def run_cli(*args, cwd):
+    """Run the CLI and return its output."""
+    proc = subprocess.run([sys.executable, SCRIPT, *args], cwd=cwd, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    return proc.stdout
+
+
+def images(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith('image_'))
+
+
+def test_repeated_request_is_served_from_cache(tmp_path):
+    run_cli('image', 'a cat', '--output-dir', 'out', cwd=tmp_path)
+    output = run_cli('image', 'a cat', '--output-dir', 'out', cwd=tmp_path)
+    
+    assert "served from cache" in output
+    assert len(images(tmp_path / 'out')) == 1
+
+
+def test_no_cache_generates_new_output(tmp_path):
+    run_cli('image', 'a cat', '--output-dir', 'out', cwd=tmp_path)
+    output = run_cli('image', 'a cat', '--output-dir', 'out', '--no-cache', cwd=tmp_path)
+    
+    assert "served from cache" not in output
+    assert len(images(tmp_path / 'out')) == 2
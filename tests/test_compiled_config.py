@@ -0,0 +1,53 @@
+"""Tests of config compilation and per-call parameter resolution."""
+
+import pytest
+
+from compiled_config import CompiledConfig, ConfigError
+
+
+def test_defaults_layer_over_builtins():
+    compiled = CompiledConfig({'default_format': 'jpg', 'defaults': {'image': {'style': 'cartoon'}}})
+    
+    assert compiled.defaults['image'] == {'size': '1024x1024', 'style': 'cartoon', 'format': 'jpg'}
+    with pytest.raises(TypeError):
+        compiled.defaults['image']['style'] = 'other'
+
+
+def test_config_error_lists_every_problem():
+    with pytest.raises(ConfigError) as excinfo:
+        CompiledConfig({
+            'max_workers': 0,
+            'defaults': {'video': {'fps': 'fast'}, 'sound': {}},
+            'storage': {'layout': 'tree'},
+        })
+    
+    problems = excinfo.value.problems
+    assert "'max_workers' must be a positive integer" in problems
+    assert "video 'fps' must be a positive integer, got 'fast'" in problems
+    assert "'defaults' has unknown media type 'sound'" in problems
+    assert any(problem.startswith("'storage.layout' must be one of") for problem in problems)
+    assert str(excinfo.value).startswith("Invalid config:\n  - ")
+
+
+def test_resolve_merges_known_parameters():
+    compiled = CompiledConfig({})
+    
+    params = compiled.resolve('video', {'fps': 24, 'size': '10x10', 'unrelated': True})
+    assert params == {'duration': 5, 'resolution': '1920x1080', 'fps': 24, 'style': 'realistic', 'format': 'mp4'}
+
+
+@pytest.mark.parametrize('media_type, params, problem', [
+    ('image', {'size': 'abc'}, "image 'size' must be 'WIDTHxHEIGHT', got 'abc'"),
+    ('video', {'fps': 0}, "video 'fps' must be a positive integer, got 0"),
+    ('text', {'temperature': 9}, "text 'temperature' must be a number from 0 to 2, got 9"),
+])
+def test_resolve_rejects_invalid_parameters(media_type, params, problem):
+    with pytest.raises(ValueError) as excinfo:
+        CompiledConfig({}).resolve(media_type, params)
+    
+    assert str(excinfo.value) == f"Invalid parameters:\n  - {problem}"
+
+
+def test_resolve_rejects_disabled_media_type():
+    with pytest.raises(ValueError, match="disabled"):
+        CompiledConfig({'enable_audio': False}).resolve('audio', {})
@@ -0,0 +1,77 @@
+"""Tests of the event bus and its reporters."""
+
+import io
+import json
+
+from events import (
+    CACHE_HIT, JOB_STARTED, STAGE_DONE, ConsoleReporter, EventBus, JSONEventLog, format_event
+)
+
+
+def test_bus_delivers_events_to_subscribers():
+    bus = EventBus()
+    assert not bus
+    received = []
+    subscriber = bus.subscribe(received.append)
+    assert bus
+    
+    bus.emit(JOB_STARTED, media_type='text', prompt='a story')
+    bus.unsubscribe(subscriber)
+    bus.emit(JOB_STARTED, media_type='text', prompt='ignored')
+    
+    assert len(received) == 1
+    assert received[0]['event'] == JOB_STARTED
+    assert received[0]['prompt'] == 'a story'
+    assert 'time' in received[0]
+
+
+def test_close_closes_subscribers():
+    closed = []
+    
+    class Subscriber:
+        def __call__(self, event):
+            pass
+        
+        def close(self):
+            closed.append(self)
+    
+    bus = EventBus()
+    bus.subscribe(Subscriber())
+    bus.subscribe(print)
+    bus.close()
+    
+    assert len(closed) == 1
+    assert not bus
+
+
+def test_verbose_events_are_hidden_by_default():
+    event = {'event': STAGE_DONE, 'media_type': 'image', 'stage': 'backend', 'elapsed': 0.25}
+    
+    assert format_event(event) is None
+    assert format_event(event, verbose=True) == "  image backend done (250.0 ms)"
+    assert format_event({'event': CACHE_HIT, 'media_type': 'image', 'path': 'a.png'}) == (
+        "✓ Image served from cache: a.png"
+    )
+
+
+def test_console_reporter_writes_every_event_before_close():
+    stream = io.StringIO()
+    reporter = ConsoleReporter(stream)
+    for index in range(100):
+        reporter({'event': CACHE_HIT, 'media_type': 'text', 'path': f"{index}.txt"})
+    reporter.close()
+    
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 100
+    assert lines[-1] == "✓ Text served from cache: 99.txt"
+
+
+def test_json_event_log_appends_lines(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    bus = EventBus()
+    bus.subscribe(JSONEventLog(str(path)))
+    bus.emit(JOB_STARTED, media_type='video', prompt='waves')
+    bus.close()
+    
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(event['event'], event['media_type']) for event in events] == [(JOB_STARTED, 'video')]
@@ -0,0 +1,102 @@
+"""Tests of the SQLite generation history."""
+
+import json
+
+import pytest
+
+from events import ARTIFACT_WRITTEN, CACHE_HIT, JOB_FAILED, EventBus
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    yield store
+    store.close()
+
+
+def add_entries(history, count, media_type='image'):
+    for index in range(count):
+        history.add({'timestamp': f"2026-01-01T00:00:{index:02d}", 'type': media_type, 'prompt': f"prompt {index}"})
+
+
+def test_filters_and_counts(history):
+    add_entries(history, 3, 'image')
+    add_entries(history, 2, 'text')
+    history.add({'type': 'text', 'prompt': '100% done_', 'status': 'failed'})
+    
+    assert history.count() == 6
+    assert history.count(types=['text']) == 3
+    assert history.count(types=[]) == 0
+    assert history.count(status='failed') == 1
+    assert [entry['prompt'] for entry in history.query(prompt='prompt 1')] == ['prompt 1', 'prompt 1']
+    # LIKE wildcards in the search text match literally
+    assert history.count(search='% done_') == 1
+    assert history.count(search='_') == 1
+    assert history.count_by_type() == {'image': 3, 'text': 3}
+
+
+def test_entries_persist_across_connections(tmp_path):
+    path = str(tmp_path / 'history.db')
+    first = HistoryStore(path)
+    entry_id = first.add({'type': 'video', 'prompt': 'waves', 'params': {'fps': 24}})
+    first.close()
+    
+    second = HistoryStore(path)
+    try:
+        entry = second.get(entry_id)
+        assert (entry['type'], entry['params']) == ('video', {'fps': 24})
+        assert second.get(entry_id + 1) is None
+    finally:
+        second.close()
+
+
+def test_records_generator_events(history):
+    bus = EventBus()
+    bus.subscribe(history)
+    bus.emit(ARTIFACT_WRITTEN, media_type='image', path='a.png', artifact_id='01A', prompt='a fox', params={})
+    bus.emit(CACHE_HIT, media_type='image', path='a.png', prompt='a fox', params={})
+    bus.emit(JOB_FAILED, media_type='audio', prompt='rain', error='backend down')
+    
+    oldest, cached, failed = history.query(newest_first=False)
+    assert (oldest['file_path'], oldest['artifact_id']) == ('a.png', '01A')
+    assert cached['cached']
+    assert (failed['status'], failed['error']) == ('failed', 'backend down')
+
+
+def test_clear(history):
+    add_entries(history, 3)
+    history.clear()
+    assert history.count() == 0
+
+
+def test_pages_follow_the_sort_order(history):
+    add_entries(history, 10)
+    
+    newest = history.query_summaries(limit=4, offset=4)
+    assert [entry['prompt'] for entry in newest] == ['prompt 5', 'prompt 4', 'prompt 3', 'prompt 2']
+    assert set(newest[0]) == {'id', 'timestamp', 'type', 'status', 'prompt', 'file_path'}
+    oldest = history.query(newest_first=False, limit=3)
+    assert [entry['prompt'] for entry in oldest] == ['prompt 0', 'prompt 1', 'prompt 2']
+
+
+def test_iter_entries_reads_in_batches(history):
+    add_entries(history, 7)
+    # Entries sharing a timestamp must not be skipped at batch boundaries
+    for _ in range(3):
+        history.add({'timestamp': '2026-01-01T00:00:03', 'type': 'text', 'prompt': 'same time'})
+    
+    entries = list(history.iter_entries(batch_size=2))
+    assert len(entries) == 10
+    assert len({entry['id'] for entry in entries}) == 10
+    assert len(list(history.iter_entries(types=['text'], batch_size=2))) == 3
+
+
+def test_export_json(history, tmp_path):
+    add_entries(history, 3)
+    path = tmp_path / 'export.json'
+    
+    assert history.export_json(str(path)) == 3
+    assert [entry['prompt'] for entry in json.loads(path.read_text())] == ['prompt 0', 'prompt 1', 'prompt 2']
+    assert history.export_json(str(path), types=['video']) == 0
+    assert json.loads(path.read_text()) == []
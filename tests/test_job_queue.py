@@ -0,0 +1,196 @@
+"""Tests of the background job manager and the durable batch queue."""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+from job_queue import CANCELLED, DONE, FAILED, BatchQueue, JobManager, job_key
+from multimedia_generator import ProjectGenerationError, UnlimitedMultimediaGenerator, resume_batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_jobs(path, count):
+    with open(path, 'w') as f:
+        for index in range(count):
+            f.write(json.dumps({'id': f"job-{index}", 'type': 'text', 'prompt': f"prompt {index}"}) + "\n")
+
+
+def test_results_survive_a_crash_after_checkpoint(tmp_path):
+    jobs_path = tmp_path / 'jobs.jsonl'
+    results_path = tmp_path / 'results.jsonl'
+    write_jobs(jobs_path, 6)
+    # Kill the process without any cleanup right after the third job is checkpointed
+    script = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {ROOT!r})
+        from job_queue import BatchQueue
+        from multimedia_generator import UnlimitedMultimediaGenerator, run_batch
+        
+        complete = BatchQueue.complete
+        calls = []
+        
+        def crash_after_third(self, key, result):
+            complete(self, key, result)
+            calls.append(key)
+            if len(calls) == 3:
+                os._exit(1)
+        
+        BatchQueue.complete = crash_after_third
+        generator = UnlimitedMultimediaGenerator()
+        generator.output_dir = {str(tmp_path / 'out')!r}
+        run_batch(generator, {str(jobs_path)!r}, {str(results_path)!r}, max_workers=1)
+    """)
+    proc = subprocess.run([sys.executable, '-c', script], cwd=tmp_path)
+    assert proc.returncode == 1
+    
+    generator = UnlimitedMultimediaGenerator()
+    generator.output_dir = str(tmp_path / 'out')
+    try:
+        summary = resume_batch(generator, str(jobs_path), max_workers=1)
+    finally:
+        generator.close()
+    
+    assert summary['counts'] == {'done': 6}
+    with open(results_path) as f:
+        ids = {json.loads(line)['id'] for line in f}
+    assert ids == {f"job-{index}" for index in range(6)}
+
+
+@pytest.fixture
+def manager():
+    job_manager = JobManager(max_workers=1, max_finished=2)
+    yield job_manager
+    job_manager.shutdown()
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert job.finished
+
+
+def test_job_runs_in_the_background(manager):
+    job = manager.submit(lambda a, b: a + b, 2, 3, kind='text', label='add', owner='alice')
+    wait_for(job)
+    
+    assert (job.state, job.result, job.progress) == (DONE, 5, 1.0)
+    assert job.elapsed is not None
+    assert manager.get(job.id) is job
+
+
+def test_failed_job_keeps_partial_results(manager):
+    def fail():
+        raise ProjectGenerationError({'image': 'a.png'}, {'video': RuntimeError('backend down')})
+    
+    job = manager.submit(fail)
+    wait_for(job)
+    
+    assert job.state == FAILED
+    assert job.result == {'image': 'a.png'}
+    assert 'video (backend down)' in job.error
+
+
+def test_progress_callback_updates_the_job(manager):
+    release = threading.Event()
+    
+    def project(progress_callback):
+        progress_callback('image', 1, 4)
+        release.wait(5)
+    
+    job = manager.submit(project, track_progress=True)
+    while job.progress == 0.0:
+        time.sleep(0.005)
+    assert (job.progress, job.message) == (0.25, "image finished (1/4)")
+    release.set()
+    wait_for(job)
+
+
+def test_queued_jobs_can_be_cancelled_and_are_listed_per_owner(manager):
+    release = threading.Event()
+    running = manager.submit(release.wait, 5, owner='alice')
+    queued = manager.submit(print, owner='bob')
+    
+    assert manager.active_count() == 2
+    assert manager.jobs(owner='bob') == [queued]
+    assert manager.cancel(queued.id)
+    assert queued.state == CANCELLED
+    assert not manager.cancel(running.id)
+    release.set()
+    wait_for(running)
+    assert manager.active_count() == 0
+
+
+def test_finished_jobs_are_pruned_oldest_first(manager):
+    jobs = [manager.submit(int, index) for index in range(4)]
+    # Waits for the workers, pruning included
+    manager.shutdown()
+    
+    assert manager.jobs() == jobs[:1:-1]
+    manager.clear_finished()
+    assert manager.jobs() == []
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    with BatchQueue(str(tmp_path / 'queue.db')) as queue:
+        jobs = [{'id': 'a', 'type': 'text', 'prompt': 'one'}, {'type': 'image', 'prompt': 'two', 'size': '64x64'}]
+        
+        assert queue.enqueue(jobs) == 2
+        assert queue.enqueue(jobs, chunk_size=1) == 0
+        claimed = queue.claim(10)
+        assert [job['id'] for job in claimed] == ['a', job_key(jobs[1])]
+        assert claimed[1]['params'] == {'size': '64x64'}
+
+
+def test_interrupted_jobs_are_recovered_on_open(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    with BatchQueue(path) as queue:
+        queue.enqueue([{'id': 'a', 'type': 'text', 'prompt': 'one'}])
+        queue.claim(1)
+        assert queue.counts() == {'running': 1}
+    
+    with BatchQueue(path) as queue:
+        assert queue.recovered == 1
+        assert [job['id'] for job in queue.iter_claimed()] == ['a']
+        queue.complete('a', 'done text')
+        assert queue.counts() == {'done': 1}
+
+
+def test_failed_attempts_back_off_then_fail(tmp_path):
+    with BatchQueue(str(tmp_path / 'queue.db'), max_attempts=2, retry_backoff=10) as queue:
+        queue.enqueue([{'id': 'a', 'type': 'text', 'prompt': 'one'}])
+        queue.claim(1)
+        assert not queue.is_last_attempt('a')
+        
+        delay, attempts = queue.fail('a', 'timeout')
+        assert 7.5 <= delay <= 12.5
+        assert attempts == 1
+        # Not due until the backoff has passed
+        assert queue.claim(1) == []
+        assert queue.next_retry_delay() > 5
+        
+        queue._conn.execute('UPDATE jobs SET next_attempt_at = 0')
+        queue.claim(1)
+        assert queue.is_last_attempt('a')
+        assert queue.fail('a', 'timeout again') == (None, 2)
+        assert queue.counts() == {'failed': 1}
+        assert queue.next_retry_delay() is None
+        
+        assert queue.retry_failed() == 1
+        assert [job['id'] for job in queue.claim(1)] == ['a']
+
+
+def test_invalid_jobs_fail_without_retries(tmp_path):
+    with BatchQueue(str(tmp_path / 'queue.db'), max_attempts=5) as queue:
+        queue.enqueue([{'id': 'a', 'type': 'sound', 'prompt': 'one'}])
+        queue.claim(1)
+        
+        assert queue.fail('a', 'Unknown media type: sound', retry=False) == (None, 1)
+        assert queue.counts() == {'failed': 1}
@@ -0,0 +1,75 @@
+"""Tests of the artifact manifest."""
+
+import json
+import os
+
+import pytest
+
+from events import ARTIFACT_WRITTEN, JOB_STARTED, EventBus
+from manifest import ArtifactManifest
+from multimedia_generator import UnlimitedMultimediaGenerator
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    artifacts = ArtifactManifest(str(tmp_path / 'manifest.db'))
+    yield artifacts
+    artifacts.close()
+
+
+def add_artifacts(manifest, count, media_type='image'):
+    for index in range(count):
+        manifest.add(f"01A{index:03d}", media_type, f"out/{media_type}_{index}.png", 100 + index, 0.0, {'n': index})
+
+
+def test_add_get_and_find(manifest):
+    add_artifacts(manifest, 2)
+    # Rows are never replaced
+    manifest.add('01A000', 'video', 'out/other.mp4', 1, 0.0, {})
+    
+    artifact = manifest.get('01A000')
+    assert (artifact['type'], artifact['path'], artifact['params']) == ('image', 'out/image_0.png', {'n': 0})
+    assert manifest.find('out/image_1.png')['id'] == '01A001'
+    assert manifest.get('missing') is None
+    assert manifest.find('out/missing.png') is None
+
+
+def test_list_pages_by_id(manifest):
+    add_artifacts(manifest, 5, 'image')
+    manifest.add('01B000', 'video', 'out/video.mp4', 1, 0.0, {})
+    
+    first = manifest.list(limit=2)
+    assert [artifact['id'] for artifact in first] == ['01B000', '01A004']
+    second = manifest.list(after=first[-1]['id'], limit=2)
+    assert [artifact['id'] for artifact in second] == ['01A003', '01A002']
+    assert [artifact['id'] for artifact in manifest.list(types=['video'])] == ['01B000']
+    assert manifest.list(types=[]) == []
+    assert len(list(manifest.iter_artifacts(batch_size=2))) == 6
+    assert (manifest.count(), manifest.count(types=['image']), manifest.count(types=[])) == (6, 5, 0)
+
+
+def test_records_artifact_events(manifest):
+    bus = EventBus()
+    bus.subscribe(manifest)
+    bus.emit(JOB_STARTED, media_type='image', prompt='a fox')
+    bus.emit(ARTIFACT_WRITTEN, media_type='image', path='out/a.png', artifact_id='01A', size=3,
+             prompt='a fox', params={'size': '64x64'})
+    
+    assert manifest.count() == 1
+    assert manifest.get('01A')['size'] == 3
+
+
+def test_generator_shards_and_indexes_artifacts(tmp_path):
+    output_dir = tmp_path / 'out'
+    (tmp_path / 'config.json').write_text(json.dumps({'output_dir': str(output_dir), 'storage': {'layout': 'hash'}}))
+    generator = UnlimitedMultimediaGenerator(str(tmp_path / 'config.json'))
+    try:
+        path = generator.generate_image('a fox', size='64x64')
+        artifact = generator.list_artifacts()[0]
+        
+        assert os.path.dirname(os.path.dirname(path)) == str(output_dir)
+        assert artifact['path'] == path
+        assert generator.find_artifact(artifact['id'])['type'] == 'image'
+        assert generator.get_metadata(path)['size'] == '64x64'
+    finally:
+        generator.close()
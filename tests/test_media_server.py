@@ -0,0 +1,86 @@
+"""Tests of the media file server."""
+
+import os
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+
+import pytest
+
+from media_server import MediaServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A media server rooted at a temporary directory with one video in it."""
+    (tmp_path / 'media').mkdir()
+    (tmp_path / 'media' / 'clip one.mp4').write_bytes(bytes(range(256)) * 4)
+    (tmp_path / 'secret.txt').write_text('secret')
+    media_server = MediaServer(root=str(tmp_path / 'media'))
+    yield media_server
+    media_server.close()
+
+
+def fetch(url: str, headers=None):
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+        return response.status, dict(response.headers), response.read()
+
+
+def status_of(url: str) -> int:
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(url)
+    return error.value.code
+
+
+def test_signed_url_serves_the_file(server, tmp_path):
+    path = str(tmp_path / 'media' / 'clip one.mp4')
+    status, headers, body = fetch(server.url(path))
+    
+    assert status == 200
+    assert body == (tmp_path / 'media' / 'clip one.mp4').read_bytes()
+    assert headers['Content-Type'] == 'video/mp4'
+    assert server.resolve(urlsplit(server.url(path)).path) == os.path.realpath(path)
+
+
+def test_tampered_signature_or_path_is_forbidden(server, tmp_path):
+    url = server.url(str(tmp_path / 'media' / 'clip one.mp4'))
+    base = url.rpartition('/')[0]
+    signature = base.rsplit('/', 1)[1]
+    
+    assert status_of(url.replace(signature, '0' * len(signature))) == 403
+    assert status_of(f"{base}/other.mp4") == 403
+    # Even a correctly signed path may not leave the root
+    assert server.resolve(f"/media/{server._sign('../secret.txt')}/..%2Fsecret.txt") is None
+
+
+def test_files_outside_the_root_get_no_url(server, tmp_path):
+    assert not server.serves(str(tmp_path / 'secret.txt'))
+    with pytest.raises(ValueError):
+        server.url(str(tmp_path / 'secret.txt'))
+
+
+def test_other_server_signatures_are_rejected(server, tmp_path):
+    other = MediaServer(root=str(tmp_path / 'media'))
+    try:
+        url = other.url(str(tmp_path / 'media' / 'clip one.mp4'))
+    finally:
+        other.close()
+    assert server.resolve(urlsplit(url).path) is None
+
+
+def test_range_requests(server, tmp_path):
+    url = server.url(str(tmp_path / 'media' / 'clip one.mp4'))
+    
+    status, headers, body = fetch(url, {'Range': 'bytes=10-19'})
+    assert (status, body) == (206, bytes(range(10, 20)))
+    assert headers['Content-Range'] == 'bytes 10-19/1024'
+    status, _, body = fetch(url, {'Range': 'bytes=-4'})
+    assert body == bytes(range(252, 256))
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(url, {'Range': 'bytes=2000-'})
+    assert error.value.code == 416
+
+
+def test_download_sets_attachment(server, tmp_path):
+    _, headers, _ = fetch(server.url(str(tmp_path / 'media' / 'clip one.mp4'), download=True))
+    assert headers['Content-Disposition'] == "attachment; filename*=UTF-8''clip%20one.mp4"
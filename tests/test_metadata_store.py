@@ -0,0 +1,86 @@
+"""Tests of the JSONL metadata log."""
+
+import json
+import os
+
+import pytest
+
+from metadata_store import MetadataLog
+from multimedia_generator import UnlimitedMultimediaGenerator
+
+
+@pytest.fixture
+def log(tmp_path):
+    metadata_log = MetadataLog(str(tmp_path / 'metadata'))
+    yield metadata_log
+    metadata_log.close()
+
+
+def test_append_returns_the_record_location(log):
+    first = log.append('out/a.png', {'id': 'a', 'width': 512})
+    second = log.append('out/b.png', {'id': 'b'})
+    
+    assert first[1] == 0
+    assert MetadataLog.read(*first) == {'id': 'a', 'width': 512}
+    assert MetadataLog.read(*second) == {'id': 'b'}
+    assert list(log.iter_records()) == [('out/a.png', {'id': 'a', 'width': 512}), ('out/b.png', {'id': 'b'})]
+
+
+def test_segments_roll_at_size(tmp_path):
+    log = MetadataLog(str(tmp_path / 'metadata'), segment_bytes=100)
+    locations = [log.append(f"out/{i}.png", {'id': str(i), 'prompt': 'x' * 100}) for i in range(4)]
+    log.close()
+    
+    assert len({segment for segment, _ in locations}) == 4
+    assert [MetadataLog.read(*location)['id'] for location in locations] == ['0', '1', '2', '3']
+
+
+def test_reopen_continues_after_a_partial_record(tmp_path):
+    directory = str(tmp_path / 'metadata')
+    log = MetadataLog(directory)
+    segment, _ = log.append('out/a.png', {'id': 'a'})
+    log.close()
+    with open(segment, 'a') as f:
+        # A crash in the middle of an append
+        f.write('{"path": "out/b.p')
+    
+    log = MetadataLog(directory)
+    location = log.append('out/c.png', {'id': 'c'})
+    log.close()
+    
+    assert location[0] != segment
+    assert [path for path, _ in MetadataLog(directory).iter_records()] == ['out/a.png', 'out/c.png']
+
+
+def test_append_after_close_fails(log):
+    log.close()
+    with pytest.raises(ValueError):
+        log.append('out/a.png', {})
+
+
+def test_export_sidecars(log, tmp_path):
+    artifact = str(tmp_path / 'out' / 'a.png')
+    log.append(artifact, {'id': 'a'})
+    
+    assert log.export_sidecars() == 1
+    with open(f"{artifact}.json") as f:
+        assert json.load(f) == {'id': 'a'}
+    assert log.export_sidecars() == 0
+    assert log.export_sidecars(overwrite=True) == 1
+    assert os.listdir(tmp_path / 'out') == ['a.png.json']
+
+
+def test_generator_keeps_metadata_in_the_log(tmp_path):
+    output_dir = tmp_path / 'out'
+    (tmp_path / 'config.json').write_text(json.dumps({'output_dir': str(output_dir), 'storage': {'metadata': 'jsonl'}}))
+    generator = UnlimitedMultimediaGenerator(str(tmp_path / 'config.json'))
+    try:
+        path = generator.generate_image('a fox', size='64x64')
+        
+        assert not os.path.exists(f"{path}.json")
+        assert generator.get_metadata(path)['size'] == '64x64'
+        assert generator.export_sidecars() == 1
+        with open(f"{path}.json") as f:
+            assert json.load(f)['prompt'] == 'a fox'
+    finally:
+        generator.close()
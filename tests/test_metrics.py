@@ -0,0 +1,76 @@
+"""Tests of generation metrics and their sinks."""
+
+import io
+import json
+import urllib.request
+
+import pytest
+
+from metrics import GenerationMetrics, JSONLogSink, PrometheusFileSink, StageTimer, create_sink
+
+
+def timer_with(**stages) -> StageTimer:
+    timer = StageTimer()
+    timer.stages.update(stages)
+    return timer
+
+
+def test_record_counts_outcomes_and_stage_times():
+    metrics = GenerationMetrics()
+    metrics.record('image', timer_with(backend=0.2, write=0.01))
+    metrics.record('image', timer_with(backend=0.4, write=0.03))
+    metrics.record('image', timer_with(cache=0.001), status='cached')
+    metrics.increment('cache_hits', 'image')
+    
+    snapshot = metrics.snapshot()
+    assert snapshot['counters'] == {'image.success': 2, 'image.cached': 1, 'image.cache_hits': 1}
+    assert snapshot['stages']['image.backend'] == {'count': 2, 'mean_seconds': pytest.approx(0.3)}
+    assert snapshot['percentiles']['image']['p50'] == pytest.approx(0.21)
+
+
+def test_prometheus_histograms_are_cumulative():
+    metrics = GenerationMetrics()
+    metrics.record('text', timer_with(backend=0.003))
+    metrics.record('text', timer_with(backend=2.0))
+    
+    text = metrics.render_prometheus()
+    assert 'uic_generations_total{media_type="text",status="success"} 2' in text
+    assert 'uic_stage_duration_seconds_bucket{media_type="text",stage="backend",le="0.005"} 1' in text
+    assert 'uic_stage_duration_seconds_bucket{media_type="text",stage="backend",le="+Inf"} 2' in text
+
+
+def test_json_log_sink_writes_one_line_per_generation():
+    stream = io.StringIO()
+    metrics = GenerationMetrics([JSONLogSink(stream=stream)])
+    metrics.record('audio', timer_with(backend=0.5), status='failed')
+    
+    record = json.loads(stream.getvalue())
+    assert (record['media_type'], record['status'], record['stages']) == ('audio', 'failed', {'backend': 0.5})
+
+
+def test_prometheus_file_sink_writes_on_close(tmp_path):
+    metrics = GenerationMetrics()
+    sink = PrometheusFileSink(metrics, str(tmp_path / 'uic.prom'), interval=3600)
+    metrics.add_sink(sink)
+    metrics.record('video', timer_with(backend=1.0))
+    metrics.close()
+    
+    assert 'media_type="video"' in (tmp_path / 'uic.prom').read_text()
+
+
+def test_prometheus_http_sink_serves_metrics():
+    metrics = GenerationMetrics()
+    sink = create_sink(metrics, {'type': 'prometheus_http', 'port': 0})
+    metrics.add_sink(sink)
+    metrics.record('image', timer_with(backend=0.1))
+    try:
+        with urllib.request.urlopen(sink.url) as response:
+            assert b'media_type="image"' in response.read()
+    finally:
+        metrics.remove_sinks([sink])
+    assert metrics.sinks == []
+
+
+def test_unknown_sink_type_is_rejected():
+    with pytest.raises(ValueError, match='statsd'):
+        create_sink(GenerationMetrics(), {'type': 'statsd'})
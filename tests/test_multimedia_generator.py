@@ -0,0 +1,267 @@
+"""Tests of UnlimitedMultimediaGenerator."""
+
+import asyncio
+import gc
+import json
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from multimedia_generator import (
+    ProjectGenerationError, UnlimitedMultimediaGenerator, _ArtifactIdGenerator, iter_batch_jobs
+)
+
+
+@pytest.fixture
+def make_generator(tmp_path):
+    """Build generators from a config file in a temporary directory, closing them afterwards."""
+    generators = []
+    
+    def make(**config):
+        config.setdefault('output_dir', str(tmp_path / 'out'))
+        path = tmp_path / 'config.json'
+        path.write_text(json.dumps(config))
+        generator = UnlimitedMultimediaGenerator(str(path))
+        generators.append(generator)
+        return generator
+    
+    yield make
+    for generator in generators:
+        generator.close()
+
+
+def test_dropped_view_stays_open_while_held(make_generator, tmp_path):
+    generator = make_generator(max_views=2)
+    held = generator.with_output_dir(str(tmp_path / 'a'))
+    for name in 'bcd':
+        generator.with_output_dir(str(tmp_path / name))
+    
+    assert len(generator._views) == 2
+    held.generate_text('hello')
+    assert held.history.count() == 1
+    # Asking for the directory again returns the view still in use
+    assert generator.with_output_dir(str(tmp_path / 'a')) is held
+
+
+def test_dropped_view_is_closed_once_unreferenced(make_generator, tmp_path):
+    generator = make_generator(max_views=1)
+    view = generator.with_output_dir(str(tmp_path / 'a'))
+    finalizer = view._finalizer
+    generator.with_output_dir(str(tmp_path / 'b'))
+    
+    assert finalizer.alive
+    del view
+    gc.collect()
+    assert not finalizer.alive
+
+
+def test_close_closes_dropped_views(make_generator, tmp_path):
+    generator = make_generator(max_views=1)
+    held = generator.with_output_dir(str(tmp_path / 'a'))
+    generator.with_output_dir(str(tmp_path / 'b'))
+    
+    generator.close()
+    assert not held._finalizer.alive
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def test_reload_replaces_metrics_sinks(make_generator, tmp_path):
+    first, second = tmp_path / 'first.jsonl', tmp_path / 'second.jsonl'
+    generator = make_generator(metrics={'enabled': True, 'sinks': [{'type': 'json_log', 'path': str(first)}]})
+    metrics = generator.metrics
+    generator.generate_text('one')
+    
+    (tmp_path / 'config.json').write_text(json.dumps({
+        'output_dir': str(tmp_path / 'out'),
+        'metrics': {'enabled': True, 'sinks': [{'type': 'json_log', 'path': str(second)}]},
+    }))
+    assert generator.reload_config()
+    generator.generate_text('two')
+    
+    # The registry and its counts are kept, only the sinks are swapped
+    assert generator.metrics is metrics
+    assert len(metrics.sinks) == 1
+    assert len(first.read_text().splitlines()) == 1
+    assert len(second.read_text().splitlines()) == 1
+
+
+def test_reload_disabling_metrics_releases_http_port(make_generator, tmp_path):
+    port = _free_port()
+    generator = make_generator(metrics={'enabled': True, 'sinks': [{'type': 'prometheus_http', 'port': port}]})
+    assert generator.metrics is not None
+    
+    (tmp_path / 'config.json').write_text(json.dumps({'output_dir': str(tmp_path / 'out')}))
+    assert generator.reload_config()
+    
+    assert generator.metrics is None
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', port))
+
+
+def test_project_generates_every_type_concurrently(make_generator):
+    generator = make_generator()
+    progress = []
+    
+    results = generator.generate_multimedia_project(
+        {'text': 'a story', 'image': 'a fox', 'audio': 'rain', 'video': 'waves'},
+        concurrent=True, progress_callback=lambda media_type, done, total: progress.append((done, total))
+    )
+    
+    assert sorted(results) == ['audio', 'image', 'text', 'video']
+    assert 'a story' in results['text']
+    # The simulated backend produces no media bytes, only the metadata sidecars
+    assert all(os.path.exists(f"{results[media_type]}.json") for media_type in ('image', 'audio', 'video'))
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_project_reports_failed_jobs_with_partial_results(make_generator):
+    generator = make_generator()
+    
+    with pytest.raises(ProjectGenerationError) as excinfo:
+        generator.generate_multimedia_project({'image': 'a fox', 'video': 'waves'}, video_params={'fps': 0})
+    
+    assert list(excinfo.value.results) == ['image']
+    assert list(excinfo.value.errors) == ['video']
+
+
+def test_batch_reports_each_job(make_generator):
+    generator = make_generator()
+    jobs = [
+        {'id': 'fox', 'type': 'image', 'prompt': 'a fox', 'size': '64x64'},
+        {'id': 'bad', 'type': 'sound', 'prompt': 'rain'},
+        {'id': 'empty', 'type': 'text'},
+    ]
+    
+    records = {record['id']: record for record in generator.generate_batch(jobs, max_workers=2)}
+    
+    assert records['fox']['status'] == 'success'
+    assert generator.get_metadata(records['fox']['result'])['size'] == '64x64'
+    bad = records['bad']
+    assert (bad['status'], bad['error'], bad['retryable']) == ('failed', 'Unknown media type: sound', False)
+    assert records['empty']['error'] == 'Job has no prompt'
+
+
+def test_batch_pulls_jobs_lazily(make_generator):
+    generator = make_generator()
+    pulled = []
+    
+    def jobs():
+        for index in range(100):
+            pulled.append(index)
+            yield {'type': 'text', 'prompt': f"prompt {index}"}
+    
+    records = generator.generate_batch(jobs(), max_workers=2)
+    next(records)
+    # At most 2 * max_workers jobs are pending, plus the one being added
+    assert len(pulled) <= 5
+    assert sum(1 for _ in records) == 99
+
+
+def test_iter_batch_jobs_decodes_csv_cells(tmp_path):
+    path = tmp_path / 'jobs.csv'
+    path.write_text('id,type,prompt,duration,params\n7,video,waves,10,"{""fps"": 24}"\n')
+    
+    assert list(iter_batch_jobs(str(path))) == [
+        {'id': '7', 'type': 'video', 'prompt': 'waves', 'duration': 10, 'params': {'fps': 24}}
+    ]
+
+
+def test_artifact_ids_are_monotonic_within_a_millisecond():
+    ids = _ArtifactIdGenerator()
+    now = time.time_ns()
+    generated = [ids.new_id(now) for _ in range(1000)]
+    
+    assert generated == sorted(generated)
+    assert len(set(generated)) == 1000
+    assert all(len(artifact_id) == 26 for artifact_id in generated)
+    assert _ArtifactIdGenerator.timestamp_ms(generated[0]) == now // 1_000_000
+
+
+def test_artifact_ids_stay_monotonic_when_the_clock_steps_back():
+    ids = _ArtifactIdGenerator()
+    now = time.time_ns()
+    later = ids.new_id(now)
+    
+    assert ids.new_id(now - 5_000_000_000) > later
+
+
+def test_artifact_ids_are_unique_across_threads():
+    ids = _ArtifactIdGenerator()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        generated = list(pool.map(lambda _: ids.new_id(time.time_ns()), range(5000)))
+    assert len(set(generated)) == 5000
+
+
+def test_stream_text_yields_chunks_of_the_saved_text(make_generator, tmp_path):
+    generator = make_generator(cache={'enabled': False})
+    chunks = list(generator.stream_text('a story'))
+    
+    assert len(chunks) > 1
+    saved = [path for path in (tmp_path / 'out').iterdir() if path.suffix == '.txt']
+    assert len(saved) == 1
+    assert saved[0].read_text() == ''.join(chunks)
+
+
+def test_abandoned_stream_leaves_no_artifact(make_generator, tmp_path):
+    generator = make_generator(cache={'enabled': False})
+    stream = generator.stream_text('a story')
+    next(stream)
+    stream.close()
+    
+    assert not [path for path in (tmp_path / 'out').iterdir() if '.txt' in path.name]
+
+
+def test_async_project_runs_jobs_concurrently(make_generator):
+    generator = make_generator(cache={'enabled': False}, backends={'default': {'provider': 'stub', 'latency': 0.3}})
+    prompts = {'text': 'a story', 'image': 'a fox', 'audio': 'rain', 'video': 'waves'}
+    
+    started = time.monotonic()
+    results = asyncio.run(generator.agenerate_multimedia_project(prompts))
+    
+    assert sorted(results) == sorted(prompts)
+    # Four 0.3 s backend calls overlap instead of adding up
+    assert time.monotonic() - started < 1.0
+
+
+def test_async_stream_matches_async_generate(make_generator):
+    generator = make_generator(cache={'enabled': False}, backends={'default': {'provider': 'stub'}})
+    
+    async def run():
+        chunks = [chunk async for chunk in generator.astream_text('a story')]
+        return chunks, await generator.agenerate_text('a story')
+    
+    chunks, text = asyncio.run(run())
+    assert ''.join(chunks) == text
+
+
+def test_invalid_config_reload_keeps_the_current_config(make_generator, tmp_path):
+    generator = make_generator(max_workers=2)
+    (tmp_path / 'config.json').write_text(json.dumps({'max_workers': 0}))
+    
+    assert not generator.reload_config()
+    assert generator.config['max_workers'] == 2
+    (tmp_path / 'config.json').write_text('{not json')
+    assert not generator.reload_config()
+
+
+def test_reload_keeps_unchanged_backends(make_generator, tmp_path):
+    generator = make_generator(backends={'default': {'provider': 'simulated'}, 'image': {'provider': 'stub'}})
+    text_backend, image_backend = generator.backends['text'], generator.backends['image']
+    
+    (tmp_path / 'config.json').write_text(json.dumps({
+        'output_dir': str(tmp_path / 'out'),
+        'backends': {'default': {'provider': 'simulated'}, 'image': {'provider': 'stub', 'payload_size': 8}},
+    }))
+    assert generator.reload_config()
+    
+    assert generator.backends['text'] is text_backend
+    assert generator.backends['image'] is not image_backend
+    assert generator.backends['image'].payload_size == 8
@@ -0,0 +1,61 @@
+"""Tests of media post-processing."""
+
+import os
+
+import pytest
+
+import postprocess
+from atomic_io import temp_path
+from postprocess import PostProcessor, parse_size, thumbnail_path
+
+
+def test_parse_size():
+    assert parse_size('640x480') == (640, 480)
+    assert parse_size('640X480') == (640, 480)
+    assert parse_size('large') is None
+    assert parse_size(None) is None
+
+
+def test_thumbnail_path():
+    assert thumbnail_path('out/image_01.png') == 'out/image_01.thumb.jpg'
+
+
+def test_disabled_processing_handles_nothing():
+    processor = PostProcessor(resize=False, thumbnails=False)
+    assert not any(processor.handles(media_type) for media_type in ('text', 'image', 'audio', 'video'))
+
+
+def test_process_moves_worker_outputs_into_place(tmp_path, monkeypatch):
+    artifact = tmp_path / 'image.png'
+    artifact.write_text('original')
+    
+    def fake_processor(path, params, options):
+        tmp_file = temp_path(path)
+        with open(tmp_file, 'w') as f:
+            f.write(params['size'])
+        return {'files': [(tmp_file, path)], 'resized': params['size']}
+    
+    monkeypatch.setitem(postprocess.PROCESSORS, 'image', fake_processor)
+    outputs = PostProcessor().process('image', str(artifact), {'size': '64x64'})
+    
+    assert outputs == {'resized': '64x64'}
+    assert artifact.read_text() == '64x64'
+    assert os.listdir(tmp_path) == ['image.png']
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_images_are_resized_and_thumbnailed(tmp_path, workers):
+    image_module = pytest.importorskip('PIL.Image')
+    artifact = str(tmp_path / 'image.png')
+    image_module.new('RGB', (600, 400), 'red').save(artifact)
+    processor = PostProcessor(workers=workers, thumbnail_size=100)
+    try:
+        outputs = processor.process('image', artifact, {'size': '300x200'})
+    finally:
+        processor.close()
+    
+    assert outputs == {'resized': '300x200', 'thumbnail': thumbnail_path(artifact)}
+    with image_module.open(artifact) as image:
+        assert image.size == (300, 200)
+    with image_module.open(thumbnail_path(artifact)) as thumbnail:
+        assert thumbnail.size == (100, 67)
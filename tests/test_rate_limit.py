@@ -0,0 +1,183 @@
+"""Tests of the rate limits and adaptive concurrency."""
+
+import asyncio
+import http.server
+import threading
+import time
+
+import pytest
+
+import rate_limit
+from backends import BackendError, create_backend
+from rate_limit import SUCCESS, THROTTLED, AdaptiveConcurrency, RateLimiter, TokenBucket, estimate_tokens
+
+
+class FakeClock:
+    """Stands in for ``time.monotonic`` in the rate limit module."""
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', fake)
+    return fake
+
+
+def test_token_bucket_allows_a_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+    # Later callers queue behind the earlier reservation
+    assert bucket.reserve() == pytest.approx(2.0)
+    clock.now += 10
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_pause(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=5)
+    bucket.pause(3)
+    
+    assert bucket.reserve() == pytest.approx(4.0)
+
+
+def test_concurrency_increases_on_success_and_backs_off_when_throttled(clock):
+    limiter = AdaptiveConcurrency(initial=4, minimum=1, maximum=5)
+    
+    limiter.acquire()
+    limiter.release(SUCCESS)
+    assert limiter.limit == pytest.approx(4.25)
+    limiter.acquire()
+    limiter.release(THROTTLED, started=clock.now)
+    assert limiter.limit == pytest.approx(2.125)
+    # Calls started before the decrease do not lower the limit again
+    limiter.acquire()
+    limiter.release(THROTTLED, started=clock.now - 1)
+    assert limiter.limit == pytest.approx(2.125)
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release(SUCCESS)
+    assert limiter.limit == 5
+
+
+def test_concurrency_hands_slots_to_waiters_in_order():
+    limiter = AdaptiveConcurrency(initial=1)
+    limiter.acquire()
+    order = []
+    
+    def wait(name):
+        limiter.acquire()
+        order.append(name)
+        limiter.release(None)
+    
+    threads = []
+    for name in 'abc':
+        thread = threading.Thread(target=wait, args=(name,))
+        thread.start()
+        threads.append(thread)
+        while len(limiter._waiters) < len(threads):
+            time.sleep(0.001)
+    limiter.release(None)
+    for thread in threads:
+        thread.join(5)
+    assert order == ['a', 'b', 'c']
+    assert limiter.in_flight == 0
+
+
+def test_cancelled_async_waiter_gives_up_its_place():
+    limiter = AdaptiveConcurrency(initial=1)
+    
+    async def main():
+        limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release(None)
+    
+    asyncio.run(main())
+    assert limiter.in_flight == 0
+    assert not limiter._waiters
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('x' * 40, {}) == 11
+    assert estimate_tokens('x' * 40, {'max_length': 100}) == 111
+    assert estimate_tokens(None, {}) == 1
+
+
+def test_limiter_counts_throttled_calls():
+    limiter = RateLimiter(requests_per_minute=6000, initial_concurrency=2)
+    with limiter.limit('prompt', {}) as call:
+        call.throttled()
+    with pytest.raises(RuntimeError):
+        with limiter.limit('prompt', {}):
+            raise RuntimeError('provider error')
+    
+    assert limiter.snapshot() == {'throttled': 1, 'concurrency_limit': 1, 'in_flight': 0}
+
+
+def test_limiter_from_config():
+    assert RateLimiter.from_config(None) is None
+    limiter = RateLimiter.from_config({'requests_per_minute': 30, 'adaptive': False})
+    assert limiter.requests.rate == 0.5
+    assert limiter.concurrency is None
+
+
+@pytest.fixture
+def throttling_server():
+    """An HTTP service that rejects the first two requests with 429 and then answers."""
+    requests = []
+    
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            requests.append(self.path)
+            status, body = (429, b'slow down') if len(requests) <= 2 else (200, b'hello')
+            self.send_response(status)
+            if status == 429:
+                self.send_header('Retry-After', '0')
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_backend_retries_throttled_calls(throttling_server):
+    url, requests = throttling_server
+    backend = create_backend('http', base_url=url, rate_limit={'initial_concurrency': 4})
+    
+    assert backend.generate('text', 'hi', {}) == 'hello'
+    assert len(requests) == 3
+    snapshot = backend.rate_limiter.snapshot()
+    assert snapshot['throttled'] == 2
+    assert snapshot['concurrency_limit'] < 4
+
+
+def test_backend_gives_up_after_max_retries(throttling_server):
+    url, requests = throttling_server
+    backend = create_backend('http', base_url=url, max_retries=1)
+    
+    with pytest.raises(BackendError) as excinfo:
+        backend.generate('text', 'hi', {})
+    assert (excinfo.value.status, excinfo.value.retry_after) == (429, 0.0)
+    assert len(requests) == 2
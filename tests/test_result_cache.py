@@ -0,0 +1,154 @@
+"""Tests of the result cache and single-flight deduplication."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import result_cache
+from multimedia_generator import UnlimitedMultimediaGenerator
+from result_cache import ResultCache, SingleFlight
+
+
+class FakeClock:
+    """Stands in for ``time.time`` in the cache module."""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_key(prompt: str = 'a red fox') -> str:
+    return ResultCache.make_key('image', prompt, {'width': 512}, 'stub')
+
+
+def test_key_is_stable_and_content_addressed():
+    assert make_key() == ResultCache.make_key('image', 'a red fox', {'width': 512}, 'stub')
+    assert make_key() != make_key('a blue fox')
+    # Parameter order does not matter
+    assert (ResultCache.make_key('image', 'p', {'a': 1, 'b': 2}, 'stub')
+            == ResultCache.make_key('image', 'p', {'b': 2, 'a': 1}, 'stub'))
+
+
+def test_miss_then_hit(tmp_path):
+    artifact = tmp_path / 'fox.png'
+    artifact.write_bytes(b'png')
+    cache = ResultCache(str(tmp_path / 'cache'))
+    
+    assert cache.get(make_key()) is None
+    cache.put(make_key(), str(artifact))
+    assert cache.get(make_key()) == str(artifact)
+    
+    stats = cache.stats()
+    assert (stats['hits'], stats['memory_hits'], stats['misses']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    artifact = tmp_path / 'fox.png'
+    artifact.write_bytes(b'png')
+    ResultCache(str(tmp_path / 'cache')).put(make_key(), str(artifact))
+    
+    cache = ResultCache(str(tmp_path / 'cache'))
+    assert cache.get(make_key()) == str(artifact)
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_missing_artifact_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    cache.put(make_key(), str(tmp_path / 'deleted.png'))
+    
+    assert cache.get(make_key()) is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache.time, 'time', clock)
+    cache = ResultCache(str(tmp_path / 'cache'), ttl_seconds=60, exists=lambda path: True)
+    cache.put(make_key(), 'fox.png')
+    
+    clock.now += 59
+    assert cache.get(make_key()) == 'fox.png'
+    clock.now += 2
+    assert cache.get(make_key()) is None
+    assert cache.stats()['expirations'] >= 1
+    # The expired disk entry is gone too
+    assert ResultCache(str(tmp_path / 'cache'), exists=lambda path: True).get(make_key()) is None
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(None, max_entries=2, exists=lambda path: True)
+    cache.put('a', 'a.png')
+    cache.put('b', 'b.png')
+    cache.get('a')
+    cache.put('c', 'c.png')
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a.png'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_prune_bounds_disk_entries(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_disk_entries=3, exists=lambda path: True)
+    for i in range(5):
+        cache.put(make_key(str(i)), f"{i}.png")
+    cache.prune()
+    
+    assert len(list(cache._iter_disk_entries())) == 3
+
+
+def test_invalidate_and_clear(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), exists=lambda path: True)
+    cache.put('a', 'a.png')
+    cache.put('b', 'b.png')
+    
+    cache.invalidate('a')
+    assert cache.get('a') is None
+    cache.clear()
+    assert cache.get('b') is None
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    group = SingleFlight()
+    leader = group.join('key')
+    followers = [group.join('key') for _ in range(3)]
+    
+    assert leader.leader
+    assert not any(flight.leader for flight in followers)
+    assert group.coalesced == 3
+    leader.finish('result')
+    assert [flight.result() for flight in followers] == ['result'] * 3
+    # Once finished, the next call leads a new flight
+    assert group.join('key').leader
+
+
+def test_single_flight_shares_the_leaders_error():
+    group = SingleFlight()
+    leader = group.join('key')
+    follower = group.join('key')
+    
+    leader.finish(error=RuntimeError('backend down'))
+    leader.finish('ignored')
+    with pytest.raises(RuntimeError, match='backend down'):
+        follower.result()
+
+
+def test_identical_generations_run_once(tmp_path):
+    config = {
+        'output_dir': str(tmp_path / 'out'),
+        'cache': {'enabled': False},
+        'backends': {'default': {'provider': 'stub', 'latency': 0.3}},
+    }
+    (tmp_path / 'config.json').write_text(json.dumps(config))
+    generator = UnlimitedMultimediaGenerator(str(tmp_path / 'config.json'))
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            paths = list(pool.map(lambda _: generator.generate_image('a red fox'), range(4)))
+    finally:
+        generator.close()
+    
+    assert len(set(paths)) == 1
+    assert generator._inflight.coalesced == 3
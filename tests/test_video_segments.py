@@ -0,0 +1,94 @@
+"""Tests of segmented video generation."""
+
+import os
+import shlex
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from atomic_io import AtomicWriter
+from video_segments import SegmentedVideo, concat_entry, segment_format, segmenting_limitation
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """Put an 'ffmpeg' on PATH that joins a concat list's files byte-wise, unquoting entries like ffmpeg."""
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    script = bin_dir / 'ffmpeg'
+    script.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import shlex, sys
+        args = sys.argv[1:]
+        with open(args[args.index('-i') + 1]) as f:
+            paths = [shlex.split(line)[1] for line in f if line.strip()]
+        with open(args[-1], 'wb') as out:
+            for path in paths:
+                out.write(open(path, 'rb').read())
+    """))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_concat_entry_quotes_single_quotes():
+    entry = concat_entry("/media/it's here/a.ts")
+    
+    assert entry == "file '/media/it'\\''s here/a.ts'\n"
+    assert shlex.split(entry) == ['file', "/media/it's here/a.ts"]
+
+
+def test_concat_entry_rejects_line_breaks():
+    with pytest.raises(ValueError):
+        concat_entry("/media/a.ts'\nfile '/etc/passwd")
+
+
+def test_mp4_segments_are_transport_streams():
+    assert segment_format('mp4') == 'ts'
+    assert segment_format('webm') == 'webm'
+
+
+def test_limitation_of_formats_without_a_playlist(fake_ffmpeg):
+    assert segmenting_limitation('ts') is None
+    assert segmenting_limitation('mp4') is None
+    assert 'no progressive playlist' in segmenting_limitation('webm')
+
+
+def test_mp4_gets_a_playlist_and_is_joined_by_ffmpeg(tmp_path, fake_ffmpeg):
+    directory = tmp_path / "it's a dir"
+    directory.mkdir()
+    path = str(directory / 'video.mp4')
+    video = SegmentedVideo(path, {'duration': 25, 'format': 'mp4'}, 10, AtomicWriter())
+    
+    assert [video.segment_params(index)['format'] for index in range(video.count)] == ['ts'] * 3
+    for index in (2, 0, 1):
+        video.add(index, f"<{index}>".encode())
+    assert video.finish()
+    
+    with open(path, 'rb') as f:
+        assert f.read() == b'<0><1><2>'
+    with open(video.playlist_path) as f:
+        playlist = f.read()
+    assert 'segment_00002.ts' in playlist and playlist.endswith('#EXT-X-ENDLIST\n')
+
+
+def test_transport_stream_is_appended_in_order(tmp_path):
+    path = str(tmp_path / 'video.ts')
+    video = SegmentedVideo(path, {'duration': 30, 'format': 'ts'}, 10, AtomicWriter(), playlist=False)
+    for index in (1, 2, 0):
+        video.add(index, f"<{index}>".encode())
+    video.finish()
+    
+    with open(path, 'rb') as f:
+        assert f.read() == b'<0><1><2>'
+    assert not os.path.exists(video.directory)
+
+
+def test_abort_leaves_nothing_behind(tmp_path):
+    path = str(tmp_path / 'video.ts')
+    video = SegmentedVideo(path, {'duration': 30, 'format': 'ts'}, 10, AtomicWriter())
+    video.add(0, b'<0>')
+    video.abort()
+    
+    assert os.listdir(tmp_path) == []
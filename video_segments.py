@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+UNLIMITED IRON CREATOR - Segmented Video
+Splits a long video request into time segments that are generated in
+parallel as MPEG transport streams, publishes them in a progressive HLS-style
+playlist as they finish and stitches them into the final artifact with a
+streaming concat (or an ffmpeg remux into the requested container).
+"""
+
+import os
+import math
+import shutil
+import tempfile
+import threading
+import subprocess
+from typing import Dict, Any, Optional, List, Tuple
+
+from atomic_io import AtomicWriter, temp_path
+
+# Formats that can be joined by appending their bytes (MPEG transport streams)
+BYTE_CONCAT_FORMATS = ('ts', 'm2ts', 'mpegts')
+
+# Containers a transport stream can be remuxed into without re-encoding, so
+# their segments are generated as transport streams
+REMUX_FORMATS = ('mp4', 'm4v', 'mov', 'mkv', 'avi')
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def can_join(video_format: str) -> bool:
+    """Check segments of ``video_format`` can be joined here (byte-wise, or with ffmpeg)."""
+    return is_transport_stream(video_format) or shutil.which('ffmpeg') is not None
+
+
+def is_transport_stream(video_format: str) -> bool:
+    """
+    Check ``video_format`` is an MPEG transport stream, whose segments can be
+    joined by appending their bytes and listed in an HLS playlist as they are.
+    """
+    return str(video_format).lower() in BYTE_CONCAT_FORMATS
+
+
+def segment_format(video_format: str) -> str:
+    """Return the format the segments of a ``video_format`` video are generated in."""
+    if str(video_format).lower() in REMUX_FORMATS:
+        return 'ts'
+    return video_format
+
+
+def segmenting_limitation(video_format: str) -> Optional[str]:
+    """
+    Describe what keeps long ``video_format`` videos from being segmented
+    with a progressive playlist.
+    
+    Returns:
+        The reason, or None if they get one
+    """
+    if not can_join(video_format):
+        return f"joining {video_format} segments needs ffmpeg (or use the ts format)"
+    if not is_transport_stream(segment_format(video_format)):
+        return f"{video_format} segments are only joined once all are done, with no progressive playlist"
+    return None
+
+
+def concat_entry(path: str) -> str:
+    """
+    Return a line of an ffmpeg concat demuxer list for ``path``, quoted so
+    that no path can end the entry early or add directives.
+    
+    Raises:
+        ValueError: If the path contains a line break
+    """
+    if '\n' in path or '\r' in path:
+        raise ValueError(f"Cannot list a path with a line break for ffmpeg: {path!r}")
+    # Inside single quotes only a quote is special; close, escape and reopen
+    return "file '" + path.replace("'", "'\\''") + "'\n"
+
+
+def plan_segments(duration: float, segment_seconds: float) -> List[Tuple[float, float]]:
+    """
+    Split ``duration`` seconds into segments of at most ``segment_seconds``.
+    
+    Returns:
+        (start, length) of each segment, in order
+    """
+    count = max(1, math.ceil(duration / segment_seconds))
+    return [(index * segment_seconds, min(segment_seconds, duration - index * segment_seconds))
+            for index in range(count)]
+
+
+class SegmentedVideo:
+    """
+    Output side of one segmented video generation.
+    
+    Segments may finish in any order. Each one is written atomically to
+    ``<artifact>.segments/``. Segments of transport streams, and of
+    containers a transport stream can be remuxed into (MP4, MOV, MKV, AVI),
+    are generated as MPEG transport streams and listed in a playlist
+    (``<artifact>.m3u8``) that is rewritten with the finished segments from
+    the start without gaps, so a player can begin before the whole video is
+    done. A transport stream artifact is built by appending each segment as
+    soon as it is next in line; the other containers are remuxed from the
+    segments by ffmpeg's concat demuxer (stream copy, no re-encoding) once
+    all are done. Formats that cannot hold a transport stream's codecs
+    (e.g. WebM) are generated in their own format, joined the same way, and
+    get no playlist. Nothing reads a whole segment into memory.
+    """
+    
+    def __init__(self, path: str, params: Dict[str, Any], segment_seconds: float,
+                 writer: AtomicWriter, playlist: bool = True, max_parallel: int = 4):
+        """
+        Plan the segments of the video at ``path``.
+        
+        Args:
+            path: Final artifact path
+            params: Resolved video parameters ('duration', 'format', ...)
+            segment_seconds: Longest segment
+            writer: Writer used for segments, playlist and artifact
+            playlist: Publish a progressive playlist (and keep the
+                segments); only for transport streams
+            max_parallel: Most segments generated at once
+        """
+        self.path = path
+        self.params = params
+        self.segments = plan_segments(params['duration'], segment_seconds)
+        self.writer = writer
+        self.max_parallel = max_parallel
+        root, extension = os.path.splitext(path)
+        self.directory = f"{root}.segments"
+        self.format = segment_format(extension.lstrip('.'))
+        self.extension = f".{self.format}"
+        # Only a transport stream artifact is the segments' bytes one after another
+        self.byte_concat = is_transport_stream(extension.lstrip('.'))
+        streamable = is_transport_stream(self.format)
+        self.playlist_path = f"{root}.m3u8" if playlist and streamable else None
+        self.joined = False
+        self._written = [None] * len(self.segments)
+        self._ready = 0
+        self._output = None
+        self._lock = threading.Lock()
+    
+    @property
+    def count(self) -> int:
+        return len(self.segments)
+    
+    def segment_params(self, index: int) -> Dict[str, Any]:
+        """Return the backend parameters for segment ``index``."""
+        start, length = self.segments[index]
+        params = dict(self.params)
+        params.update({'duration': length, 'format': self.format, 'segment_index': index,
+                       'segment_count': self.count, 'segment_start': start})
+        return params
+    
+    def segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"segment_{index:05d}{self.extension}")
+    
+    def add(self, index: int, payload: Optional[bytes]) -> Optional[str]:
+        """
+        Store a finished segment and publish every segment now ready in order.
+        
+        Returns:
+            The segment's path, or None if the backend returned no bytes
+        """
+        path = None
+        if payload is not None:
+            path = self.segment_path(index)
+            os.makedirs(self.directory, exist_ok=True)
+            self.writer.write(path, payload)
+        with self._lock:
+            self._written[index] = path or False
+            ready = self._ready
+            while ready < self.count and self._written[ready] is not None:
+                ready += 1
+            if ready == self._ready:
+                return path
+            newly_ready = range(self._ready, ready)
+            self._ready = ready
+            # Appended under the lock so segments go into the artifact in order
+            if self.byte_concat:
+                for i in newly_ready:
+                    self._append(self._written[i])
+            self._write_playlist(complete=False)
+        return path
+    
+    def _append(self, segment: Optional[str]):
+        """Stream a segment file onto the end of the artifact being built. Caller holds the lock."""
+        if not segment:
+            return
+        if self._output is None:
+            self._output = self.writer.open(self.path, 'wb')
+        with open(segment, 'rb') as f:
+            shutil.copyfileobj(f, self._output, COPY_CHUNK_SIZE)
+    
+    def _write_playlist(self, complete: bool):
+        """Rewrite the playlist with the segments ready so far. Caller holds the lock."""
+        if self.playlist_path is None:
+            return
+        entries = [(self.segments[i][1], self._written[i]) for i in range(self._ready) if self._written[i]]
+        if not entries:
+            return
+        playlist_dir = os.path.dirname(self.playlist_path)
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            f"#EXT-X-TARGETDURATION:{math.ceil(max(length for _, length in self.segments))}",
+            '#EXT-X-MEDIA-SEQUENCE:0',
+            '#EXT-X-PLAYLIST-TYPE:EVENT',
+        ]
+        for length, segment in entries:
+            lines.append(f"#EXTINF:{length:.3f},")
+            lines.append(os.path.relpath(segment, playlist_dir).replace(os.sep, '/'))
+        if complete:
+            lines.append('#EXT-X-ENDLIST')
+        self.writer.write(self.playlist_path, '\n'.join(lines) + '\n')
+    
+    def finish(self) -> bool:
+        """
+        Join the segments into the artifact and close the playlist.
+        
+        Returns:
+            True if the artifact was written (False when no segment had bytes)
+        """
+        with self._lock:
+            segments = [segment for segment in self._written if segment]
+            if self.byte_concat:
+                if self._output is not None:
+                    self._output.commit()
+                    self._output = None
+            elif segments:
+                self._ffmpeg_concat(segments)
+            self._write_playlist(complete=True)
+        if segments and self.playlist_path is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        self.joined = bool(segments)
+        return self.joined
+    
+    def _ffmpeg_concat(self, segments: List[str]):
+        """Join container-format segments with ffmpeg's concat demuxer, without re-encoding."""
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError(f"Joining video segments into {os.path.basename(self.path)} needs ffmpeg")
+        entries = ''.join(concat_entry(os.path.abspath(segment)) for segment in segments)
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', dir=self.directory, delete=False) as f:
+            f.write(entries)
+            list_path = f.name
+        tmp_path = temp_path(self.path)
+        try:
+            subprocess.run(
+                [ffmpeg, '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', list_path,
+                 '-c', 'copy', tmp_path],
+                check=True, capture_output=True
+            )
+            self.writer.replace(tmp_path, self.path)
+        finally:
+            os.remove(list_path)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def abort(self):
+        """Discard the (partial or joined) artifact, segments and playlist after a failure."""
+        with self._lock:
+            if self._output is not None:
+                self._output.abort()
+                self._output = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+        paths = [self.playlist_path]
+        if self.joined:
+            paths.append(self.path)
+        for path in paths:
+            if path and os.path.exists(path):
+                os.remove(path)
+        self.joined = False
+    
+    def info(self) -> Dict[str, Any]:
+        """Describe the segmentation for the artifact's metadata."""
+        return {
+            'count': self.count,
+            'seconds': self.segments[0][1],
+            'format': self.format,
+            'playlist': self.playlist_path if any(self._written) else None,
+        }